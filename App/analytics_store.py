@@ -0,0 +1,162 @@
+"""
+Materialized analytics aggregates for the resume pool.
+
+Counts by field, level, location, years-of-experience bucket and ingest date
+are kept in a small SQLite file next to the vector store and mirrored in
+memory. VectorDatabaseManager applies every insert, update and delete, so
+dashboards and stats read the distributions directly instead of fetching and
+scanning the whole collection. Each record's contribution is stored too, which
+lets an update or delete take back exactly what the record added.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DIMENSIONS = ('field', 'level', 'city', 'state', 'country', 'yoe_bucket', 'ingest_date')
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def yoe_bucket(value: Any, edges: List[float]) -> str:
+    """Bucket label for a years-of-experience value, e.g. '3-5' or '10+'."""
+    match = _NUMBER_PATTERN.search(str(value or ''))
+    if not match:
+        return 'Unknown'
+
+    years = float(match.group())
+    lower = 0
+    for edge in edges:
+        if years < edge:
+            return f"<{edge:g}" if lower == 0 else f"{lower:g}-{edge:g}"
+        lower = edge
+    return f"{lower:g}+"
+
+
+def record_keys(metadata: Dict[str, Any], yoe_edges: List[float]) -> Dict[str, str]:
+    """The value a resume record counts towards in each dimension."""
+    def clean(key: str) -> str:
+        return str(metadata.get(key) or '').strip() or 'Unknown'
+
+    timestamp = str(metadata.get('timestamp') or '')
+    return {
+        'field': clean('reco_field'),
+        'level': clean('cand_level'),
+        'city': clean('city'),
+        'state': clean('state'),
+        'country': clean('country'),
+        'yoe_bucket': yoe_bucket(metadata.get('years_of_experience'), yoe_edges),
+        'ingest_date': timestamp[:10] if len(timestamp) >= 10 else 'Unknown'
+    }
+
+
+class AnalyticsStore:
+    """Incrementally maintained counts per dimension, persisted in SQLite."""
+
+    def __init__(self, path: Optional[str], yoe_edges: List[float]):
+        """
+        Args:
+            path: SQLite file for the aggregates (None keeps them in memory only)
+            yoe_edges: Upper edges of the years-of-experience buckets
+        """
+        self.yoe_edges = yoe_edges
+        self._lock = threading.Lock()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS record_keys (record_id TEXT PRIMARY KEY, keys TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS counts ("
+            "dimension TEXT NOT NULL, value TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (dimension, value))"
+        )
+        self._db.commit()
+
+        self._counts: Dict[str, Counter] = {dimension: Counter() for dimension in DIMENSIONS}
+        for dimension, value, count in self._db.execute("SELECT dimension, value, count FROM counts"):
+            if dimension in self._counts:
+                self._counts[dimension][value] = count
+        self.total = self._db.execute("SELECT COUNT(*) FROM record_keys").fetchone()[0]
+
+    def _adjust(self, keys: Dict[str, str], delta: int):
+        """Add a record's contribution to the counts (lock must be held, transaction open)."""
+        for dimension, value in keys.items():
+            counter = self._counts[dimension]
+            counter[value] += delta
+            if counter[value] <= 0:
+                del counter[value]
+                self._db.execute("DELETE FROM counts WHERE dimension = ? AND value = ?", (dimension, value))
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO counts (dimension, value, count) VALUES (?, ?, ?)",
+                    (dimension, value, counter[value])
+                )
+
+    def _stored_keys(self, record_id: str) -> Optional[Dict[str, str]]:
+        row = self._db.execute("SELECT keys FROM record_keys WHERE record_id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def apply(self, record_ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Count new records and move updated ones to their new values."""
+        with self._lock, self._db:
+            for record_id, metadata in zip(record_ids, metadatas):
+                keys = record_keys(metadata, self.yoe_edges)
+                previous = self._stored_keys(record_id)
+                if previous == keys:
+                    continue
+                if previous is None:
+                    self.total += 1
+                else:
+                    self._adjust(previous, -1)
+                self._adjust(keys, 1)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO record_keys (record_id, keys) VALUES (?, ?)",
+                    (record_id, json.dumps(keys))
+                )
+
+    def remove(self, record_ids: List[str]):
+        """Take deleted records out of the counts."""
+        with self._lock, self._db:
+            for record_id in record_ids:
+                previous = self._stored_keys(record_id)
+                if previous is None:
+                    continue
+                self._adjust(previous, -1)
+                self._db.execute("DELETE FROM record_keys WHERE record_id = ?", (record_id,))
+                self.total -= 1
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM record_keys")
+            self._db.execute("DELETE FROM counts")
+            for counter in self._counts.values():
+                counter.clear()
+            self.total = 0
+
+    def rebuild(self, collection, batch_size: int = 1000):
+        """Recount from the collection (first run, or after the store fell out of step)."""
+        self.clear()
+        offset = 0
+        while True:
+            batch = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+            if not batch['ids']:
+                break
+            self.apply(batch['ids'], batch['metadatas'])
+            offset += len(batch['ids'])
+
+    def get_counts(self, dimension: str) -> Dict[str, int]:
+        """Counts per value of one dimension, largest first."""
+        with self._lock:
+            return dict(self._counts[dimension].most_common())
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Total plus the counts of every dimension."""
+        with self._lock:
+            summary = {dimension: dict(counter.most_common()) for dimension, counter in self._counts.items()}
+            summary['total'] = self.total
+            return summary
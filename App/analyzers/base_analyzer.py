@@ -45,6 +45,8 @@ class BaseAnalyzer(ABC):
             self.get_prompt_template(),
             self.get_input_variables(),
             input_data,
-            development_mode
+            development_mode,
+            stats_name=self.__class__.__name__,
+            grounded=False
         )
         return self.process_output(output)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Semantic answer cache for the chatbot.
+
+Questions are embedded with the database's query embedding (itself cached) and
+compared to previously answered ones. A near-identical question, at or above
+the similarity threshold, with the same names and numbers, gets the stored
+answer without running intent analysis, search or the response model again.
+An entry is dropped when a candidate it was built from is updated or deleted.
+New candidates drop cached search and info answers, because those might now be
+incomplete or wrong about a candidate that was not found before.
+"""
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from config import ANSWER_CACHE_CONFIG
+from resource_registry import register_resource
+
+# Follow-up questions that depend on the conversation are never cached
+_CONTEXT_DEPENDENT = re.compile(
+    r"\b(he|she|him|her|his|hers|they|them|their|this|these|those|above|previous|same|again)\b",
+    re.IGNORECASE
+)
+_TOKEN_PATTERN = re.compile(r"[\w@.+-]+")
+
+
+def key_terms(question: str) -> frozenset:
+    """Names, numbers and addresses in a question (cached answers must match them exactly)."""
+    terms = set()
+    for position, token in enumerate(_TOKEN_PATTERN.findall(question)):
+        token = token.strip('.')
+        if not token:
+            continue
+        if any(char.isdigit() for char in token) or '@' in token or (position > 0 and token[0].isupper()):
+            terms.add(token.lower())
+    return frozenset(terms)
+
+
+class SemanticAnswerCache:
+    """Embedding-keyed cache of chatbot answers with candidate-based invalidation."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or ANSWER_CACHE_CONFIG
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        from database import db_manager
+
+        vector = np.asarray(db_manager.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def is_cacheable(self, question: str) -> bool:
+        return bool(self.config.get('enabled', True) and question.strip() and not _CONTEXT_DEPENDENT.search(question))
+
+    def _expire(self, now: float):
+        """Drop entries past their TTL (lock must be held)."""
+        ttl = self.config.get('ttl_seconds')
+        if not ttl:
+            return
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if now - entry['created_at'] > ttl]:
+            del self._entries[entry_id]
+
+    def lookup(self, question: str) -> Optional[str]:
+        """
+        Return the cached answer for a near-identical question.
+
+        Returns:
+            The answer, or None on a miss
+        """
+        if not self.is_cacheable(question):
+            return None
+
+        try:
+            vector = self._embed(question)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            return None
+
+        terms = key_terms(question)
+        with self._lock:
+            self._expire(time.time())
+            best_id, best_score = None, self.config['similarity_threshold']
+            for entry_id, entry in self._entries.items():
+                if entry['terms'] != terms:
+                    continue
+                score = float(entry['vector'] @ vector)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id]['answer']
+
+    def put(self, question: str, answer: str, intent: str, candidate_ids: Iterable[str] = ()):
+        """Store an answer with the IDs of the candidates it was built from."""
+        if not answer or intent not in self.config['cache_intents'] or not self.is_cacheable(question):
+            return
+
+        try:
+            vector = self._embed(question)
+        except Exception as e:
+            print(f"Answer cache store failed: {e}")
+            return
+
+        with self._lock:
+            self._entries[str(uuid.uuid4())] = {
+                'question': question,
+                'answer': answer,
+                'intent': intent,
+                'candidate_ids': set(candidate_ids),
+                'terms': key_terms(question),
+                'vector': vector,
+                'created_at': time.time()
+            }
+            while len(self._entries) > self.config['max_entries']:
+                self._entries.popitem(last=False)
+
+    def on_resume_change(self, change: str, record_ids: List[str]):
+        """
+        Change listener for VectorDatabaseManager.
+
+        Args:
+            change: 'added', 'updated', 'deleted' or 'reset'
+            record_ids: Resume records affected
+        """
+        changed = set(record_ids)
+        with self._lock:
+            if change == 'reset':
+                stale = list(self._entries)
+            elif change == 'added':
+                insert_intents = self.config.get('invalidate_on_insert', [])
+                stale = [entry_id for entry_id, entry in self._entries.items() if entry['intent'] in insert_intents]
+            else:
+                stale = [entry_id for entry_id, entry in self._entries.items() if entry['candidate_ids'] & changed]
+
+            for entry_id in stale:
+                del self._entries[entry_id]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+# Global answer cache, created lazily on first use
+answer_cache = register_resource('answer_cache', SemanticAnswerCache)
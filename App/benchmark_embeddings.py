@@ -0,0 +1,123 @@
+"""
+Embedding Backend Benchmark for AI Resume Analyzer
+Compares the ONNX Runtime backends (fp32 and int8) against the current
+sentence-transformers model: throughput and similarity drift.
+
+Usage:
+    python benchmark_embeddings.py --limit 500 --batch-size 32 --threads 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to the Python path
+current_dir = Path(__file__).parent
+sys.path.append(str(current_dir))
+
+from config import CHROMA_CONFIG
+
+SAMPLE_TEXTS = [
+    "Senior Python developer with 7 years of experience building data pipelines on AWS.",
+    "Registered nurse experienced in intensive care, patient assessment and triage.",
+    "Frontend engineer skilled in React, TypeScript and accessible UI design.",
+    "Investment analyst holding an SFC Type 9 license, covering Asian equities.",
+    "Machine learning engineer focused on NLP, transformers and model deployment.",
+    "Accountant with CPA qualification, audit and IFRS reporting experience.",
+    "DevOps specialist: Kubernetes, Terraform, CI/CD and observability tooling.",
+    "Graduate in mechanical engineering with internship in automotive design.",
+]
+
+
+def load_texts(limit: int) -> list:
+    """Load resume documents from the collection, falling back to sample texts."""
+    try:
+        from database import db_manager
+        documents = db_manager.resume_collection.get(limit=limit, include=['documents'])['documents']
+        documents = [doc for doc in documents if doc]
+        if documents:
+            print(f"📄 Loaded {len(documents)} resume documents from ChromaDB")
+            return documents
+    except Exception as e:
+        print(f"⚠️ Could not load resumes from ChromaDB ({e}), using sample texts")
+
+    repeats = max(1, limit // len(SAMPLE_TEXTS))
+    return (SAMPLE_TEXTS * repeats)[:max(limit, len(SAMPLE_TEXTS))]
+
+
+def time_backend(name: str, embedding_function, texts: list, batch_size: int) -> np.ndarray:
+    """Embed all texts, print throughput and return the embedding matrix."""
+    embedding_function(texts[:min(len(texts), batch_size)])  # warm-up
+
+    start = time.perf_counter()
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        embeddings.extend(embedding_function(texts[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    print(f"⏱️ {name:<24} {len(texts) / elapsed:8.1f} texts/s  ({elapsed:.2f}s total)")
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def report_drift(name: str, reference: np.ndarray, candidate: np.ndarray, k: int = 5):
+    """Print per-text cosine agreement and neighbour overlap against the reference model."""
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = np.sum(ref * cand, axis=1)
+
+    # Neighbour agreement: how many of each text's top-k neighbours are preserved
+    k = min(k, len(ref) - 1)
+    overlap = 1.0
+    if k > 0:
+        ref_top = np.argsort(-(ref @ ref.T), axis=1)[:, 1:k + 1]
+        cand_top = np.argsort(-(cand @ cand.T), axis=1)[:, 1:k + 1]
+        overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])
+
+    print(f"📐 {name:<24} cosine mean={cosine.mean():.5f} min={cosine.min():.5f}  top-{k} overlap={overlap:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument('--limit', type=int, default=200, help="Number of texts to embed")
+    parser.add_argument('--batch-size', type=int, default=CHROMA_CONFIG.get('embedding_batch_size', 32))
+    parser.add_argument('--threads', type=int, default=CHROMA_CONFIG.get('embedding_num_threads', 0))
+    args = parser.parse_args()
+
+    from embeddings import create_embedding_function
+
+    texts = load_texts(args.limit)
+    print(f"\n🔧 Benchmarking {len(texts)} texts, batch size {args.batch_size}, threads {args.threads or 'default'}\n")
+
+    base_config = dict(CHROMA_CONFIG, embedding_batch_size=args.batch_size, embedding_num_threads=args.threads)
+    backends = [
+        ("sentence-transformers", dict(base_config, embedding_backend='sentence_transformers')),
+        ("onnx fp32", dict(base_config, embedding_backend='onnx', onnx_quantize=False)),
+        ("onnx int8", dict(base_config, embedding_backend='onnx', onnx_quantize=True)),
+    ]
+
+    results = {}
+    for name, config in backends:
+        try:
+            results[name] = time_backend(name, create_embedding_function(config), texts, args.batch_size)
+        except Exception as e:
+            print(f"❌ {name:<24} unavailable: {e}")
+
+    reference = results.get("sentence-transformers")
+    if reference is None:
+        print("\n❌ Reference sentence-transformers model unavailable, cannot measure drift")
+        return False
+
+    print()
+    for name, embeddings in results.items():
+        if name != "sentence-transformers":
+            report_drift(name, reference, embeddings)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
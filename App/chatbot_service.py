@@ -4,10 +4,12 @@ RAG-powered Chatbot Service for Candidate Search using LangGraph and Specialists
 import streamlit as st
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from typing_extensions import Annotated, TypedDict
 import asyncio
+import re
 import sys
 import os
 
@@ -15,7 +17,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import db_manager
-from config import LLM_CONFIG, SPECIALISTS_CONFIG
+from answer_cache import answer_cache
+from config import CONTEXT_CONFIG, LLM_CONFIG, SPECIALISTS_CONFIG
+from context_builder import context_builder
+from conversation_memory import ConversationMemory
+from resource_registry import register_resource
 from db_specialists import (
     IntentSpecialist,
     NameExtractionSpecialist, 
@@ -25,6 +31,7 @@ from db_specialists import (
     GeneralResponseSpecialist,
     SFCLicenseCheckSpecialist,
     SFCWebAutomationService,
+    ConversationSummarySpecialist,
 )
 
 
@@ -41,6 +48,8 @@ class ChatState(TypedDict):
     intent_confidence: float
     sfc_candidate_name: str
     sfc_check_results: Dict[str, Any]
+    history: str
+    error: bool  # A node fell back after a failure; the answer must not be cached
 
 
 class CandidateSearchChatbot:
@@ -48,7 +57,6 @@ class CandidateSearchChatbot:
     
     def __init__(self):
         self.graph = None
-        self.conversation_history = []
         
         # Initialize existing specialists
         self.intent_specialist = IntentSpecialist(SPECIALISTS_CONFIG['intent_analysis'])
@@ -64,8 +72,22 @@ class CandidateSearchChatbot:
         self.sfc_license_check_specialist = SFCLicenseCheckSpecialist(SPECIALISTS_CONFIG['response_generation'])  # Reuse config
         self.sfc_web_automation_service = SFCWebAutomationService()
         
+        # Conversation memory (sessions pass their own; this one serves callers without one)
+        self.summary_specialist = ConversationSummarySpecialist(SPECIALISTS_CONFIG['conversation_summary'])
+        self.memory = self.create_memory()
+        
+        # Cached answers are dropped when the candidates they mention change
+        db_manager.add_change_listener(answer_cache.on_resume_change)
+        
         self._build_graph()
     
+    def create_memory(self) -> ConversationMemory:
+        """Create a bounded conversation memory for one chat session"""
+        return ConversationMemory(
+            SPECIALISTS_CONFIG['search_response']['model'],
+            summarizer=self.summary_specialist.execute
+        )
+    
     def _build_graph(self):
         """Build the LangGraph workflow for RAG-powered conversation with SFC checking"""
         
@@ -113,6 +135,10 @@ class CandidateSearchChatbot:
     def _analyze_intent(self, state: ChatState) -> Dict[str, Any]:
         """Analyze user intent using the intent specialist"""
         
+        # Callers that already classified the message seed the intent
+        if state.get("user_intent"):
+            return {}
+        
         last_message = state["messages"][-1].content if state["messages"] else ""
         
         try:
@@ -129,7 +155,8 @@ class CandidateSearchChatbot:
             return {
                 "user_intent": "general",
                 "intent_confidence": 0.5,
-                "search_query": ""
+                "search_query": "",
+                "error": True
             }
     
     def _route_based_on_intent(self, state: ChatState) -> str:
@@ -187,7 +214,8 @@ class CandidateSearchChatbot:
                         "error": f"SFC license check failed: {str(e)}",
                         "candidate_name": candidate_name,
                         "search_url": "https://apps.sfc.hk/publicregWeb/searchByName"
-                    }
+                    },
+                    "error": True
                 }
         
         except Exception as e:
@@ -199,7 +227,8 @@ class CandidateSearchChatbot:
                     "error": "Technical error during SFC license check",
                     "candidate_name": "",
                     "search_url": "https://apps.sfc.hk/publicregWeb/searchByName"
-                }
+                },
+                "error": True
             }
     
     def _generate_sfc_response(self, state: ChatState) -> Dict[str, Any]:
@@ -233,7 +262,7 @@ class CandidateSearchChatbot:
             error_response = self.sfc_license_check_specialist._get_fallback_output(
                 candidate_name=candidate_name
             )
-            return {"messages": [AIMessage(content=error_response)]}
+            return {"messages": [AIMessage(content=error_response)], "error": True}
     
     def _search_candidates(self, state: ChatState) -> Dict[str, Any]:
         """Search for candidates using ChromaDB semantic search"""
@@ -255,10 +284,13 @@ class CandidateSearchChatbot:
                 candidate_name = self.name_extraction_specialist.execute(query=search_query)
                 
                 if candidate_name:
-                    # Search for specific candidate
-                    search_results = db_manager.semantic_search_resumes(candidate_name, n_results=10)
-                    # Simple name filtering
-                    search_results = self._filter_by_name(search_results, candidate_name)
+                    # Exact name matches from the full-text index, semantic search otherwise
+                    name_matches = db_manager.fulltext_search(candidate_name, limit=3, column='name')
+                    search_results = db_manager.get_resumes_by_ids([match['id'] for match in name_matches])
+                    if not search_results:
+                        search_results = db_manager.semantic_search_resumes(candidate_name, n_results=10)
+                        # Simple name filtering
+                        search_results = self._filter_by_name(search_results, candidate_name)
                 else:
                     # General info search
                     search_results = db_manager.semantic_search_resumes(search_query, n_results=5)
@@ -266,9 +298,11 @@ class CandidateSearchChatbot:
                 # Regular search
                 enhanced_query = self.query_enhancement_specialist.execute(query=search_query)
                 search_results = db_manager.semantic_search_resumes(enhanced_query, n_results=5)
+                # Keyword hits catch rare terms and phrases the embedding misses
+                search_results = self._fuse_keyword_results(search_results, search_query, n_results=5)
             
-            # Create simple context
-            context = self._create_simple_context(search_results, user_intent)
+            # Pack the most relevant resume parts into the response budget
+            context = self._build_context(search_results, search_query, user_intent)
             
             return {
                 "search_results": search_results,
@@ -279,9 +313,33 @@ class CandidateSearchChatbot:
             st.error(f"Candidate search failed: {e}")
             return {
                 "search_results": [],
-                "context": "Search failed due to technical error."
+                "context": "Search failed due to technical error.",
+                "error": True
             }
     
+    def _fuse_keyword_results(
+        self,
+        search_results: List[Dict[str, Any]],
+        query: str,
+        n_results: int = 5,
+        rank_constant: int = 60
+    ) -> List[Dict[str, Any]]:
+        """Merge semantic results with full-text matches by reciprocal rank fusion"""
+        keyword_matches = db_manager.fulltext_search(query, limit=n_results, match_all=False)
+        if not keyword_matches:
+            return search_results
+        
+        scores = {}
+        for ranking in ([result['id'] for result in search_results], [match['id'] for match in keyword_matches]):
+            for rank, record_id in enumerate(ranking):
+                scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (rank_constant + rank + 1)
+        fused_ids = sorted(scores, key=scores.get, reverse=True)[:n_results]
+        
+        by_id = {result['id']: result for result in search_results}
+        missing = [record_id for record_id in fused_ids if record_id not in by_id]
+        by_id.update({result['id']: result for result in db_manager.get_resumes_by_ids(missing)})
+        return [by_id[record_id] for record_id in fused_ids if record_id in by_id]
+    
     def _filter_by_name(self, search_results: List[Dict[str, Any]], target_name: str) -> List[Dict[str, Any]]:
         """Simple name filtering"""
         if not target_name or not search_results:
@@ -300,77 +358,36 @@ class CandidateSearchChatbot:
         
         return filtered if filtered else search_results[:3]  # Return top 3 if no matches
     
-    def _get_candidate_info(self, metadata: Dict[str, Any]) -> str:
-        """Get candidate information from metadata - SIMPLIFIED"""
-        
-        # Priority 1: Try raw resume text first (if we implement it)
-        raw_text = metadata.get('raw_resume_text', '')
-        if raw_text and raw_text != 'Not available':
-            return f"Resume Content:\n{raw_text[:2000]}..."  # First 2000 chars
-        
-        # Priority 2: Try structured fields
-        info_parts = []
-        
-        # Basic info
-        info_parts.append(f"Name: {metadata.get('name', 'Unknown')}")
-        info_parts.append(f"Email: {metadata.get('email', 'Not provided')}")
-        info_parts.append(f"Field: {metadata.get('reco_field', 'General')}")
-        info_parts.append(f"Level: {metadata.get('cand_level', 'Unknown')}")
-        info_parts.append(f"Experience: {metadata.get('years_of_experience', 'Not specified')}")
-        
-        # Skills
-        skills = metadata.get('skills', '')
-        if skills:
-            info_parts.append(f"Skills: {skills}")
-        
-        # Work experience
-        work_exp = metadata.get('work_experiences', '')
-        if work_exp:
-            info_parts.append(f"Work Experience: {work_exp[:500]}...")
-        
-        # Education - SIMPLIFIED
-        education = metadata.get('educations', '')
-        if education:
-            info_parts.append(f"Education: {education}")
-        else:
-            # Simple fallback
-            info_parts.append("Education: Not detailed in database")
-        
-        return "\n".join(info_parts)
+    def _build_context(self, search_results: List[Dict[str, Any]], query: str, intent: str = "search") -> str:
+        """Build the response context within the response specialist's token budget"""
+        specialist_config = SPECIALISTS_CONFIG['info_response' if intent == "info" else 'search_response']
+        return context_builder.build(
+            search_results,
+            query,
+            model_name=specialist_config['model'],
+            token_budget=specialist_config.get('context_budget', CONTEXT_CONFIG['default_budget']),
+            max_candidates=CONTEXT_CONFIG['max_candidates'].get(intent, 5)
+        )
     
-    def _create_simple_context(self, search_results: List[Dict[str, Any]], intent: str = "search") -> str:
-        """Create simple context from search results - MUCH SIMPLIFIED"""
-        
-        if not search_results:
-            return "No candidates found matching the search criteria."
-        
-        context_parts = []
-        
-        # Simple logic: show detailed info for info requests, summary for search
-        if intent == "info":
-            # Show detailed info for first few candidates
-            for i, result in enumerate(search_results[:2], 1):
-                metadata = result.get('metadata', {})
-                                
-                candidate_info = f"""
-{self._get_candidate_info(metadata)}
-                """.strip()
-                context_parts.append(candidate_info)
-        else:
-            # Show summary for search results
-            for i, result in enumerate(search_results[:3], 1):
-                metadata = result.get('metadata', {})
-                similarity = round(result.get('similarity_score', 0) * 100, 1)
-                
-                summary = f"""
-Candidate {i}: {metadata.get('name', 'Unknown')} 
-- Field: {metadata.get('reco_field', 'General')}
-- Level: {metadata.get('cand_level', 'Unknown')}
-- Experience: {metadata.get('years_of_experience', 'Not specified')}
-                """.strip()
-                context_parts.append(summary)
-        
-        return "\n\n".join(context_parts)
+    def _stream_response(self, specialist, **kwargs) -> str:
+        """Run a response specialist, emitting its tokens to graph streams that include "custom" mode"""
+        writer = get_stream_writer()
+        chunks = []
+        try:
+            for chunk in specialist.stream(**kwargs):
+                chunks.append(chunk)
+                writer({"token": chunk})
+        except Exception:
+            if chunks:
+                # Separate the partial output from the fallback the node streams next
+                writer({"token": "\n\n"})
+            raise
+        return specialist.process_output("".join(chunks), **kwargs)
+    
+    def _stream_fallback(self, error_response: str) -> Dict[str, Any]:
+        """Failure result of a streaming response node; the fallback is streamed like a normal answer"""
+        get_stream_writer()({"token": error_response})
+        return {"messages": [AIMessage(content=error_response)], "error": True}
     
     def _generate_search_response(self, state: ChatState) -> Dict[str, Any]:
         """Generate response for search queries using the search response specialist"""
@@ -381,10 +398,12 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         try:
             # Use search response specialist
-            response = self.search_response_specialist.execute(
+            response = self._stream_response(
+                self.search_response_specialist,
                 user_message=last_message,
                 context=context,
-                search_results=search_results
+                search_results=search_results,
+                history=state.get("history", "")
             )
             
             # Add the response to messages
@@ -394,8 +413,7 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         except Exception as e:
             st.error(f"Search response generation failed: {e}")
-            error_response = "I apologize, but I'm having trouble processing your candidate search right now. Please try again."
-            return {"messages": [AIMessage(content=error_response)]}
+            return self._stream_fallback("I apologize, but I'm having trouble processing your candidate search right now. Please try again.")
     
     def _generate_info_response(self, state: ChatState) -> Dict[str, Any]:
         """Generate response for info queries using the info response specialist"""
@@ -405,9 +423,11 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         try:
             # Use info response specialist
-            response = self.info_response_specialist.execute(
+            response = self._stream_response(
+                self.info_response_specialist,
                 user_message=last_message,
-                context=context
+                context=context,
+                history=state.get("history", "")
             )
             
             # Add the response to messages
@@ -417,8 +437,7 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         except Exception as e:
             st.error(f"Info response generation failed: {e}")
-            error_response = "I'm unable to retrieve the specific candidate information you requested at the moment. Please try again."
-            return {"messages": [AIMessage(content=error_response)]}
+            return self._stream_fallback("I'm unable to retrieve the specific candidate information you requested at the moment. Please try again.")
     
     def _generate_general_response(self, state: ChatState) -> Dict[str, Any]:
         """Generate response for general queries using the general response specialist"""
@@ -427,8 +446,10 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         try:
             # Use general response specialist
-            response = self.general_response_specialist.execute(
-                user_message=last_message
+            response = self._stream_response(
+                self.general_response_specialist,
+                user_message=last_message,
+                history=state.get("history", "")
             )
             
             # Add the response to messages
@@ -438,162 +459,92 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         
         except Exception as e:
             st.error(f"General response generation failed: {e}")
-            error_response = "Hello! I'm your AI HR assistant. I can help you find candidates and answer questions about the resume database. How can I assist you today?"
-            return {"messages": [AIMessage(content=error_response)]}
+            return self._stream_fallback("Hello! I'm your AI HR assistant. I can help you find candidates and answer questions about the resume database. How can I assist you today?")
     
-    def chat(self, user_message: str) -> str:
+    def _initial_state(self, user_message: str, history: str, user_intent: str = "") -> Dict[str, Any]:
+        """Initial graph state for one message (a non-empty intent skips classification)"""
+        return {
+            "messages": [HumanMessage(content=user_message)],
+            "context": "",
+            "search_query": "",
+            "search_results": [],
+            "user_intent": user_intent,
+            "intent_confidence": 1.0 if user_intent else 0.0,
+            "history": history,
+            "error": False
+        }
+    
+    def chat(self, user_message: str, memory: Optional[ConversationMemory] = None, user_intent: str = "") -> str:
         """Main chat interface"""
-        
-        if not self.graph:
-            return "Chatbot is not properly initialized. Please check your configuration."
-        
-        try:
-            # Create initial state
-            initial_state = {
-                "messages": [HumanMessage(content=user_message)],
-                "context": "",
-                "search_query": "",
-                "search_results": [],
-                "user_intent": "",
-                "intent_confidence": 0.0
-            }
-            
-            # Run the graph
-            final_state = self.graph.invoke(initial_state)
-            
-            # Extract the response
-            ai_messages = [msg for msg in final_state["messages"] if isinstance(msg, AIMessage)]
-            if ai_messages:
-                response = ai_messages[-1].content
-                
-                # Store conversation history
-                self.conversation_history.append({"user": user_message, "assistant": response})
-                
-                return response
-            else:
-                return "I'm sorry, I couldn't generate a proper response. Please try again."
-        
-        except Exception as e:
-            st.error(f"Chat processing failed: {e}")
-            return "I encountered an error while processing your request. Please try again."
+        return "".join(self.chat_stream(user_message, memory=memory, user_intent=user_intent))
 
-    def chat_stream(self, user_message: str):
-        """Main chat interface with streaming"""
+    def chat_stream(self, user_message: str, memory: Optional[ConversationMemory] = None, user_intent: str = ""):
+        """
+        Main chat interface with streaming.
+        
+        Runs the graph once per message: the intent is classified by the graph (or
+        seeded by the caller), and tokens are streamed from whichever response node
+        runs. Responses that are not streamed, like SFC license checks, are yielded
+        whole from the final state.
+        """
         
         if not self.graph:
             yield "Chatbot is not properly initialized. Please check your configuration."
             return
         
+        memory = memory or self.memory
+        
+        # Near-identical questions are answered from the cache without any model calls
+        cached_response = answer_cache.lookup(user_message)
+        if cached_response:
+            memory.add_turn(user_message, cached_response)
+            yield cached_response
+            return
+        
+        initial_state = self._initial_state(user_message, memory.render(), user_intent)
+        final_state = initial_state
         response_chunks = []
         
         try:
-            # Analyze intent first
-            intent_result = self.intent_specialist.execute(message=user_message)
-            user_intent = intent_result.get('intent', 'general')
-
-            
-            # Handle SFC license intent using the proper workflow
-            if user_intent == "sfc_license":
-                # Use the LangGraph workflow for SFC license checking
-                initial_state = {
-                    "messages": [HumanMessage(content=user_message)],
-                    "context": "",
-                    "search_query": "",
-                    "search_results": [],
-                    "user_intent": "",
-                    "intent_confidence": 0.0
-                }
-                
-                final_state = self.graph.invoke(initial_state)
-                ai_messages = [msg for msg in final_state["messages"] if isinstance(msg, AIMessage)]
-                if ai_messages:
-                    complete_response = ai_messages[-1].content
-                    self.conversation_history.append({"user": user_message, "assistant": complete_response})
-                    yield complete_response
-                    return
+            for mode, payload in self.graph.stream(initial_state, stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    response_chunks.append(payload["token"])
+                    yield payload["token"]
                 else:
-                    yield "I'm sorry, I couldn't process your SFC license request properly."
-                    return
-            
-            # Search candidates if needed for other intents
-            search_results = []
-            context = ""
-            
-            if user_intent in ["search", "info"]:
-                # Search for candidates
-                search_results = self._search_candidates_simple(user_message, user_intent)
-                context = self._create_simple_context(search_results, user_intent)
-            
-            # Stream the appropriate response
-            if user_intent == "search":
-                for chunk in self.search_response_specialist.stream(
-                    user_message=user_message,
-                    context=context,
-                    search_results=search_results
-                ):
-                    response_chunks.append(chunk)
-                    yield chunk
-            elif user_intent == "info":
-                for chunk in self.info_response_specialist.stream(
-                    user_message=user_message,
-                    context=context
-                ):
-                    response_chunks.append(chunk)
-                    yield chunk
-            else:
-                for chunk in self.general_response_specialist.stream(
-                    user_message=user_message
-                ):
-                    response_chunks.append(chunk)
-                    yield chunk
+                    final_state = payload
             
-            # Store complete conversation history after streaming
-            complete_response = "".join(response_chunks)
+            ai_messages = [msg for msg in final_state["messages"] if isinstance(msg, AIMessage)]
+            complete_response = ai_messages[-1].content if ai_messages else "".join(response_chunks)
+            if not complete_response:
+                complete_response = "I'm sorry, I couldn't generate a proper response. Please try again."
+            if not response_chunks:
+                yield complete_response
             
             # Clean the response for conversation history (remove screenshot tags)
-            import re
             clean_response = re.sub(r'\[SCREENSHOT_PATH:[^\]]+\]', '', complete_response).strip()
-            self.conversation_history.append({"user": user_message, "assistant": clean_response})
+            memory.add_turn(user_message, clean_response)
+            # Fallback answers after a failure would be served for the whole cache TTL
+            if not final_state.get("error"):
+                answer_cache.put(
+                    user_message,
+                    complete_response,
+                    final_state.get("user_intent", ""),
+                    [result['id'] for result in final_state.get("search_results", [])]
+                )
             
         except Exception as e:
             st.error(f"Chat streaming failed: {e}")
             error_msg = "I encountered an error while processing your request. Please try again."
-            self.conversation_history.append({"user": user_message, "assistant": error_msg})
+            memory.add_turn(user_message, error_msg)
             yield error_msg
-
-    def _search_candidates_simple(self, user_message: str, user_intent: str):
-        """Simplified candidate search for streaming"""
-        try:
-            if user_intent == "info":
-                # Extract candidate name for specific info requests
-                candidate_name = self.name_extraction_specialist.execute(query=user_message)
-                
-                if candidate_name:
-                    # Search for specific candidate
-                    search_results = db_manager.semantic_search_resumes(candidate_name, n_results=10)
-                    # Simple name filtering
-                    search_results = self._filter_by_name(search_results, candidate_name)
-                else:
-                    # General info search
-                    search_results = db_manager.semantic_search_resumes(user_message, n_results=5)
-            else:
-                # Regular search
-                enhanced_query = self.query_enhancement_specialist.execute(query=user_message)
-                search_results = db_manager.semantic_search_resumes(enhanced_query, n_results=5)
-            
-            return search_results
-        
-        except Exception as e:
-            st.error(f"Candidate search failed: {e}")
-            return []
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get conversation history"""
-        return self.conversation_history
+        """Get the recent conversation turns (older ones are kept as a summary)"""
+        return self.memory.get_turns()
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.memory.clear()
     
     def is_available(self) -> bool:
         """Check if chatbot is available"""
@@ -619,5 +570,5 @@ Candidate {i}: {metadata.get('name', 'Unknown')}
         }
 
 
-# Global chatbot instance
-candidate_chatbot = CandidateSearchChatbot() 
\ No newline at end of file
+# Global chatbot instance, created lazily on first use
+candidate_chatbot = register_resource('candidate_chatbot', CandidateSearchChatbot) 
\ No newline at end of file
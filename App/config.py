@@ -9,8 +9,27 @@ CHROMA_CONFIG = {
     'collection_name_resumes': 'resume_data',
     'collection_name_feedback': 'user_feedback',
     'embedding_model': 'all-MiniLM-L6-v2',  # Lightweight embedding model
+    'embedding_backend': 'sentence_transformers',  # 'sentence_transformers' (PyTorch) or 'onnx' (ONNX Runtime, CPU)
+    'embedding_batch_size': 32,  # Texts per inference call (ONNX backend)
+    'embedding_num_threads': 0,  # CPU threads for embedding inference (0 = library default)
+    'onnx_quantize': False,  # Use an int8 dynamically-quantized ONNX model
+    'onnx_model_dir': None,  # Directory with model.onnx + tokenizer.json (None = ChromaDB's MiniLM export)
+    'query_cache_size': 256,  # Query embeddings kept in the in-process LRU
+    'query_cache_path': './chroma_db/query_embeddings.sqlite3',  # On-disk query embedding cache (None to disable)
+    'record_catalog_path': './chroma_db/record_catalog.sqlite3',  # Record labels for the dbms browser (None = in memory)
+    'fulltext_index_path': './chroma_db/fulltext.sqlite3',  # SQLite FTS5 keyword index (None = in memory)
+    'write_sequence_path': './chroma_db/write_sequence.sqlite3',  # Resume write counter the side indexes reconcile against
+    'fulltext_weights': {'name': 10.0, 'email': 10.0, 'skills': 3.0, 'experience': 2.0, 'resume_text': 1.0},  # BM25 weight per column
     'chunk_size': 1000,
-    'chunk_overlap': 200
+    'chunk_overlap': 200,
+    # HNSW index parameters applied when a collection is created (rebuild to change existing ones)
+    'hnsw': {
+        'space': 'l2',  # 'l2', 'cosine' or 'ip'
+        'max_neighbors': 16,  # M: graph degree, higher = better recall, more memory
+        'ef_construction': 100,  # Candidate list size while building the graph
+        'ef_search': 100,  # Candidate list size while querying, higher = better recall, slower
+        'collections': {}  # Per-collection overrides, e.g. {'resume_data': {'ef_search': 200}}
+    }
 }
 
 # Legacy MySQL Configuration (kept for reference/migration if needed)
@@ -23,7 +42,7 @@ DB_CONFIG = {
 
 # LLM Configuration - Supports both Ollama and OpenAI
 LLM_CONFIG = {
-    # Default provider: 'ollama' or 'openai'
+    # Default provider: 'ollama', 'openai' or 'replay'
     'default_provider': 'ollama',
     
     # Ollama Configuration
@@ -35,7 +54,9 @@ LLM_CONFIG = {
         'num_predict': 16384,
         'top_k': 10,
         'top_p': 0.9,
-        'timeout': 60
+        'timeout': 60,
+        'probe_timeout': 5,  # Health check (/api/tags) timeout in seconds
+        'structured_output': True  # Constrain extraction output to the Pydantic JSON schema (`format`)
     },
     
     # OpenAI Configuration
@@ -45,9 +66,32 @@ LLM_CONFIG = {
         'max_tokens': 16384,
         'top_p': 0.9,
         'timeout': 60,
+        'probe_timeout': 5,  # Health check (/models) timeout in seconds
+        'structured_output': True,  # Use json_schema structured outputs for extraction
         # OpenAI API key should be set as environment variable: OPENAI_API_KEY
         # You can also set it here if you prefer (not recommended for security)
         'api_key': None  # Will use environment variable OPENAI_API_KEY
+    },
+
+    # Record/Replay Configuration (deterministic offline runs)
+    'replay': {
+        'default_model': 'gemma3:27b',
+        'mode': 'replay',  # 'record' calls record_provider and stores responses, 'replay' serves them
+        'record_provider': 'ollama',  # Live provider used while recording
+        'store_path': './llm_recordings/recordings.jsonl',
+        'temperature': 0.1,
+        'latency': {
+            'distribution': 'none',  # 'none', 'recorded', 'fixed', 'uniform', 'normal' or 'lognormal'
+            'scale': 1.0,  # Multiplier applied to every sampled delay
+            'fixed_seconds': 0.5,
+            'min_seconds': 0.2,
+            'max_seconds': 2.0,
+            'mean_seconds': 1.0,
+            'std_seconds': 0.3,
+            'mu': 0.0,  # lognormal parameters
+            'sigma': 0.5,
+            'seed': None
+        }
     }
 }
 
@@ -86,14 +130,16 @@ SPECIALISTS_CONFIG = {
         'url': 'http://localhost:11434',
         'temperature': 0.2,  # Structured but professional
         'num_predict': 4096,
-        'timeout': 60
+        'timeout': 60,
+        'context_budget': 1500  # Context tokens for the candidate overview
     },
     'info_response': {
         'model': 'gemma3:12b',  # Larger model for detailed candidate information
         'url': 'http://localhost:11434',
         'temperature': 0.2,  # Structured but professional
         'num_predict': 4096,
-        'timeout': 60
+        'timeout': 60,
+        'context_budget': 3000  # Context tokens for the candidate details
     },
     'general_response': {
         'model': 'gemma3:12b',  # Medium model for general conversation
@@ -108,6 +154,140 @@ SPECIALISTS_CONFIG = {
         'temperature': 0.2,  # Structured matching with slight flexibility
         'num_predict': 512,
         'timeout': 30
+    },
+    'conversation_summary': {
+        'model': 'gemma3:4b',  # Small model, runs in the background
+        'url': 'http://localhost:11434',
+        'temperature': 0.1,  # Faithful summaries
+        'num_predict': 400,
+        'timeout': 45
+    }
+}
+
+# Chatbot Context Builder (token-budgeted candidate context for the response specialists)
+CONTEXT_CONFIG = {
+    'tokenizers': {},  # Model -> Hugging Face tokenizer name or tokenizer.json path, e.g. {'gemma3:12b': 'google/gemma-3-12b-it'}
+    'chunk_tokens': 150,  # Approximate size of the resume chunks ranked against the question
+    'min_similarity': 0.0,  # Chunks scoring below this are never included
+    'max_candidates': {'search': 5, 'info': 2},  # Candidates included per intent
+    'default_budget': 2000,  # Context tokens for specialists without a 'context_budget'
+    'embedding_cache_size': 4096  # Chunk embeddings kept in memory
+}
+
+# Chatbot Conversation Memory (per session: recent turns verbatim, older ones summarized)
+MEMORY_CONFIG = {
+    'window_turns': 6,  # Recent turns sent verbatim
+    'window_tokens': 1500,  # Token cap of the verbatim turns
+    'max_turn_chars': 4000,  # Longer messages are cut before they are stored
+    'summary_max_words': 150,  # Length requested from the summarizer
+    'summary_max_tokens': 300,  # Hard cap of the rolling summary
+    'background_summary': True,  # Summarize evicted turns in a background thread
+    'max_display_turns': 50  # Turns kept in the page's chat history
+}
+
+# Chatbot Semantic Answer Cache (shared across sessions, invalidated by resume changes)
+ANSWER_CACHE_CONFIG = {
+    'enabled': True,
+    'similarity_threshold': 0.95,  # Cosine similarity of question embeddings needed for a hit
+    'max_entries': 500,  # Least recently used answers are dropped beyond this
+    'ttl_seconds': 3600,  # Answers older than this are never served
+    'cache_intents': ['search', 'info', 'general'],  # sfc_license answers depend on a live lookup
+    'invalidate_on_insert': ['search', 'info']  # Intents whose answers a new candidate can change
+}
+
+# Ollama Endpoint Pool (shared by LLMService and the chatbot specialists)
+OLLAMA_POOL_CONFIG = {
+    # Ollama servers to balance across; when set, these replace the per-entry 'url'/'default_url'.
+    # Empty = LLM_CONFIG['ollama']['default_url'] only.
+    'endpoints': [],  # e.g. ['http://gpu-box-1:11434', 'http://gpu-box-2:11434']
+    'health_check_interval': 30,  # Seconds between /api/tags checks of a healthy endpoint
+    'retry_unhealthy_after': 10,  # Seconds before a failed endpoint is probed again
+    'probe_timeout': 5,  # Health check timeout in seconds
+    'max_failover_attempts': 3  # Endpoints tried per request before giving up
+}
+
+# LLM Request Scheduler (priority classes: interactive chat > single upload > bulk/backfill)
+SCHEDULER_CONFIG = {
+    'default_max_concurrency': 2,  # Concurrent requests per model (match OLLAMA_NUM_PARALLEL x endpoints)
+    'model_max_concurrency': {},  # Per-model overrides, e.g. {'gemma3:27b': 1}
+    'interactive_reserve': 1,  # Slots per model that upload/bulk requests leave free for the chat
+    'queue_timeout': None,  # Seconds a request may wait for a slot (None = no limit)
+    'metrics_window': 500  # Queue wait samples kept per priority class
+}
+
+# Ollama Model Residency (keep_alive, preloading, role consolidation)
+RESIDENCY_CONFIG = {
+    'enabled': True,
+    'default_keep_alive': '30m',  # How long Ollama keeps a model loaded after a request (-1 = forever)
+    'keep_alive': {},  # Per-model overrides, e.g. {'gemma3:4b': -1}
+    'predictive_preload': True,  # Preload the model usually needed next (learned from request order)
+    'preload_on_startup': ['gemma3:4b', 'gemma3:12b'],  # Loaded by the background warm-up
+    'poll_interval': 5,  # Minimum seconds between /api/ps polls
+    'probe_timeout': 5,  # /api/ps timeout in seconds
+    'preload_timeout': 120,  # Seconds a preload request may take (loading a model from disk)
+    'consolidation': {
+        'mode': 'off',  # 'off', 'auto' (while evictions exceed the threshold) or 'always'
+        'map': {'gemma3:4b': 'gemma3:12b'},  # Role model -> model it runs on when consolidated
+        'evictions_threshold': 4,  # Evictions within the window that trigger consolidation
+        'window_seconds': 600
+    }
+}
+
+# Duplicate Detection Configuration (identity index + MinHash/LSH)
+DEDUP_CONFIG = {
+    'enabled': True,
+    'near_duplicate_threshold': 0.85,  # Estimated Jaccard similarity to treat a CV as a re-submission
+    'num_perm': 128,  # MinHash permutations
+    'lsh_bands': 16,  # LSH bands (num_perm / lsh_bands rows each; 16x8 catches pairs above ~0.7)
+    'shingle_size': 3,  # Words per shingle
+    'phone_match_digits': 8  # Trailing digits compared, so country codes don't matter
+}
+
+# Analytics Aggregates (counts per field/level/location/experience/date, updated on every write)
+ANALYTICS_CONFIG = {
+    'store_path': './chroma_db/analytics.sqlite3',  # SQLite file for the aggregates (None = in memory, recounted at startup)
+    'yoe_buckets': [1, 3, 5, 10]  # Upper edges of the years-of-experience buckets
+}
+
+# Candidate Export Configuration (streamed to temporary files page by page)
+EXPORT_CONFIG = {
+    'directory': None,  # Where export files are written (None = system temp directory)
+    'file_prefix': 'candidate_export_',
+    'page_size': 500,  # Records fetched from the collection per page
+    'max_age_seconds': 3600  # Older export files are removed when a new export starts
+}
+
+# Typed Metadata Snapshot (memory-mapped Arrow file for filters and analytics, needs pyarrow)
+SNAPSHOT_CONFIG = {
+    'path': './chroma_db/metadata_snapshot.arrow',
+    'change_log_path': './chroma_db/metadata_changes.sqlite3',  # Resume changes not yet in the snapshot
+    'refresh_interval_seconds': 60,  # Reads within this interval use the snapshot as is
+    'full_rebuild_ratio': 0.3,  # Rebuild from scratch when more than this share of records changed
+    'page_size': 1000  # Records fetched per page during a full rebuild
+}
+
+# Resume Extraction Configuration
+EXTRACTION_CONFIG = {
+    'mode': 'specialized',  # 'specialized' (one call per extractor) or 'combined' (one ResumeMetadata call, best with large context windows)
+    'section_segmentation': True,  # Feed extractors only their sections instead of the full text
+    'min_confidence': 0.6,  # Below this, extractors fall back to the full text
+    'min_section_chars': 30,  # Routed text shorter than this falls back to the full text
+    'early_stop': True,  # Stop structured generation as soon as the JSON object is complete
+    'stop_sequences': ['\n\nNote:', '\n\nExplanation:', '\n\n**Note'],  # Default stop sequences for extraction prompts
+    'extractor_sections': {
+        'skills': ['summary', 'skills', 'languages'],
+        'experience': ['work_experience', 'projects', 'volunteer_activities'],
+        'education': ['education', 'certifications'],
+        'yoe': ['summary', 'work_experience']
+    },
+    # Model cascade: try a small model first, escalate to the provider's default model when its output fails
+    'cascade': {
+        'enabled': False,
+        'small_models': {'ollama': 'gemma3:4b', 'openai': None},  # None = no cascade for that provider
+        'min_completeness': 0.15,  # Share of fields that must be filled (0 = only empty outputs escalate)
+        'min_grounding': 0.8,  # Share of extracted strings that must be supported by the source text
+        'min_word_overlap': 0.5,  # Share of a string's words found in the source for it to count as supported
+        'always_large': []  # Output model names never tried on the small model, e.g. ['CareerTransitionAnalysis']
     }
 }
 
@@ -118,6 +298,20 @@ UPLOAD_CONFIG = {
     'upload_folder': './Uploaded_Resumes/'
 }
 
+# Upload Geolocation (server location recorded with each upload)
+GEOLOCATION_CONFIG = {
+    'enabled': True,
+    'ip_endpoint': 'https://ipinfo.io/json',  # Returns {'loc': 'lat,lon', 'city', 'region', 'country'}
+    'reverse_endpoint': 'https://nominatim.openstreetmap.org/reverse',  # Nominatim-compatible (None = offline only)
+    'user_agent': 'ai-resume-analyzer',
+    'timeout': 3,  # Seconds per HTTP call
+    'ttl_seconds': 24 * 3600,  # How long a resolved location is reused
+    'failure_ttl_seconds': 300,  # How long to wait before retrying after a failed lookup
+    'offline_dataset': None,  # CSV of city centroids (city, state, country, lat, lon) for offline reverse geocoding
+    'offline_max_distance_km': 50,  # Farther centroids are treated as unknown
+    'online_fallback': True  # Ask reverse_endpoint when the offline dataset has no close match
+}
+
 # OCR Configuration
 OCR_CONFIG = {
     'default_languages': ['en'],
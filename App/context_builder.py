@@ -0,0 +1,254 @@
+"""
+Token-budgeted context for the chatbot response specialists.
+
+Each candidate in the search results gets a short header (name, field, level,
+experience). The rest of the budget goes to the resume chunks most similar to
+the user's question, ranked across all candidates by embedding similarity.
+Tokens are counted with the response model's tokenizer when one is configured
+(Hugging Face ``tokenizers`` or ``tiktoken``), otherwise estimated.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from config import CONTEXT_CONFIG
+from resource_registry import register_resource
+
+# Try to import tokenizer libraries
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class TokenCounter:
+    """Counts tokens with a model's tokenizer, or estimates them (about four characters per token)."""
+
+    def __init__(self, model_name: str, tokenizer_name: Optional[str] = None):
+        self.model_name = model_name
+        self.backend = 'estimate'
+        self._encode: Optional[Callable[[str], List[Any]]] = None
+
+        try:
+            if tokenizer_name and TOKENIZERS_AVAILABLE:
+                tokenizer = (Tokenizer.from_file(tokenizer_name) if tokenizer_name.endswith('.json')
+                             else Tokenizer.from_pretrained(tokenizer_name))
+                self._encode = lambda text: tokenizer.encode(text, add_special_tokens=False).ids
+                self.backend = 'tokenizers'
+            elif TIKTOKEN_AVAILABLE and model_name.startswith(('gpt-', 'o1', 'o3', 'o4')):
+                encoding = tiktoken.encoding_for_model(model_name)
+                self._encode = encoding.encode
+                self.backend = 'tiktoken'
+        except Exception as e:
+            print(f"Tokenizer for {model_name} unavailable, estimating tokens: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode:
+            return len(self._encode(text))
+        return max(1, len(text) // 4)
+
+
+_token_counters: Dict[str, TokenCounter] = {}
+_token_counters_lock = threading.Lock()
+
+
+def get_token_counter(model_name: str) -> TokenCounter:
+    """Shared TokenCounter for a model (tokenizers load once per process)."""
+    with _token_counters_lock:
+        if model_name not in _token_counters:
+            _token_counters[model_name] = TokenCounter(model_name, CONTEXT_CONFIG['tokenizers'].get(model_name))
+        return _token_counters[model_name]
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """Split resume text into chunks of whole lines (long lines split at word boundaries)."""
+    chunks = []
+    current: List[str] = []
+    current_length = 0
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        pieces = [line]
+        if len(line) > max_chars:
+            pieces, piece = [], ''
+            for word in line.split():
+                if piece and len(piece) + len(word) + 1 > max_chars:
+                    pieces.append(piece)
+                    piece = ''
+                piece = f"{piece} {word}".strip()
+            pieces.append(piece)
+
+        for piece in pieces:
+            if current and current_length + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, current_length = [], 0
+            current.append(piece)
+            current_length += len(piece) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class ContextBuilder:
+    """Packs the most query-relevant parts of the search results into a token budget."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or CONTEXT_CONFIG
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts with the database's embedding function, caching chunk embeddings."""
+        from database import db_manager
+
+        keys = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in texts]
+        with self._lock:
+            missing = [i for i, key in enumerate(keys) if key not in self._embedding_cache]
+        try:
+            if missing:
+                vectors = db_manager.embedding_function([texts[i] for i in missing])
+                with self._lock:
+                    for i, vector in zip(missing, vectors):
+                        self._embedding_cache[keys[i]] = np.asarray(vector, dtype=np.float32)
+                    while len(self._embedding_cache) > self.config['embedding_cache_size']:
+                        self._embedding_cache.popitem(last=False)
+            with self._lock:
+                for key in keys:
+                    self._embedding_cache.move_to_end(key)
+                return np.stack([self._embedding_cache[key] for key in keys])
+        except Exception as e:
+            print(f"Chunk embedding failed, ranking by word overlap: {e}")
+            return None
+
+    def _score_chunks(self, query: str, chunks: List[str]) -> List[float]:
+        """Cosine similarity of each chunk to the query (word overlap if embeddings are unavailable)."""
+        if not chunks:
+            return []
+        if query:
+            try:
+                from database import db_manager
+                query_vector = np.asarray(db_manager.embed_query(query), dtype=np.float32)
+                chunk_vectors = self._embed(chunks)
+                if chunk_vectors is not None:
+                    norms = np.linalg.norm(chunk_vectors, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+                    return list((chunk_vectors @ query_vector) / np.where(norms == 0, 1.0, norms))
+            except Exception as e:
+                print(f"Query embedding failed, ranking by word overlap: {e}")
+
+        query_words = set(_WORD_PATTERN.findall(query.lower()))
+        return [
+            len(query_words & set(_WORD_PATTERN.findall(chunk.lower()))) / (len(query_words) or 1)
+            for chunk in chunks
+        ]
+
+    @staticmethod
+    def _header(index: int, metadata: Dict[str, Any]) -> str:
+        lines = [
+            f"Candidate {index}: {metadata.get('name', 'Unknown')}",
+            f"- Email: {metadata.get('email') or 'Not provided'}",
+            f"- Field: {metadata.get('reco_field', 'General')}",
+            f"- Level: {metadata.get('cand_level', 'Unknown')}",
+            f"- Experience: {metadata.get('years_of_experience') or 'Not specified'}"
+        ]
+        return "\n".join(lines)
+
+    def _candidate_chunks(self, metadata: Dict[str, Any]) -> List[str]:
+        """Resume chunks of a candidate (structured fields when the raw text is missing)."""
+        max_chars = self.config['chunk_tokens'] * 4
+        raw_text = metadata.get('raw_resume_text', '')
+        if raw_text and raw_text != 'Not available':
+            return split_into_chunks(raw_text, max_chars)
+
+        chunks = []
+        for label, key in (('Skills', 'skills'), ('Work Experience', 'work_experiences'), ('Education', 'educations')):
+            value = metadata.get(key, '')
+            if value:
+                chunks.extend(split_into_chunks(f"{label}: {value}", max_chars))
+        return chunks
+
+    def build(
+        self,
+        search_results: List[Dict[str, Any]],
+        query: str,
+        model_name: str,
+        token_budget: int,
+        max_candidates: int = 5
+    ) -> str:
+        """
+        Build the context for a response specialist.
+
+        Args:
+            search_results: Results of db_manager.semantic_search_resumes, best first
+            query: The user's question (chunks are ranked against it)
+            model_name: Response model, whose tokenizer counts the budget
+            token_budget: Maximum tokens of context
+            max_candidates: Candidates included at most
+
+        Returns:
+            Context text within the token budget
+        """
+        if not search_results:
+            return "No candidates found matching the search criteria."
+
+        counter = get_token_counter(model_name)
+        candidates = search_results[:max_candidates]
+        separator_tokens = counter.count("\n\n")
+
+        # Headers first, in search rank order, while they fit
+        headers = []
+        remaining = token_budget
+        for index, result in enumerate(candidates, 1):
+            header = self._header(index, result.get('metadata', {}))
+            cost = counter.count(header) + separator_tokens
+            if cost > remaining:
+                break
+            headers.append(header)
+            remaining -= cost
+        candidates = candidates[:len(headers)]
+
+        # Then the most relevant chunks across all candidates
+        pool = []
+        for candidate_index, result in enumerate(candidates):
+            for chunk_index, chunk in enumerate(self._candidate_chunks(result.get('metadata', {}))):
+                pool.append((candidate_index, chunk_index, chunk))
+
+        excerpts_label = "Relevant resume excerpts:"
+        label_tokens = counter.count(excerpts_label) + separator_tokens
+        scores = self._score_chunks(query, [chunk for _, _, chunk in pool])
+        selected: Dict[int, List[Any]] = {index: [] for index in range(len(candidates))}
+        for score, (candidate_index, chunk_index, chunk) in sorted(zip(scores, pool), key=lambda item: -item[0]):
+            if score < self.config['min_similarity']:
+                break
+            cost = counter.count(chunk) + separator_tokens + (0 if selected[candidate_index] else label_tokens)
+            if cost > remaining:
+                continue
+            selected[candidate_index].append((chunk_index, chunk))
+            remaining -= cost
+
+        parts = []
+        for candidate_index, header in enumerate(headers):
+            # Chunks keep their order in the resume
+            chunks = [chunk for _, chunk in sorted(selected[candidate_index])]
+            parts.append("\n".join([header] + ([excerpts_label] + chunks if chunks else [])))
+        return "\n\n".join(parts)
+
+
+# Global context builder, created lazily on first use
+context_builder = register_resource('context_builder', ContextBuilder)
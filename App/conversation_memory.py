@@ -0,0 +1,150 @@
+"""
+Bounded conversation memory for the chatbot.
+
+The most recent turns are kept verbatim within a turn and token window. Turns
+that fall out of the window are folded into a rolling summary by a small model
+in the background, so a long HR session costs the response prompts the window
+plus a summary of bounded size, and memory stays capped per session.
+"""
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from config import MEMORY_CONFIG
+from context_builder import get_token_counter
+from llm_scheduler import request_priority
+
+
+class ConversationMemory:
+    """Windowed turns plus a rolling summary of everything older."""
+
+    def __init__(
+        self,
+        model_name: str,
+        summarizer: Optional[Callable[..., str]] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            model_name: Model the history is sent to (its tokenizer counts the window)
+            summarizer: Function(summary=, turns=, max_words=) returning the new summary
+            config: Memory configuration (default: MEMORY_CONFIG)
+        """
+        self.config = config or MEMORY_CONFIG
+        self.counter = get_token_counter(model_name)
+        self.summarizer = summarizer
+        self.summary = ''
+        self._turns: deque = deque()
+        self._window_tokens = 0
+        self._pending: List[Dict[str, Any]] = []  # Evicted turns waiting to be summarized
+        self._summarizing = False
+        self._generation = 0  # Bumped by clear(); summaries of an older generation are dropped
+        self._lock = threading.Lock()
+
+    def _format_turn(self, turn: Dict[str, Any]) -> str:
+        return f"User: {turn['user']}\nAssistant: {turn['assistant']}"
+
+    def add_turn(self, user_message: str, assistant_message: str):
+        """Record a completed turn, evicting the oldest turns beyond the window."""
+        max_chars = self.config['max_turn_chars']
+        turn = {'user': user_message[:max_chars], 'assistant': assistant_message[:max_chars]}
+        turn['tokens'] = self.counter.count(self._format_turn(turn))
+
+        with self._lock:
+            self._turns.append(turn)
+            self._window_tokens += turn['tokens']
+            while len(self._turns) > 1 and (
+                len(self._turns) > self.config['window_turns'] or self._window_tokens > self.config['window_tokens']
+            ):
+                evicted = self._turns.popleft()
+                self._window_tokens -= evicted['tokens']
+                self._pending.append(evicted)
+            start = bool(self._pending) and not self._summarizing
+            if start:
+                self._summarizing = True
+
+        if start:
+            if self.config.get('background_summary', True):
+                threading.Thread(target=self._summarize_pending, name="conversation-summary", daemon=True).start()
+            else:
+                self._summarize_pending()
+
+    def _summarize_pending(self):
+        """Fold pending turns into the summary until none are left."""
+        try:
+            while True:
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                    summary = self.summary
+                    generation = self._generation
+                if not pending:
+                    return
+
+                turns_text = "\n\n".join(self._format_turn(turn) for turn in pending)
+                new_summary = ''
+                if self.summarizer:
+                    try:
+                        # Background work must not take slots from interactive requests
+                        with request_priority('bulk'):
+                            new_summary = self.summarizer(
+                                summary=summary, turns=turns_text, max_words=self.config['summary_max_words']
+                            )
+                    except Exception as e:
+                        print(f"Conversation summarization failed: {e}")
+                if not new_summary:
+                    new_summary = self._extractive_summary(summary, pending)
+
+                new_summary = self._truncate(new_summary, self.config['summary_max_tokens'])
+                with self._lock:
+                    # The chat was cleared while summarizing: the summary belongs to the old conversation
+                    if generation == self._generation:
+                        self.summary = new_summary
+        finally:
+            with self._lock:
+                self._summarizing = False
+
+    def _extractive_summary(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        """Fallback summary: the earlier questions, newest last."""
+        questions = "; ".join(turn['user'] for turn in turns)
+        return f"{summary} Earlier questions: {questions}".strip()
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to a token limit, keeping the most recent part."""
+        while text and self.counter.count(text) > max_tokens:
+            text = text[len(text) // 5:]
+        return text.strip()
+
+    def render(self) -> str:
+        """History for the response prompts: the summary plus the recent turns."""
+        with self._lock:
+            summary = self.summary
+            turns = list(self._turns)
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation: {summary}")
+        if turns:
+            parts.append("Recent turns:\n" + "\n\n".join(self._format_turn(turn) for turn in turns))
+        return "\n\n".join(parts) or "No previous conversation."
+
+    def get_turns(self) -> List[Dict[str, str]]:
+        """Turns in the window (older ones only survive in the summary)."""
+        with self._lock:
+            return [{'user': turn['user'], 'assistant': turn['assistant']} for turn in self._turns]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'window_turns': len(self._turns),
+                'window_tokens': self._window_tokens,
+                'summary_tokens': self.counter.count(self.summary),
+                'pending_turns': len(self._pending)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._window_tokens = 0
+            self._pending = []
+            self.summary = ''
+            self._generation += 1
@@ -3,14 +3,27 @@ Vector Database operations for AI Resume Analyzer using ChromaDB
 """
 import chromadb
 from chromadb.config import Settings
-from chromadb.utils import embedding_functions
 import pandas as pd
 import streamlit as st
 import json
 import uuid
+import hashlib
+import threading
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from config import CHROMA_CONFIG
+from typing import Callable, Optional, Dict, Any, List
+from config import ANALYTICS_CONFIG, CHROMA_CONFIG, DEDUP_CONFIG, SNAPSHOT_CONFIG
+from embeddings import create_embedding_function, get_embedding_model_id
+from embedding_cache import QueryEmbeddingCache
+from index_manager import distance_to_similarity, get_collection_params, get_configured_params, params_to_metadata, restore_interrupted_rebuild
+from dedup import IdentityIndex, phone_from_metadata
+from analytics_store import DIMENSIONS, AnalyticsStore
+from record_catalog import RecordCatalog
+from fulltext_index import FTS5_AVAILABLE, FullTextIndex
+from exporter import iter_collection_rows, write_rows
+from metadata_snapshot import PYARROW_AVAILABLE, ChangeLog, MetadataSnapshot
+from resource_registry import register_resource
+from write_sequence import WriteSequence
 
 
 class VectorDatabaseManager:
@@ -21,15 +34,36 @@ class VectorDatabaseManager:
         self.resume_collection = None
         self.feedback_collection = None
         self.embedding_function = None
+        self.query_cache = None
+        self.resume_index_space = 'l2'
+        self.identity_index = None  # Built from the resume collection on first use
+        self._identity_lock = threading.Lock()
+        # Side indexes, loaded (or rebuilt if they missed writes) on first use
+        self.analytics_store = None
+        self.record_catalog = None
+        self.fulltext_index = None  # Stays None without FTS5
+        self._side_index_locks = {name: threading.Lock() for name in ('analytics_store', 'record_catalog', 'fulltext_index')}
+        self.write_sequence = WriteSequence(CHROMA_CONFIG.get('write_sequence_path'))
+        self._change_listeners: List[Callable[[str, List[str]], None]] = []
+        self.metadata_snapshot = None  # Needs pyarrow; refreshed from the change log
         self._initialize_client()
         self._initialize_collections()
+        if PYARROW_AVAILABLE:
+            self.metadata_snapshot = MetadataSnapshot(ChangeLog(SNAPSHOT_CONFIG['change_log_path']))
+            self.add_change_listener(self.metadata_snapshot.change_log.record)
     
     def _initialize_client(self):
         """Initialize ChromaDB client with persistent storage"""
         try:
-            # Initialize embedding function
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=CHROMA_CONFIG['embedding_model']
+            # Initialize embedding function (backend selected in CHROMA_CONFIG)
+            self.embedding_function = create_embedding_function(CHROMA_CONFIG)
+            
+            # Cache query embeddings so repeated searches skip the model
+            self.query_cache = QueryEmbeddingCache(
+                self.embedding_function,
+                get_embedding_model_id(CHROMA_CONFIG),
+                max_entries=CHROMA_CONFIG.get('query_cache_size', 256),
+                disk_path=CHROMA_CONFIG.get('query_cache_path')
             )
             
             # Initialize ChromaDB client with persistent storage
@@ -49,28 +83,135 @@ class VectorDatabaseManager:
         """Initialize or get existing collections"""
         try:
             # Resume data collection
-            self.resume_collection = self.client.get_or_create_collection(
-                name=CHROMA_CONFIG['collection_name_resumes'],
-                embedding_function=self.embedding_function,
-                metadata={"description": "Resume analysis data with vector embeddings"}
+            self.resume_collection = self._get_or_create_collection(
+                CHROMA_CONFIG['collection_name_resumes'],
+                "Resume analysis data with vector embeddings"
             )
             
             # Feedback collection
-            self.feedback_collection = self.client.get_or_create_collection(
-                name=CHROMA_CONFIG['collection_name_feedback'],
-                embedding_function=self.embedding_function,
-                metadata={"description": "User feedback data"}
+            self.feedback_collection = self._get_or_create_collection(
+                CHROMA_CONFIG['collection_name_feedback'],
+                "User feedback data"
             )
             
+            # Distance space the resume index was built with (for similarity conversion)
+            self.resume_index_space = get_collection_params(self.resume_collection)['space']
+            
         except Exception as e:
             st.error(f"Collection initialization failed: {e}")
             raise
     
-    def insert_user_data(self, data: Dict[str, Any]) -> bool:
-        """Insert or update resume data with duplicate prevention and enhanced embeddings"""
+    def _get_or_create_collection(self, name: str, description: str):
+        """Get a collection, creating it with the configured HNSW parameters if missing"""
+        try:
+            return self.client.get_collection(name=name, embedding_function=self.embedding_function)
+        except Exception:
+            # An index rebuild interrupted mid-swap leaves the records under the backup name
+            if restore_interrupted_rebuild(self.client, name):
+                return self.client.get_collection(name=name, embedding_function=self.embedding_function)
+            metadata = {"description": description}
+            metadata.update(params_to_metadata(get_configured_params(name)))
+            return self.client.create_collection(
+                name=name,
+                embedding_function=self.embedding_function,
+                metadata=metadata
+            )
+    
+    def refresh_collections(self):
+        """Re-open collection handles (e.g. after an offline index rebuild)"""
+        self._initialize_collections()
+    
+    def _get_identity_index(self) -> IdentityIndex:
+        """Get the identity/near-duplicate index, building it with one scan on first use"""
+        if self.identity_index is None:
+            with self._identity_lock:
+                if self.identity_index is None:
+                    identity_index = IdentityIndex(DEDUP_CONFIG)
+                    identity_index.build(self.resume_collection)
+                    self.identity_index = identity_index
+        return self.identity_index
+    
+    def _get_side_index(self, name: str, create: Callable[[], Any]):
+        """
+        Get a side index (the attribute called name), loading it on first use.
+        
+        The index is rebuilt from the collection if it has not applied the latest
+        write sequence or its record count differs from the collection's.
+        """
+        index = getattr(self, name)
+        if index is None:
+            with self._side_index_locks[name]:
+                index = getattr(self, name)
+                if index is None:
+                    seq = self.write_sequence.value
+                    index = create()
+                    if self.write_sequence.synced(name) != seq or index.total != self.resume_collection.count():
+                        index.rebuild(self.resume_collection)
+                        self.write_sequence.mark_synced(name, seq)
+                    setattr(self, name, index)
+        return index
+    
+    def _update_side_index(self, name: str, seq: int, update: Callable[[], None]):
+        """Apply a committed write to a side index; one that fails is dropped and rebuilt on next use"""
+        try:
+            update()
+            self.write_sequence.mark_synced(name, seq)
+        except Exception as e:
+            setattr(self, name, None)
+            st.warning(f"⚠️ {name.replace('_', ' ').capitalize()} update failed, it will be rebuilt: {e}")
+    
+    def _get_analytics_store(self) -> AnalyticsStore:
+        """Get the analytics aggregates"""
+        return self._get_side_index(
+            'analytics_store',
+            lambda: AnalyticsStore(ANALYTICS_CONFIG.get('store_path'), ANALYTICS_CONFIG['yoe_buckets'])
+        )
+    
+    def _get_record_catalog(self) -> RecordCatalog:
+        """Get the record catalog"""
+        return self._get_side_index('record_catalog', lambda: RecordCatalog(CHROMA_CONFIG.get('record_catalog_path')))
+    
+    def _get_fulltext_index(self) -> Optional[FullTextIndex]:
+        """Get the full-text index (None without FTS5)"""
+        if not FTS5_AVAILABLE:
+            return None
+        return self._get_side_index(
+            'fulltext_index',
+            lambda: FullTextIndex(CHROMA_CONFIG.get('fulltext_index_path'), CHROMA_CONFIG.get('fulltext_weights'))
+        )
+    
+    def add_change_listener(self, listener: Callable[[str, List[str]], None]):
+        """
+        Register a callback for resume collection changes.
+        
+        Args:
+            listener: Called with the change ('added', 'updated', 'deleted' or 'reset') and the record IDs
+        """
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+    
+    def _notify_resume_change(self, change: str, record_ids: List[str]):
+        """Tell listeners about a resume change; a failing listener never fails the write."""
+        for listener in list(self._change_listeners):
+            try:
+                listener(change, record_ids)
+            except Exception as e:
+                print(f"Resume change listener failed: {e}")
+    
+    def insert_user_data(self, data: Dict[str, Any], existing_record_id: Optional[str] = None) -> bool:
+        """
+        Insert or update resume data with duplicate prevention and enhanced embeddings.
+        
+        Args:
+            data: Resume data
+            existing_record_id: Record to update (e.g. the near-duplicate of a re-submitted CV);
+                found by email, phone or name if None
+        """
         try:
             # Check for existing record based on email or name
-            existing_record_id = self._find_existing_record(data.get('email', ''), data.get('name', ''))
+            existing_record_id = existing_record_id or self._find_existing_record(
+                data.get('email', ''), data.get('name', ''), phone_from_metadata(data)
+            )
             
             if existing_record_id:
                 st.info(f"**Updating existing record** for {data.get('name', 'Unknown')} ({data.get('email', 'No email')})")
@@ -83,48 +224,10 @@ class VectorDatabaseManager:
             document_content = self._create_enhanced_document_content(data)
             
             # Prepare comprehensive metadata
-            metadata = {
-                'sec_token': str(data.get('sec_token', '')),
-                'ip_add': str(data.get('ip_add', '')),
-                'host_name': str(data.get('host_name', '')),
-                'dev_user': str(data.get('dev_user', '')),
-                'os_name_ver': str(data.get('os_name_ver', '')),
-                'latlong': str(data.get('latlong', '')),
-                'city': str(data.get('city', '')),
-                'state': str(data.get('state', '')),
-                'country': str(data.get('country', '')),
-                'act_name': str(data.get('act_name', '')),
-                'act_mail': str(data.get('act_mail', '')),
-                'act_mob': str(data.get('act_mob', '')),
-                'name': str(data.get('name', 'Unknown')),
-                'email': str(data.get('email', '')),
-                'timestamp': str(data.get('timestamp', datetime.now().isoformat())),
-                'no_of_pages': str(data.get('no_of_pages', '1')),
-                'reco_field': str(data.get('reco_field', 'General')),
-                'cand_level': str(data.get('cand_level', 'Unknown')),
-                'pdf_name': str(data.get('pdf_name', '')),
-                'record_type': 'resume_analysis',
-                # Enhanced metadata for robust searching
-                'skills': str(data.get('skills', '')),
-                'work_experiences': str(data.get('work_experiences', '')),
-                'educations': str(data.get('educations', '')),
-                'years_of_experience': str(data.get('years_of_experience', '')),
-                'field_specific_experience': str(data.get('field_specific_experience', '')),
-                'career_transition_history': str(data.get('career_transition_history', '')),
-                'primary_field': str(data.get('primary_field', '')),
-                'full_resume_data': str(data.get('full_resume_data', '')),
-                'extracted_text': str(data.get('extracted_text', '')),
-                'contact_info': str(data.get('contact_info', '')),
-                # NEW: Raw resume text for comprehensive chatbot context
-                'raw_resume_text': str(data.get('raw_resume_text', 'Not available'))
-            }
+            metadata = self._build_resume_metadata(data)
             
             # Add to collection with enhanced embedding
-            self.resume_collection.add(
-                documents=[document_content],
-                metadatas=[metadata],
-                ids=[record_id]
-            )
+            self._write_records(self.resume_collection, [record_id], [document_content], [metadata], {})
             
             st.success(f"**New record created** for {data.get('name', 'Unknown')}")
             return True
@@ -140,7 +243,7 @@ class VectorDatabaseManager:
             record_id = str(uuid.uuid4())
             
             # Create document content for feedback
-            document_content = f"Feedback from {data.get('feed_name', '')}: {data.get('comments', '')}"
+            document_content = self._create_feedback_document_content(data)
             
             # Prepare metadata
             metadata = {
@@ -153,11 +256,7 @@ class VectorDatabaseManager:
             }
             
             # Add to feedback collection
-            self.feedback_collection.add(
-                documents=[document_content],
-                metadatas=[metadata],
-                ids=[record_id]
-            )
+            self._write_records(self.feedback_collection, [record_id], [document_content], [metadata], {})
             
             return True
             
@@ -267,6 +366,42 @@ class VectorDatabaseManager:
             st.error(f"❌ Failed to fetch analytics data: {e}")
             return pd.DataFrame()
     
+    def get_analytics_summary(self) -> Dict[str, Any]:
+        """Resume counts by field, level, location, experience bucket and ingest date, without a scan"""
+        try:
+            return self._get_analytics_store().get_summary()
+        except Exception as e:
+            st.error(f"❌ Failed to get analytics summary: {e}")
+            return {'total': 0, **{dimension: {} for dimension in DIMENSIONS}}
+    
+    def get_distinct_values(self, dimension: str) -> List[str]:
+        """Known values of an analytics dimension (e.g. 'city', 'field'), most frequent first"""
+        return [value for value in self.get_analytics_summary()[dimension] if value != 'Unknown']
+    
+    def get_candidate_frame(self) -> pd.DataFrame:
+        """
+        Filterable candidate fields with typed columns (get_user_data column names plus 'id').
+        
+        Read from the memory-mapped metadata snapshot; falls back to a full
+        collection scan when pyarrow is not installed.
+        """
+        if self.metadata_snapshot is None:
+            return self.get_user_data()
+        try:
+            table = self.metadata_snapshot.get_table(self.resume_collection)
+            return table.to_pandas().rename(columns={
+                'name': 'Name',
+                'email': 'Email_ID',
+                'reco_field': 'Predicted_Field',
+                'cand_level': 'User_level',
+                'skills': 'Actual_skills',
+                'timestamp': 'Timestamp',
+                'no_of_pages': 'Page_no'
+            })
+        except Exception as e:
+            st.error(f"❌ Failed to load metadata snapshot: {e}")
+            return self.get_user_data()
+    
     def get_user_count(self) -> int:
         """Get total number of resume records"""
         try:
@@ -276,48 +411,30 @@ class VectorDatabaseManager:
             st.error(f"❌ Failed to get user count: {e}")
             return 0
     
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing cached embeddings for repeated queries"""
+        return self.query_cache.get_embedding(query)
+    
     def semantic_search_resumes(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
         """Perform semantic search on resume data with improved similarity scoring"""
         try:
             results = self.resume_collection.query(
-                query_texts=[query],
+                query_embeddings=[self.embed_query(query)],
                 n_results=n_results,
                 include=['documents', 'metadatas', 'distances']
             )
             
             search_results = []
             if results['documents'] and results['documents'][0]:
-                distances = results['distances'][0]
-                
-                # Handle edge case: if only negative similarities, normalize to positive range
-                all_negative = all(dist > 1 for dist in distances)
-                
                 for i in range(len(results['documents'][0])):
-                    distance = distances[i]
-                    
-                    if all_negative and len(distances) > 1:
-                        # When all matches are poor, use relative ranking
-                        # Convert to 0-100 scale where best match gets highest score
-                        max_dist = max(distances)
-                        min_dist = min(distances)
-                        if max_dist != min_dist:
-                            # Normalize: best (lowest distance) gets ~80%, worst gets ~20%
-                            normalized = 20 + (60 * (max_dist - distance) / (max_dist - min_dist))
-                            similarity_score = normalized / 100
-                        else:
-                            # All distances equal, give moderate score
-                            similarity_score = 0.5
-                    elif distance <= 1:
-                        # Normal case: convert distance to similarity (0-1 range)
-                        similarity_score = 1 - distance
-                    else:
-                        # Single poor match or distance > 1: cap at very low positive score
-                        similarity_score = max(0.05, 1 / (1 + distance))  # Minimum 5% similarity
+                    distance = results['distances'][0][i]
                     
                     result = {
+                        'id': results['ids'][0][i],
                         'document': results['documents'][0][i],
                         'metadata': results['metadatas'][0][i],
-                        'similarity_score': similarity_score,
+                        # Exact conversion for the collection's distance space (no range guessing)
+                        'similarity_score': distance_to_similarity(distance, self.resume_index_space),
                         'raw_distance': distance  # Keep original distance for debugging
                     }
                     search_results.append(result)
@@ -338,7 +455,7 @@ class VectorDatabaseManager:
             query = f"Skills: {', '.join(skills)}. Field: {field}"
             
             results = self.resume_collection.query(
-                query_texts=[query],
+                query_embeddings=[self.embed_query(query)],
                 n_results=n_results,
                 include=['documents', 'metadatas', 'distances'],
                 where={'reco_field': field}  # Filter by field
@@ -352,7 +469,7 @@ class VectorDatabaseManager:
                         'email': results['metadatas'][0][i].get('email', ''),
                         'field': results['metadatas'][0][i].get('reco_field', ''),
                         'level': results['metadatas'][0][i].get('cand_level', ''),
-                        'similarity': round((1 - results['distances'][0][i]) * 100, 2),
+                        'similarity': round(distance_to_similarity(results['distances'][0][i], self.resume_index_space) * 100, 2),
                         'pdf_name': results['metadatas'][0][i].get('pdf_name', '')
                     }
                     candidates.append(candidate)
@@ -363,88 +480,106 @@ class VectorDatabaseManager:
             st.error(f"❌ Similar candidates search failed: {e}")
             return []
     
-    def _find_existing_record(self, email: str, name: str) -> Optional[str]:
-        """Find existing record by email or name to prevent duplicates"""
+    def _find_existing_record(self, email: str, name: str, phone: str = '') -> Optional[str]:
+        """Find existing record by normalized email, phone or name to prevent duplicates"""
         try:
-            if not email and not name:
+            if not email and not name and not phone:
                 return None
             
-            # Search by email first (more reliable)
-            if email:
-                results = self.resume_collection.get(
-                    where={"email": email},
-                    include=['metadatas']
-                )
-                if results['ids']:
-                    return results['ids'][0]
-            
-            # If no email match, search by name
-            if name and name != 'Unknown':
-                results = self.resume_collection.get(
-                    where={"name": name},
-                    include=['metadatas']
-                )
-                if results['ids']:
-                    return results['ids'][0]
+            # Identity index lookup: email first (most reliable), then phone, then name
+            return self._get_identity_index().find_by_identity(email=email, phone=phone, name=name)
             
+        except Exception as e:
+            st.warning(f"⚠️ Duplicate check failed: {e}")
             return None
+    
+    def find_duplicate_submission(self, text: str = '', file_hash: str = '') -> Optional[Dict[str, Any]]:
+        """
+        Find the existing record for a re-submitted CV.
+        
+        Args:
+            text: Extracted resume text (matched with MinHash/LSH)
+            file_hash: SHA-256 of the uploaded file (exact re-uploads)
+            
+        Returns:
+            Dictionary with id, match_type, similarity and metadata, or None
+        """
+        if not DEDUP_CONFIG.get('enabled', True):
+            return None
+        
+        try:
+            identity_index = self._get_identity_index()
+            match_type, similarity = 'file', 1.0
+            record_id = identity_index.find_by_file_hash(file_hash) if file_hash else None
+            
+            if not record_id and text:
+                near_duplicate = identity_index.find_near_duplicate(text)
+                if near_duplicate:
+                    record_id, similarity = near_duplicate
+                    match_type = 'near_duplicate'
+            
+            if not record_id:
+                return None
+            
+            record = self.get_resume_by_id(record_id)
+            if not record:
+                return None
+            
+            return {
+                'id': record_id,
+                'match_type': match_type,
+                'similarity': similarity,
+                'metadata': record['metadata']
+            }
             
         except Exception as e:
             st.warning(f"⚠️ Duplicate check failed: {e}")
             return None
     
-    def _update_existing_record(self, record_id: str, new_data: Dict[str, Any]) -> bool:
-        """Update existing record with new data"""
+    def link_submission(self, record_id: str, pdf_name: str, sec_token: str = '') -> bool:
+        """Link a re-submitted CV to its existing record (metadata-only update)"""
         try:
-            # Delete old record
-            self.resume_collection.delete(ids=[record_id])
+            existing = self.resume_collection.get(ids=[record_id], include=['metadatas'])
+            if not existing['ids']:
+                st.error("Record not found")
+                return False
             
+            metadata = existing['metadatas'][0]
+            submissions = json.loads(metadata.get('linked_submissions') or '[]')
+            submissions.append({
+                'pdf_name': pdf_name,
+                'sec_token': sec_token,
+                'timestamp': datetime.now().isoformat()
+            })
+            metadata['linked_submissions'] = json.dumps(submissions)
+            metadata['last_submitted_at'] = submissions[-1]['timestamp']
+            
+            self._write_records(self.resume_collection, [record_id], [None], [metadata], {})
+            return True
+            
+        except Exception as e:
+            st.error(f"❌ Failed to link submission: {e}")
+            return False
+    
+    def _update_existing_record(self, record_id: str, new_data: Dict[str, Any]) -> bool:
+        """Update existing record with new data, re-embedding only if the document text changed"""
+        try:
             # Create enhanced document content
             document_content = self._create_enhanced_document_content(new_data)
             
             # Prepare updated metadata
-            metadata = {
-                'sec_token': str(new_data.get('sec_token', '')),
-                'ip_add': str(new_data.get('ip_add', '')),
-                'host_name': str(new_data.get('host_name', '')),
-                'dev_user': str(new_data.get('dev_user', '')),
-                'os_name_ver': str(new_data.get('os_name_ver', '')),
-                'latlong': str(new_data.get('latlong', '')),
-                'city': str(new_data.get('city', '')),
-                'state': str(new_data.get('state', '')),
-                'country': str(new_data.get('country', '')),
-                'act_name': str(new_data.get('act_name', '')),
-                'act_mail': str(new_data.get('act_mail', '')),
-                'act_mob': str(new_data.get('act_mob', '')),
-                'name': str(new_data.get('name', 'Unknown')),
-                'email': str(new_data.get('email', '')),
-                'timestamp': str(new_data.get('timestamp', datetime.now().isoformat())),
-                'no_of_pages': str(new_data.get('no_of_pages', '1')),
-                'reco_field': str(new_data.get('reco_field', 'General')),
-                'cand_level': str(new_data.get('cand_level', 'Unknown')),
-                'pdf_name': str(new_data.get('pdf_name', '')),
-                'record_type': 'resume_analysis',
-                'skills': str(new_data.get('skills', '')),
-                'work_experiences': str(new_data.get('work_experiences', '')),
-                'educations': str(new_data.get('educations', '')),
-                'years_of_experience': str(new_data.get('years_of_experience', '')),
-                'field_specific_experience': str(new_data.get('field_specific_experience', '')),
-                'career_transition_history': str(new_data.get('career_transition_history', '')),
-                'primary_field': str(new_data.get('primary_field', '')),
-                'full_resume_data': str(new_data.get('full_resume_data', '')),
-                'extracted_text': str(new_data.get('extracted_text', '')),
-                'contact_info': str(new_data.get('contact_info', '')),
-                'updated_at': datetime.now().isoformat(),
-                # NEW: Raw resume text for comprehensive chatbot context
-                'raw_resume_text': str(new_data.get('raw_resume_text', 'Not available'))
-            }
+            metadata = self._build_resume_metadata(new_data)
+            metadata['updated_at'] = datetime.now().isoformat()
             
-            # Re-add with same ID
-            self.resume_collection.add(
-                documents=[document_content],
-                metadatas=[metadata],
-                ids=[record_id]
-            )
+            existing = self.resume_collection.get(ids=[record_id], include=['metadatas'])
+            if existing['ids']:
+                # Keep the record's submission history
+                for key in ('linked_submissions', 'last_submitted_at'):
+                    if existing['metadatas'][0].get(key):
+                        metadata[key] = existing['metadatas'][0][key]
+            
+            existing_hashes = self._get_document_hashes(self.resume_collection, existing['ids'], existing['metadatas'])
+            self._write_records(self.resume_collection, [record_id], [document_content], [metadata], existing_hashes)
             
             return True
             
@@ -452,6 +587,182 @@ class VectorDatabaseManager:
             st.error(f"❌ Record update failed: {e}")
             return False
     
+    def _build_resume_metadata(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """Build the stored metadata for a resume analysis record"""
+        raw_text = str(data.get('raw_resume_text', 'Not available'))
+        text_minhash = ''
+        if raw_text and raw_text != 'Not available':
+            text_minhash = self._get_identity_index().compute_signature_hex(raw_text)
+        
+        return {
+            'sec_token': str(data.get('sec_token', '')),
+            'ip_add': str(data.get('ip_add', '')),
+            'host_name': str(data.get('host_name', '')),
+            'dev_user': str(data.get('dev_user', '')),
+            'os_name_ver': str(data.get('os_name_ver', '')),
+            'latlong': str(data.get('latlong', '')),
+            'city': str(data.get('city', '')),
+            'state': str(data.get('state', '')),
+            'country': str(data.get('country', '')),
+            'act_name': str(data.get('act_name', '')),
+            'act_mail': str(data.get('act_mail', '')),
+            'act_mob': str(data.get('act_mob', '')),
+            'name': str(data.get('name', 'Unknown')),
+            'email': str(data.get('email', '')),
+            'timestamp': str(data.get('timestamp', datetime.now().isoformat())),
+            'no_of_pages': str(data.get('no_of_pages', '1')),
+            'reco_field': str(data.get('reco_field', 'General')),
+            'cand_level': str(data.get('cand_level', 'Unknown')),
+            'pdf_name': str(data.get('pdf_name', '')),
+            'record_type': 'resume_analysis',
+            # Enhanced metadata for robust searching
+            'skills': str(data.get('skills', '')),
+            'work_experiences': str(data.get('work_experiences', '')),
+            'educations': str(data.get('educations', '')),
+            'years_of_experience': str(data.get('years_of_experience', '')),
+            'field_specific_experience': str(data.get('field_specific_experience', '')),
+            'career_transition_history': str(data.get('career_transition_history', '')),
+            'primary_field': str(data.get('primary_field', '')),
+            'full_resume_data': str(data.get('full_resume_data', '')),
+            'extracted_text': str(data.get('extracted_text', '')),
+            'contact_info': str(data.get('contact_info', '')),
+            # Structured extraction result, reused when the same CV is submitted again
+            'resume_json': str(data.get('resume_json', '')),
+            # Duplicate detection keys
+            'file_sha256': str(data.get('file_sha256', '')),
+            'text_minhash': text_minhash,
+            # NEW: Raw resume text for comprehensive chatbot context
+            'raw_resume_text': raw_text
+        }
+    
+    @staticmethod
+    def _document_hash(document: str) -> str:
+        """Hash document text so unchanged documents can keep their embeddings"""
+        return hashlib.sha256(document.encode('utf-8')).hexdigest()
+    
+    def _get_document_hashes(
+        self,
+        collection,
+        record_ids: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, str]:
+        """Get the stored document hash of each existing record (computed for legacy records)"""
+        if not record_ids:
+            return {}
+        
+        if metadatas is None:
+            results = collection.get(ids=record_ids, include=['metadatas'])
+            record_ids, metadatas = results['ids'], results['metadatas']
+        
+        hashes = {}
+        missing = []
+        for record_id, metadata in zip(record_ids, metadatas):
+            if metadata and metadata.get('document_hash'):
+                hashes[record_id] = metadata['document_hash']
+            else:
+                missing.append(record_id)
+        
+        # Records written before hashes were stored: hash their documents once
+        if missing:
+            legacy = collection.get(ids=missing, include=['documents'])
+            for record_id, document in zip(legacy['ids'], legacy['documents']):
+                hashes[record_id] = self._document_hash(document or '')
+        
+        return hashes
+    
+    def _write_records(
+        self,
+        collection,
+        record_ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        existing_hashes: Dict[str, str]
+    ) -> Dict[str, int]:
+        """
+        Add new records and update existing ones without re-embedding unchanged documents.
+        
+        Args:
+            collection: Target Chroma collection
+            record_ids: Record IDs to write
+            documents: Document text per record (None keeps the stored document)
+            metadatas: Full metadata per record
+            existing_hashes: Stored document hash per record that already exists
+            
+        Returns:
+            Counts of added, metadata-only and re-embedded records
+        """
+        to_add = {'ids': [], 'documents': [], 'metadatas': []}
+        to_update_metadata = {'ids': [], 'metadatas': []}
+        to_reembed = {'ids': [], 'documents': [], 'metadatas': []}
+        
+        for record_id, document, metadata in zip(record_ids, documents, metadatas):
+            if document is None:
+                to_update_metadata['ids'].append(record_id)
+                to_update_metadata['metadatas'].append(metadata)
+                continue
+            
+            document_hash = self._document_hash(document)
+            metadata['document_hash'] = document_hash
+            
+            if record_id not in existing_hashes:
+                target = to_add
+            elif existing_hashes[record_id] == document_hash:
+                target = to_update_metadata
+            else:
+                target = to_reembed
+            
+            target['ids'].append(record_id)
+            target['metadatas'].append(metadata)
+            if 'documents' in target:
+                target['documents'].append(document)
+        
+        resume_write = collection is self.resume_collection
+        # Side indexes are loaded before the write so their counts still match the collection;
+        # loading them afterwards would see one side behind and trigger a full rebuild
+        analytics_store = self._get_analytics_store() if resume_write else None
+        record_catalog = self._get_record_catalog() if resume_write else None
+        fulltext_index = self._get_fulltext_index() if resume_write else None
+        # Advanced before the Chroma write: a crash after it leaves the side indexes behind
+        # the sequence (rebuilt on load), never ahead of it
+        seq = self.write_sequence.advance() if resume_write else 0
+        
+        # Full-text changes commit only if the Chroma write succeeds
+        with fulltext_index.transaction() if fulltext_index else nullcontext() as fulltext:
+            if fulltext:
+                fulltext.apply(record_ids, metadatas)
+            if to_add['ids']:
+                collection.add(**to_add)
+            if to_update_metadata['ids']:
+                # Metadata-only update keeps the stored embedding
+                collection.update(**to_update_metadata)
+            if to_reembed['ids']:
+                collection.update(**to_reembed)
+        
+        if resume_write:
+            # Keep the identity index in step with resume writes
+            if self.identity_index is not None:
+                for record_id, metadata in zip(record_ids, metadatas):
+                    self.identity_index.add(record_id, metadata)
+            
+            # Keep the side indexes in step as well (metadata is always the full record)
+            if fulltext_index is not None:
+                self.write_sequence.mark_synced('fulltext_index', seq)
+            self._update_side_index('analytics_store', seq, lambda: analytics_store.apply(record_ids, metadatas))
+            self._update_side_index('record_catalog', seq, lambda: record_catalog.apply(record_ids, metadatas))
+        
+        if collection is self.resume_collection:
+            if to_add['ids']:
+                self._notify_resume_change('added', to_add['ids'])
+            updated_ids = to_update_metadata['ids'] + to_reembed['ids']
+            if updated_ids:
+                self._notify_resume_change('updated', updated_ids)
+        
+        return {
+            'added': len(to_add['ids']),
+            'metadata_only': len(to_update_metadata['ids']),
+            'reembedded': len(to_reembed['ids'])
+        }
+    
     def _create_enhanced_document_content(self, data: Dict[str, Any]) -> str:
         """Create enhanced document content using raw text when available for best embeddings"""
         
@@ -527,6 +838,13 @@ class VectorDatabaseManager:
         try:
             self.client.reset()
             self._initialize_collections()
+            self.identity_index = None
+            seq = self.write_sequence.advance()
+            for name in self._side_index_locks:
+                index = getattr(self, name)
+                if index is not None:
+                    self._update_side_index(name, seq, index.clear)
+            self._notify_resume_change('reset', [])
             st.success("Vector database reset successfully")
             return True
         except Exception as e:
@@ -540,7 +858,9 @@ class VectorDatabaseManager:
                 'total_resumes': self.resume_collection.count(),
                 'total_feedback': self.feedback_collection.count(),
                 'collections': len(self.client.list_collections()),
-                'embedding_model': CHROMA_CONFIG['embedding_model']
+                'embedding_model': CHROMA_CONFIG['embedding_model'],
+                'query_cache': self.query_cache.get_stats(),
+                'analytics': self.get_analytics_summary()
             }
             return stats
         except Exception as e:
@@ -569,6 +889,104 @@ class VectorDatabaseManager:
             st.error(f"❌ Failed to get resume record: {e}")
             return None
     
+    def browse_resume_records(self, search: str = '', offset: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """
+        One page of resume labels (id, name, email, field, level, timestamp, file) from the record catalog.
+        
+        Args:
+            search: Words that must each prefix a word of the name, email, field, level or file name
+            offset: Records to skip
+            limit: Page size
+            
+        Returns:
+            {'records': [...], 'total': number of matching records}
+        """
+        try:
+            records, total = self._get_record_catalog().page(search, offset, limit)
+            return {'records': records, 'total': total}
+        except Exception as e:
+            st.error(f"❌ Failed to browse resume records: {e}")
+            return {'records': [], 'total': 0}
+    
+    def fulltext_search(
+        self,
+        text: str,
+        limit: int = 20,
+        match_all: bool = True,
+        column: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyword search over names, emails, skills, work history and resume text.
+        
+        Args:
+            text: Words and "quoted phrases"
+            limit: Maximum number of results
+            match_all: Require every term instead of ranking by any term
+            column: Restrict to one column ('name', 'email', 'skills', 'experience', 'resume_text')
+            
+        Returns:
+            [{'id', 'name', 'email', 'score', 'snippet'}], best match first
+        """
+        try:
+            fulltext_index = self._get_fulltext_index()
+            return fulltext_index.search(text, limit, match_all, column) if fulltext_index else []
+        except Exception as e:
+            st.error(f"❌ Full-text search failed: {e}")
+            return []
+    
+    def rebuild_fulltext_index(self) -> bool:
+        """Reindex the full-text index from the resume collection"""
+        try:
+            fulltext_index = self._get_fulltext_index()
+            if fulltext_index is None:
+                st.error("❌ Full-text search needs SQLite with FTS5")
+                return False
+            seq = self.write_sequence.value
+            fulltext_index.rebuild(self.resume_collection)
+            self.write_sequence.mark_synced('fulltext_index', seq)
+            return True
+        except Exception as e:
+            st.error(f"❌ Failed to rebuild full-text index: {e}")
+            return False
+    
+    def export_resume_records(
+        self,
+        fmt: str,
+        columns: List[str],
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Stream resume records to a temporary export file, one page at a time.
+        
+        Args:
+            fmt: 'csv', 'jsonl' or 'parquet'
+            columns: Export columns (see exporter.EXPORT_COLUMNS)
+            filters: Exact-match metadata filters, e.g. {'reco_field': ['Web Development']}
+            
+        Returns:
+            {'path', 'rows', 'mime', 'suffix'} or None on failure
+        """
+        try:
+            return write_rows(iter_collection_rows(self.resume_collection, columns, filters), fmt, columns)
+        except Exception as e:
+            st.error(f"❌ Export failed: {e}")
+            return None
+    
+    def get_resumes_by_ids(self, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch resume records in the given order, shaped like semantic search results (no similarity)"""
+        if not record_ids:
+            return []
+        try:
+            results = self.resume_collection.get(ids=record_ids, include=['documents', 'metadatas'])
+            by_id = {
+                record_id: {'id': record_id, 'document': document, 'metadata': metadata}
+                for record_id, document, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+            }
+            return [by_id[record_id] for record_id in record_ids if record_id in by_id]
+        except Exception as e:
+            st.error(f"❌ Failed to fetch resume records: {e}")
+            return []
+    
     def get_feedback_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific feedback record by ID"""
         try:
@@ -607,84 +1025,124 @@ class VectorDatabaseManager:
             st.error(f"❌ Failed to get feedback IDs: {e}")
             return []
     
+    def _merge_resume_update(self, metadata: Dict[str, Any], updated_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply editable resume fields on top of stored metadata"""
+        updated_metadata = metadata.copy()
+        updated_metadata.update({
+            'name': str(updated_data.get('name', updated_metadata.get('name', ''))),
+            'email': str(updated_data.get('email', updated_metadata.get('email', ''))),
+            'reco_field': str(updated_data.get('reco_field', updated_metadata.get('reco_field', ''))),
+            'cand_level': str(updated_data.get('cand_level', updated_metadata.get('cand_level', ''))),
+            'city': str(updated_data.get('city', updated_metadata.get('city', ''))),
+            'state': str(updated_data.get('state', updated_metadata.get('state', ''))),
+            'skills': str(updated_data.get('skills', updated_metadata.get('skills', ''))),
+            'pdf_name': str(updated_data.get('pdf_name', updated_metadata.get('pdf_name', '')))
+        })
+        return updated_metadata
+    
+    def _merge_feedback_update(self, metadata: Dict[str, Any], updated_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply editable feedback fields on top of stored metadata"""
+        updated_metadata = metadata.copy()
+        updated_metadata.update({
+            'feed_name': str(updated_data.get('feed_name', updated_metadata.get('feed_name', ''))),
+            'feed_email': str(updated_data.get('feed_email', updated_metadata.get('feed_email', ''))),
+            'feed_score': str(updated_data.get('feed_score', updated_metadata.get('feed_score', ''))),
+            'comments': str(updated_data.get('comments', updated_metadata.get('comments', '')))
+        })
+        return updated_metadata
+    
+    @staticmethod
+    def _create_feedback_document_content(data: Dict[str, Any]) -> str:
+        """Create document content for a feedback record"""
+        return f"Feedback from {data.get('feed_name', '')}: {data.get('comments', '')}"
+    
     def update_resume_record(self, record_id: str, updated_data: Dict[str, Any]) -> bool:
-        """Update a resume record"""
-        try:
-            # Get existing record
-            existing = self.get_resume_by_id(record_id)
-            if not existing:
-                st.error("Record not found")
-                return False
-            
-            # Update metadata
-            updated_metadata = existing['metadata'].copy()
-            updated_metadata.update({
-                'name': str(updated_data.get('name', updated_metadata.get('name', ''))),
-                'email': str(updated_data.get('email', updated_metadata.get('email', ''))),
-                'reco_field': str(updated_data.get('reco_field', updated_metadata.get('reco_field', ''))),
-                'cand_level': str(updated_data.get('cand_level', updated_metadata.get('cand_level', ''))),
-                'city': str(updated_data.get('city', updated_metadata.get('city', ''))),
-                'state': str(updated_data.get('state', updated_metadata.get('state', ''))),
-                'skills': str(updated_data.get('skills', updated_metadata.get('skills', ''))),
-                'pdf_name': str(updated_data.get('pdf_name', updated_metadata.get('pdf_name', '')))
-            })
-            
-            # Create updated document content
-            updated_document = self._create_document_content(updated_metadata)
-            
-            # Delete old record and add updated one
-            self.resume_collection.delete(ids=[record_id])
-            self.resume_collection.add(
-                documents=[updated_document],
-                metadatas=[updated_metadata],
-                ids=[record_id]
-            )
-            
-            return True
-            
-        except Exception as e:
-            st.error(f"❌ Failed to update resume record: {e}")
-            return False
+        """Update a resume record (metadata-only when the document text is unchanged)"""
+        return self.bulk_update_resume_records({record_id: updated_data}).get('updated', 0) == 1
     
     def update_feedback_record(self, record_id: str, updated_data: Dict[str, Any]) -> bool:
-        """Update a feedback record"""
+        """Update a feedback record (metadata-only when the document text is unchanged)"""
+        return self.bulk_update_feedback_records({record_id: updated_data}).get('updated', 0) == 1
+    
+    def bulk_update_resume_records(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Update many resume records with one read and at most two writes.
+        
+        Args:
+            updates: Mapping of record ID to the fields to change
+            
+        Returns:
+            Counts of updated, metadata-only, re-embedded and missing records
+        """
+        return self._bulk_update_records(
+            self.resume_collection, updates, self._merge_resume_update, self._create_enhanced_document_content
+        )
+    
+    def bulk_update_feedback_records(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Update many feedback records with one read and at most two writes.
+        
+        Args:
+            updates: Mapping of record ID to the fields to change
+            
+        Returns:
+            Counts of updated, metadata-only, re-embedded and missing records
+        """
+        return self._bulk_update_records(
+            self.feedback_collection, updates, self._merge_feedback_update, self._create_feedback_document_content
+        )
+    
+    def _bulk_update_records(self, collection, updates, merge_update, create_document) -> Dict[str, int]:
+        """Merge updates into stored metadata and write them back, reusing unchanged embeddings"""
         try:
-            # Get existing record
-            existing = self.get_feedback_by_id(record_id)
-            if not existing:
-                st.error("Record not found")
-                return False
-            
-            # Update metadata
-            updated_metadata = existing['metadata'].copy()
-            updated_metadata.update({
-                'feed_name': str(updated_data.get('feed_name', updated_metadata.get('feed_name', ''))),
-                'feed_email': str(updated_data.get('feed_email', updated_metadata.get('feed_email', ''))),
-                'feed_score': str(updated_data.get('feed_score', updated_metadata.get('feed_score', ''))),
-                'comments': str(updated_data.get('comments', updated_metadata.get('comments', '')))
-            })
-            
-            # Create updated document content
-            updated_document = f"Feedback from {updated_metadata.get('feed_name', '')}: {updated_metadata.get('comments', '')}"
-            
-            # Delete old record and add updated one
-            self.feedback_collection.delete(ids=[record_id])
-            self.feedback_collection.add(
-                documents=[updated_document],
-                metadatas=[updated_metadata],
-                ids=[record_id]
-            )
-            
-            return True
+            if not updates:
+                return {'updated': 0, 'metadata_only': 0, 'reembedded': 0, 'missing': 0}
+            
+            existing = collection.get(ids=list(updates.keys()), include=['metadatas'])
+            missing = len(updates) - len(existing['ids'])
+            if missing:
+                st.error(f"{missing} record(s) not found")
+            
+            documents = []
+            metadatas = []
+            for record_id, metadata in zip(existing['ids'], existing['metadatas']):
+                updated_metadata = merge_update(metadata or {}, updates[record_id])
+                updated_metadata['updated_at'] = datetime.now().isoformat()
+                metadatas.append(updated_metadata)
+                documents.append(create_document(updated_metadata))
+            
+            existing_hashes = self._get_document_hashes(collection, existing['ids'], existing['metadatas'])
+            counts = self._write_records(collection, existing['ids'], documents, metadatas, existing_hashes)
+            
+            return {
+                'updated': len(existing['ids']),
+                'metadata_only': counts['metadata_only'],
+                'reembedded': counts['reembedded'],
+                'missing': missing
+            }
             
         except Exception as e:
-            st.error(f"❌ Failed to update feedback record: {e}")
-            return False
+            st.error(f"❌ Failed to update records: {e}")
+            return {'updated': 0, 'metadata_only': 0, 'reembedded': 0, 'missing': 0}
     
     def delete_resume_record(self, record_id: str) -> bool:
         """Delete a resume record"""
         try:
-            self.resume_collection.delete(ids=[record_id])
+            analytics_store = self._get_analytics_store()
+            record_catalog = self._get_record_catalog()
+            fulltext_index = self._get_fulltext_index()
+            seq = self.write_sequence.advance()
+            with fulltext_index.transaction() if fulltext_index else nullcontext() as fulltext:
+                if fulltext:
+                    fulltext.remove([record_id])
+                self.resume_collection.delete(ids=[record_id])
+            if fulltext_index is not None:
+                self.write_sequence.mark_synced('fulltext_index', seq)
+            if self.identity_index is not None:
+                self.identity_index.remove(record_id)
+            self._update_side_index('analytics_store', seq, lambda: analytics_store.remove([record_id]))
+            self._update_side_index('record_catalog', seq, lambda: record_catalog.remove([record_id]))
+            self._notify_resume_change('deleted', [record_id])
             return True
         except Exception as e:
             st.error(f"❌ Failed to delete resume record: {e}")
@@ -706,7 +1164,7 @@ class VectorDatabaseManager:
             record_id = str(uuid.uuid4())
             
             # Create document content
-            document_content = self._create_document_content(data)
+            document_content = self._create_enhanced_document_content(data)
             
             # Prepare metadata
             metadata = {
@@ -736,11 +1194,7 @@ class VectorDatabaseManager:
             }
             
             # Add to collection
-            self.resume_collection.add(
-                documents=[document_content],
-                metadatas=[metadata],
-                ids=[record_id]
-            )
+            self._write_records(self.resume_collection, [record_id], [document_content], [metadata], {})
             
             return True
             
@@ -755,7 +1209,7 @@ class VectorDatabaseManager:
             record_id = str(uuid.uuid4())
             
             # Create document content
-            document_content = f"Feedback from {data.get('feed_name', '')}: {data.get('comments', '')}"
+            document_content = self._create_feedback_document_content(data)
             
             # Prepare metadata
             metadata = {
@@ -768,11 +1222,7 @@ class VectorDatabaseManager:
             }
             
             # Add to collection
-            self.feedback_collection.add(
-                documents=[document_content],
-                metadatas=[metadata],
-                ids=[record_id]
-            )
+            self._write_records(self.feedback_collection, [record_id], [document_content], [metadata], {})
             
             return True
             
@@ -795,5 +1245,5 @@ class VectorDatabaseManager:
         self.close()
 
 
-# Global vector database instance (renamed for clarity)
-db_manager = VectorDatabaseManager() 
\ No newline at end of file
+# Global vector database instance, created lazily on first use
+db_manager = register_resource('db_manager', VectorDatabaseManager) 
\ No newline at end of file
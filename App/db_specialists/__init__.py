@@ -10,6 +10,7 @@ from .search_response_specialist import SearchResponseSpecialist
 from .info_response_specialist import InfoResponseSpecialist
 from .general_response_specialist import GeneralResponseSpecialist
 from .filter_matching_specialist import FilterMatchingSpecialist
+from .conversation_summary_specialist import ConversationSummarySpecialist
 from .sfc_license_specialists import SFCLicenseCheckSpecialist, SFCWebAutomationService
 
 __all__ = [
@@ -21,6 +22,7 @@ __all__ = [
     'InfoResponseSpecialist',
     'GeneralResponseSpecialist',
     'FilterMatchingSpecialist',
+    'ConversationSummarySpecialist',
     'SFCLicenseCheckSpecialist',
     'SFCWebAutomationService'
 ] 
\ No newline at end of file
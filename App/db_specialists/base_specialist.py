@@ -8,6 +8,13 @@ from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage
 import streamlit as st
+from config import EXTRACTION_CONFIG, LLM_CONFIG
+from json_repair import repair_json
+from llm_replay import ReplayLLM, ReplayMissError
+from ollama_pool import ollama_pool
+from llm_scheduler import LLMRequestCancelled, llm_scheduler
+from model_residency import model_residency
+from early_stop import collect_json, generation_stats
 
 
 class BaseSpecialist(ABC):
@@ -19,20 +26,100 @@ class BaseSpecialist(ABC):
         """Initialize the specialist with LLM configuration."""
         self.llm_config = llm_config
         self.llm = None
+        # Ollama requests go through the shared endpoint pool (one client per endpoint and model)
+        self._pooled = False
+        self._endpoint_llms = {}
         self._initialize_llm()
     
     def _initialize_llm(self):
         """Initialize the LLM instance."""
         try:
-            self.llm = ChatOllama(
-                model=self.llm_config['model'],
-                base_url=self.llm_config.get('url', self.llm_config.get('base_url')),
-                temperature=self.llm_config.get('temperature', 0.1),
-                num_predict=self.llm_config.get('num_predict', 1024)
-            )
+            # Specialists follow the global replay switch unless configured explicitly
+            default_provider = 'replay' if LLM_CONFIG['default_provider'] == 'replay' else 'ollama'
+            provider = self.llm_config.get('provider', default_provider)
+            replay_config = LLM_CONFIG['replay']
+            
+            if provider == 'replay' and replay_config['mode'] == 'replay':
+                self.llm = ReplayLLM(self.llm_config['model'], replay_config, chat=True)
+                return
+            
+            self.llm = self._create_chat_llm(self.llm_config.get('url', self.llm_config.get('base_url')))
+            
+            if provider == 'replay':
+                # Record mode: call Ollama and store every response
+                self.llm = ReplayLLM(self.llm_config['model'], replay_config, live_llm=self.llm, chat=True)
+            else:
+                self._pooled = True
         except Exception as e:
             st.error(f"❌ Failed to initialize {self.__class__.__name__}: {e}")
     
+    def _create_chat_llm(self, base_url: str, model_name: str = None) -> ChatOllama:
+        """Create the Ollama chat model for one endpoint (and model, when roles are consolidated)."""
+        model_name = model_name or self.llm_config['model']
+        # Specialists with an output model get schema-constrained decoding
+        llm_kwargs = {}
+        model = self.get_model()
+        if model and self.llm_config.get('structured_output', LLM_CONFIG['ollama'].get('structured_output', False)):
+            llm_kwargs['format'] = model.model_json_schema()
+        
+        return ChatOllama(
+            model=model_name,
+            base_url=base_url,
+            temperature=self.llm_config.get('temperature', 0.1),
+            num_predict=self.llm_config.get('num_predict', 1024),
+            keep_alive=model_residency.get_keep_alive(model_name),
+            **llm_kwargs
+        )
+    
+    def _get_endpoint_llm(self, base_url: str, model_name: str) -> ChatOllama:
+        key = (base_url, model_name)
+        if key not in self._endpoint_llms:
+            self._endpoint_llms[key] = self._create_chat_llm(base_url, model_name)
+        return self._endpoint_llms[key]
+    
+    def _pooled_model(self) -> str:
+        """Model this request runs on, recording its use for residency preloading."""
+        model_name = model_residency.resolve_model(self.llm_config['model'])
+        model_residency.note_use(model_name)
+        return model_name
+    
+    def _generate_json(self, messages) -> str:
+        """
+        Stream a structured response and stop as soon as its JSON object is complete.
+        
+        Recording runs are read to the end so the stored response is whole.
+        """
+        early_stop = self.llm_config.get('early_stop', EXTRACTION_CONFIG.get('early_stop', True))
+        if isinstance(self.llm, ReplayLLM):
+            early_stop = False
+        
+        chunks = self._stream_messages(messages, stop=self.llm_config.get('stop'))
+        response, info = collect_json(chunks, early_stop)
+        generation_stats.record(self.__class__.__name__, info, self.llm_config.get('num_predict', 1024))
+        return response
+    
+    def _invoke_messages(self, messages):
+        """Invoke the LLM in an interactive scheduler slot, on the least-loaded pool endpoint when using Ollama."""
+        if not self._pooled:
+            return llm_scheduler.run(self.llm_config['model'], lambda: self.llm.invoke(messages), 'interactive')
+        model_name = self._pooled_model()
+        return llm_scheduler.run(
+            model_name,
+            lambda: ollama_pool.call(model_name, lambda base_url: self._get_endpoint_llm(base_url, model_name).invoke(messages)),
+            'interactive'
+        )
+    
+    def _stream_messages(self, messages, stop: List[str] = None):
+        """Stream from the LLM in an interactive scheduler slot, on the least-loaded pool endpoint when using Ollama."""
+        if not self._pooled:
+            return llm_scheduler.stream(self.llm_config['model'], lambda: self.llm.stream(messages, stop=stop), 'interactive')
+        model_name = self._pooled_model()
+        return llm_scheduler.stream(
+            model_name,
+            lambda: ollama_pool.stream(model_name, lambda base_url: self._get_endpoint_llm(base_url, model_name).stream(messages, stop=stop)),
+            'interactive'
+        )
+    
     @abstractmethod
     def get_model(self) -> Optional[Type[BaseModel]]:
         """Get the Pydantic model for the specialist (None if not using structured output)."""
@@ -57,6 +144,18 @@ class BaseSpecialist(ABC):
         """Prepare input data for the LLM."""
         return kwargs
     
+    def parse_json_output(self, output: str) -> Dict[str, Any]:
+        """
+        Parse the JSON object in an LLM response, repairing fences, trailing commas and truncation.
+        
+        Raises:
+            ValueError: If no JSON object can be recovered
+        """
+        result = repair_json(output)
+        if not isinstance(result, dict):
+            raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+        return result
+    
     def execute(self, **kwargs) -> Any:
         """Execute the specialist function."""
         if not self.llm:
@@ -72,12 +171,17 @@ class BaseSpecialist(ABC):
                 HumanMessage(content=self.get_user_prompt_template().format(**input_data))
             ])
             
-            # Execute LLM
-            response = self.llm.invoke(prompt.format_messages())
+            # Execute LLM (structured output stops at the end of the JSON object)
+            if self.get_model() is not None:
+                output = self._generate_json(prompt.format_messages())
+            else:
+                output = self._invoke_messages(prompt.format_messages()).content
             
             # Process and return output
-            return self.process_output(response.content, **kwargs)
+            return self.process_output(output, **kwargs)
             
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
         except Exception as e:
             st.error(f"{self.__class__.__name__} execution failed: {e}")
             return self._get_fallback_output(**kwargs)
@@ -98,10 +202,12 @@ class BaseSpecialist(ABC):
             ])
             
             # Stream response
-            for chunk in self.llm.stream(prompt.format_messages()):
+            for chunk in self._stream_messages(prompt.format_messages()):
                 if chunk.content:
                     yield chunk.content
             
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
         except Exception as e:
             st.error(f"{self.__class__.__name__} streaming failed: {e}")
             yield self._get_fallback_output(**kwargs)
@@ -0,0 +1,53 @@
+"""
+Conversation summary specialist for compacting older chat turns.
+"""
+from typing import Type, Optional, Dict, Any
+from .base_specialist import BaseSpecialist
+from pydantic import BaseModel
+
+
+class ConversationSummarySpecialist(BaseSpecialist):
+    """Specialist for folding older conversation turns into a rolling summary."""
+    
+    def get_model(self) -> Optional[Type[BaseModel]]:
+        """No structured output needed for summaries."""
+        return None
+    
+    def get_system_prompt(self) -> str:
+        """Get the system prompt for conversation summarization."""
+        return """You maintain a short running summary of a conversation between an HR professional and an AI assistant that searches a candidate database.
+
+**Keep in the summary:**
+* What the HR professional is hiring for (roles, skills, experience, locations)
+* Candidates that were discussed, by name, and what was concluded about them
+* Open questions or follow-ups the HR professional asked for
+
+**Leave out:** greetings, formatting, full candidate profiles and anything already superseded.
+
+Write plain sentences, no headings, and stay under the requested length."""
+    
+    def get_user_prompt_template(self) -> str:
+        """Get the user prompt template for conversation summarization."""
+        return """Current summary:
+{summary}
+
+Older turns to fold into the summary:
+{turns}
+
+Return the updated summary in at most {max_words} words."""
+    
+    def prepare_input_data(self, **kwargs) -> Dict[str, Any]:
+        """Prepare input data for conversation summarization."""
+        return {
+            'summary': kwargs.get('summary') or 'No summary yet.',
+            'turns': kwargs.get('turns', ''),
+            'max_words': kwargs.get('max_words', 150)
+        }
+    
+    def process_output(self, output: str, **kwargs) -> str:
+        """Process the conversation summary output."""
+        return output.strip()
+    
+    def _get_fallback_output(self, **kwargs) -> str:
+        """Empty output: the memory falls back to an extractive summary."""
+        return ""
@@ -105,19 +105,8 @@ Guidelines:
     def process_output(self, output: str, **kwargs) -> Dict[str, Any]:
         """Process the filter matching output."""
         try:
-            import json
-            import re
-            
-            # Clean the output - remove any markdown formatting
-            cleaned_output = output.strip()
-            
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', cleaned_output, re.DOTALL)
-            if json_match:
-                cleaned_output = json_match.group()
-            
             # Parse JSON output
-            result = json.loads(cleaned_output)
+            result = self.parse_json_output(output)
             
             matched_values = result.get('matched_values', [])
             confidence = float(result.get('confidence', 0.0))
@@ -150,7 +139,7 @@ Guidelines:
                 'reasoning': reasoning
             }
             
-        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+        except (ValueError, AttributeError) as e:
             # Fallback: simple string matching
             filter_criteria = kwargs.get('filter_criteria', '').lower()
             available_values = kwargs.get('available_values', [])
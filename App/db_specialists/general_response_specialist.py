@@ -61,7 +61,10 @@ class GeneralResponseSpecialist(BaseSpecialist):
     
     def get_user_prompt_template(self) -> str:
         """Get the user prompt template for general response generation."""
-        return """User Message: {user_message}
+        return """Conversation so far:
+{history}
+
+User Message: {user_message}
 
 Please provide a helpful general response that:
 1. Addresses their question or greeting appropriately
@@ -75,7 +78,8 @@ If they're asking for help, provide concrete examples and suggestions for effect
     def prepare_input_data(self, **kwargs) -> Dict[str, Any]:
         """Prepare input data for general response generation."""
         return {
-            'user_message': kwargs.get('user_message', '')
+            'user_message': kwargs.get('user_message', ''),
+            'history': kwargs.get('history') or 'No previous conversation.'
         }
     
     def process_output(self, output: str, **kwargs) -> str:
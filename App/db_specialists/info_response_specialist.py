@@ -55,7 +55,10 @@ class InfoResponseSpecialist(BaseSpecialist):
     
     def get_user_prompt_template(self) -> str:
         """Get the user prompt template for info response generation."""
-        return """User Information Request: {user_message}
+        return """Conversation so far:
+{history}
+
+User Information Request: {user_message}
 
 Candidate Information Found:
 {context}
@@ -75,7 +78,8 @@ Format your response to help HR professionals make informed decisions about cand
         """Prepare input data for info response generation."""
         return {
             'user_message': kwargs.get('user_message', ''),
-            'context': kwargs.get('context', 'No candidate information available.')
+            'context': kwargs.get('context', 'No candidate information available.'),
+            'history': kwargs.get('history') or 'No previous conversation.'
         }
     
     def process_output(self, output: str, **kwargs) -> str:
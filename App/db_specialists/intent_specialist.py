@@ -91,19 +91,8 @@ Pay special attention to SFC license-related queries which should be classified
     def process_output(self, output: str, **kwargs) -> Dict[str, Any]:
         """Process the intent analysis output."""
         try:
-            import json
-            import re
-            
-            # Clean the output - remove any markdown formatting or extra text
-            cleaned_output = output.strip()
-            
-            # Try to extract JSON from the response using regex if needed
-            json_match = re.search(r'\{[^}]*\}', cleaned_output)
-            if json_match:
-                cleaned_output = json_match.group()
-            
             # Parse JSON output
-            result = json.loads(cleaned_output)
+            result = self.parse_json_output(output)
             
             # Validate and clean the result
             intent = result.get('intent', 'general').lower().strip()
@@ -120,7 +109,7 @@ Pay special attention to SFC license-related queries which should be classified
                 'reasoning': 'LLM classification successful'
             }
             
-        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+        except (ValueError, AttributeError) as e:
             # Fallback parsing if JSON fails
             message_lower = kwargs.get('message', '').lower().strip()
             
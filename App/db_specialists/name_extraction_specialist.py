@@ -77,9 +77,8 @@ Examples:
     def process_output(self, output: str, **kwargs) -> str:
         """Process the name extraction output."""
         try:
-            import json
             # Try to parse JSON output
-            result = json.loads(output.strip())
+            result = self.parse_json_output(output)
             
             name = result.get('name', '').strip()
             confidence = float(result.get('confidence', 0.0))
@@ -102,7 +101,7 @@ Examples:
             
             return name
             
-        except (json.JSONDecodeError, ValueError):
+        except ValueError:
             # Enhanced fallback: look for names in various capitalizations
             import re
             query = kwargs.get('query', '')
@@ -82,9 +82,8 @@ Make the enhanced query comprehensive but focused. Include related skills, techn
     def process_output(self, output: str, **kwargs) -> str:
         """Process the query enhancement output."""
         try:
-            import json
             # Try to parse JSON output
-            result = json.loads(output.strip())
+            result = self.parse_json_output(output)
             
             enhanced_query = result.get('enhanced_query', '').strip()
             original_query = kwargs.get('query', '')
@@ -95,7 +94,7 @@ Make the enhanced query comprehensive but focused. Include related skills, techn
             else:
                 return original_query
                 
-        except (json.JSONDecodeError, ValueError):
+        except ValueError:
             # Fallback: return original query
             return kwargs.get('query', '')
     
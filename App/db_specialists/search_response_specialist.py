@@ -51,7 +51,10 @@ class SearchResponseSpecialist(BaseSpecialist):
     
     def get_user_prompt_template(self) -> str:
         """Get the user prompt template for search response generation."""
-        return """User Search Request: {user_message}
+        return """Conversation so far:
+{history}
+
+User Search Request: {user_message}
 
 Search Results Found:
 {context}
@@ -79,7 +82,8 @@ Please provide a comprehensive search response that includes:
         return {
             'user_message': kwargs.get('user_message', ''),
             'context': kwargs.get('context', 'No candidate data available.'),
-            'num_results': len(search_results)
+            'num_results': len(search_results),
+            'history': kwargs.get('history') or 'No previous conversation.'
         }
     
     def process_output(self, output: str, **kwargs) -> str:
@@ -0,0 +1,260 @@
+"""
+Identity index and MinHash/LSH near-duplicate detection for resumes.
+
+The identity index maps normalized emails, phone numbers, names and file
+hashes to record IDs, so duplicate checks are dictionary lookups instead of
+collection queries. MinHash signatures over word shingles of the extracted
+text, bucketed with LSH, find re-submitted CVs even when the contact details
+changed.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from config import DEDUP_CONFIG
+
+# Placeholders written when extraction finds nothing; never treat them as identities
+PLACEHOLDER_EMAILS = {'', 'unknown@email.com', 'manual@system.com', 'n/a', 'none'}
+PLACEHOLDER_NAMES = {'', 'unknown', 'unknown candidate', 'n/a', 'none'}
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """Lowercase, drop '+tags' and Gmail dots; placeholders normalize to ''."""
+    email = (email or '').strip().lower()
+    if email in PLACEHOLDER_EMAILS or '@' not in email:
+        return ''
+
+    local, domain = email.rsplit('@', 1)
+    local = local.split('+', 1)[0]
+    if domain in ('gmail.com', 'googlemail.com'):
+        local = local.replace('.', '')
+        domain = 'gmail.com'
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Keep the trailing digits so numbers match with or without country codes."""
+    digits = re.sub(r'\D', '', phone or '')
+    match_digits = DEDUP_CONFIG.get('phone_match_digits', 8)
+    if len(digits) < match_digits:
+        return ''
+    return digits[-match_digits:]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Strip accents and punctuation, lowercase and sort tokens ('Chan Tai Man' == 'Tai Man CHAN')."""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(char for char in name if not unicodedata.combining(char)).lower()
+    if name.strip() in PLACEHOLDER_NAMES:
+        return ''
+    tokens = re.findall(r'[a-z0-9]+', name)
+    return ' '.join(sorted(tokens))
+
+
+def phone_from_metadata(metadata: Dict[str, Any]) -> str:
+    """Get the phone number stored in a resume record ('email | phone | linkedin | github')."""
+    if metadata.get('phone'):
+        return metadata['phone']
+    parts = str(metadata.get('contact_info', '')).split('|')
+    return parts[1].strip() if len(parts) > 1 else ''
+
+
+def file_sha256(file_path: str) -> str:
+    """Hash a file's bytes (exact re-uploads)."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> Set[str]:
+        tokens = re.findall(r'\w+', unicodedata.normalize('NFKC', text or '').lower())
+        if len(tokens) < self.shingle_size:
+            return {' '.join(tokens)} if tokens else set()
+        return {
+            ' '.join(tokens[i:i + self.shingle_size])
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Compute the signature of a text (None for empty text)."""
+        shingles = self._shingles(text)
+        if not shingles:
+            return None
+
+        hashes = np.array([zlib.crc32(shingle.encode('utf-8')) for shingle in shingles], dtype=np.uint64)
+        # Universal hashing (a*x + b) mod p, one row per permutation; uint64 wrap-around is intended
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, np.newaxis]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets."""
+        return float(np.mean(signature_a == signature_b))
+
+    @staticmethod
+    def to_hex(signature: np.ndarray) -> str:
+        return signature.astype('>u4').tobytes().hex()
+
+    @staticmethod
+    def from_hex(value: str) -> Optional[np.ndarray]:
+        try:
+            return np.frombuffer(bytes.fromhex(value), dtype='>u4').astype(np.uint32)
+        except (ValueError, TypeError):
+            return None
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures."""
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._keys: Dict[str, List[Tuple[int, bytes]]] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def insert(self, record_id: str, signature: np.ndarray):
+        self.remove(record_id)
+        keys = self._band_keys(signature)
+        self._keys[record_id] = keys
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(record_id)
+
+    def remove(self, record_id: str):
+        for key in self._keys.pop(record_id, []):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(record_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(self, signature: np.ndarray) -> Set[str]:
+        """Record IDs sharing at least one band with the signature."""
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        return candidates
+
+
+class IdentityIndex:
+    """In-memory identity and near-duplicate index over the resume collection."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or DEDUP_CONFIG
+        num_perm = self.config.get('num_perm', 128)
+        bands = self.config.get('lsh_bands', 16)
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=self.config.get('shingle_size', 3))
+        self.lsh = LSHIndex(bands=bands, rows=num_perm // bands)
+        self._by_key: Dict[str, Dict[str, Set[str]]] = {'email': {}, 'phone': {}, 'name': {}, 'file': {}}
+        self._record_keys: Dict[str, Dict[str, str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def compute_signature_hex(self, text: str) -> str:
+        """Signature to store with a record ('' when the text is empty)."""
+        signature = self.hasher.signature(text)
+        return MinHasher.to_hex(signature) if signature is not None else ''
+
+    def build(self, collection, batch_size: int = 500):
+        """Index every record of a collection (one paged metadata scan)."""
+        total = collection.count()
+        for offset in range(0, total, batch_size):
+            page = collection.get(limit=batch_size, offset=offset, include=['metadatas'])
+            for record_id, metadata in zip(page['ids'], page['metadatas']):
+                self.add(record_id, metadata or {})
+
+    def add(self, record_id: str, metadata: Dict[str, Any]):
+        """Index (or re-index) one record from its stored metadata."""
+        keys = {
+            'email': normalize_email(metadata.get('email')),
+            'phone': normalize_phone(phone_from_metadata(metadata)),
+            'name': normalize_name(metadata.get('name')),
+            'file': metadata.get('file_sha256', '')
+        }
+
+        signature = MinHasher.from_hex(metadata.get('text_minhash', ''))
+        if signature is None or len(signature) != self.hasher.num_perm:
+            # Legacy record without a stored signature
+            raw_text = metadata.get('raw_resume_text', '')
+            signature = self.hasher.signature(raw_text) if raw_text and raw_text != 'Not available' else None
+
+        with self._lock:
+            self.remove(record_id)
+            self._record_keys[record_id] = keys
+            for kind, value in keys.items():
+                if value:
+                    self._by_key[kind].setdefault(value, set()).add(record_id)
+            if signature is not None:
+                self._signatures[record_id] = signature
+                self.lsh.insert(record_id, signature)
+
+    def remove(self, record_id: str):
+        with self._lock:
+            for kind, value in self._record_keys.pop(record_id, {}).items():
+                ids = self._by_key[kind].get(value)
+                if ids:
+                    ids.discard(record_id)
+                    if not ids:
+                        del self._by_key[kind][value]
+            self._signatures.pop(record_id, None)
+            self.lsh.remove(record_id)
+
+    def _lookup(self, kind: str, value: str) -> Optional[str]:
+        ids = self._by_key[kind].get(value) if value else None
+        return sorted(ids)[0] if ids else None
+
+    def find_by_identity(self, email: str = '', phone: str = '', name: str = '') -> Optional[str]:
+        """Find a record by email, then phone, then name."""
+        with self._lock:
+            return (
+                self._lookup('email', normalize_email(email))
+                or self._lookup('phone', normalize_phone(phone))
+                or self._lookup('name', normalize_name(name))
+            )
+
+    def find_by_file_hash(self, file_hash: str) -> Optional[str]:
+        with self._lock:
+            return self._lookup('file', file_hash)
+
+    def find_near_duplicate(self, text: str, threshold: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Best LSH candidate whose estimated Jaccard similarity reaches the threshold."""
+        threshold = threshold if threshold is not None else self.config.get('near_duplicate_threshold', 0.85)
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+
+        with self._lock:
+            best = None
+            for record_id in self.lsh.query(signature):
+                similarity = MinHasher.similarity(signature, self._signatures[record_id])
+                if similarity >= threshold and (best is None or similarity > best[1]):
+                    best = (record_id, similarity)
+            return best
+
+    def __len__(self) -> int:
+        return len(self._record_keys)
@@ -0,0 +1,117 @@
+"""
+Early termination of structured (JSON) generation.
+
+Structured requests are streamed through a StreamingJSONParser and the stream
+is closed as soon as the top-level JSON value is complete, which aborts the
+generation instead of paying for whatever the model adds after the object.
+Generated and avoided tokens are recorded per extractor/specialist.
+"""
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Tuple
+
+from json_repair import StreamingJSONParser
+from resource_registry import register_resource
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4
+
+
+def _chunk_text(chunk: Any) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    return getattr(chunk, 'content', None) or ''
+
+
+def collect_json(chunks: Iterable[Any], early_stop: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """
+    Read a streamed response until its JSON value is complete.
+
+    Args:
+        chunks: Streamed text chunks (strings or message chunks with .content)
+        early_stop: Close the stream once the JSON value is complete; when False
+            the whole response is read and the text after the value is measured
+
+    Returns:
+        (response text, generation info with 'completed', 'stopped_early',
+        'generated_tokens' and 'trailing_tokens')
+    """
+    parser = StreamingJSONParser()
+    parts = []
+    completed_length = None
+    stopped_early = False
+
+    try:
+        for chunk in chunks:
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            parts.append(text)
+            if completed_length is None and parser.feed(text):
+                completed_length = sum(len(part) for part in parts)
+                if early_stop:
+                    stopped_early = True
+                    break
+    finally:
+        # Closing the generator chain releases the scheduler slot and aborts the HTTP stream
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
+
+    response = ''.join(parts)
+    trailing = response[completed_length:] if completed_length is not None else ''
+    return response, {
+        'completed': completed_length is not None,
+        'stopped_early': stopped_early,
+        'generated_tokens': _estimate_tokens(response),
+        'trailing_tokens': _estimate_tokens(trailing)
+    }
+
+
+class GenerationStats:
+    """Per-caller counts of structured generations, early stops and tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            'requests': 0,
+            'early_stops': 0,
+            'generated_tokens': 0,
+            'trailing_tokens': 0,
+            'unused_budget_tokens': 0
+        })
+
+    def record(self, name: str, info: Dict[str, Any], token_budget: int = 0):
+        """
+        Record one structured generation.
+
+        Args:
+            name: Extractor/specialist the request came from
+            info: Generation info from collect_json
+            token_budget: num_predict / max_tokens of the request (0 if unknown)
+        """
+        with self._lock:
+            stats = self._stats[name]
+            stats['requests'] += 1
+            stats['generated_tokens'] += info['generated_tokens']
+            stats['trailing_tokens'] += info['trailing_tokens']
+            if info['stopped_early']:
+                stats['early_stops'] += 1
+                # Upper bound of what a model rambling to its limit would have cost
+                stats['unused_budget_tokens'] += max(0, token_budget - info['generated_tokens'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Per-caller totals. 'trailing_tokens' is text generated after the JSON
+        closed (what early stopping saves when it is disabled, or what arrived in
+        the final chunk when it is enabled); 'unused_budget_tokens' bounds the
+        savings of early stops from above.
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# Global generation statistics, created lazily on first use
+generation_stats = register_resource('generation_stats', GenerationStats)
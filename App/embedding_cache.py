@@ -0,0 +1,136 @@
+"""
+Query embedding cache for semantic search.
+
+Keeps recently used query embeddings in an in-process LRU and, optionally, in
+a small SQLite file so repeated searches (Streamlit reruns, chatbot lookups,
+the same job description) skip the embedding model entirely. Entries are keyed
+by the normalized query text and the embedding model identifier.
+"""
+import array
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+def normalize_query_text(text: str) -> str:
+    """Normalize unicode and collapse whitespace so trivially different queries share an entry."""
+    return " ".join(unicodedata.normalize('NFKC', text or '').split())
+
+
+class QueryEmbeddingCache:
+    """LRU (+ optional on-disk) cache in front of an embedding function."""
+
+    def __init__(
+        self,
+        embedding_function: Callable[[List[str]], Any],
+        model_id: str,
+        max_entries: int = 256,
+        disk_path: Optional[str] = None
+    ):
+        """
+        Args:
+            embedding_function: Chroma-style function mapping a list of texts to embeddings
+            model_id: Identifier of the model/backend producing the embeddings
+            max_entries: Maximum number of embeddings kept in memory
+            disk_path: SQLite file for a persistent cache (None disables it)
+        """
+        self.embedding_function = embedding_function
+        self.model_id = model_id
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, embedding BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
+    def _make_key(self, normalized_text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\x00{normalized_text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, embedding: List[float]):
+        """Insert into the LRU, evicting the least recently used entry (lock must be held)."""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_disk(self, key: str) -> Optional[List[float]]:
+        if self._disk is None:
+            return None
+        row = self._disk.execute("SELECT embedding FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return array.array('f', row[0]).tolist()
+
+    def _save_to_disk(self, key: str, embedding: List[float]):
+        if self._disk is None:
+            return
+        self._disk.execute(
+            "INSERT OR REPLACE INTO query_embeddings (key, model, embedding) VALUES (?, ?, ?)",
+            (key, self.model_id, array.array('f', embedding).tobytes())
+        )
+        self._disk.commit()
+
+    def get_embedding(self, text: str) -> List[float]:
+        """Return the embedding for a query, computing it only on a cache miss."""
+        normalized = normalize_query_text(text)
+        key = self._make_key(normalized)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+            embedding = self._load_from_disk(key)
+            if embedding is not None:
+                self.disk_hits += 1
+                self._remember(key, embedding)
+                return embedding
+
+        # Compute outside the lock so concurrent misses don't serialize on the model
+        embedding = [float(value) for value in self.embedding_function([normalized])[0]]
+
+        with self._lock:
+            self.misses += 1
+            self._remember(key, embedding)
+            self._save_to_disk(key, embedding)
+        return embedding
+
+    def clear(self):
+        """Drop all cached embeddings (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM query_embeddings")
+                self._disk.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'model': self.model_id,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,170 @@
+"""
+Pluggable embedding backends for the vector database.
+
+``sentence_transformers`` keeps ChromaDB's stock PyTorch embedding function.
+``onnx`` runs the same MiniLM model through ONNX Runtime on CPU, optionally
+with an int8 dynamically-quantized copy of the weights, and does not need
+torch in the Streamlit process.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from chromadb.utils import embedding_functions
+from config import CHROMA_CONFIG
+
+# Chroma >= 0.4.16 expects embedding functions to subclass / follow this protocol
+try:
+    from chromadb.api.types import EmbeddingFunction
+except ImportError:
+    EmbeddingFunction = object
+
+# Optional ONNX Runtime dependencies
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+def _default_onnx_model_dir() -> str:
+    """Locate (downloading if needed) the ONNX export of all-MiniLM-L6-v2 that ChromaDB ships."""
+    onnx_minilm = embedding_functions.ONNXMiniLM_L6_V2()
+    # Embedding one text through the public interface downloads the model on first use
+    onnx_minilm(["warm up"])
+    model_dir = os.path.join(
+        getattr(onnx_minilm, 'DOWNLOAD_PATH', ''), getattr(onnx_minilm, 'EXTRACTED_FOLDER_NAME', '')
+    )
+    if not all(os.path.exists(os.path.join(model_dir, name)) for name in ('model.onnx', 'tokenizer.json')):
+        raise RuntimeError(
+            "Could not locate ChromaDB's all-MiniLM-L6-v2 ONNX export in this ChromaDB version; "
+            "set CHROMA_CONFIG['onnx_model_dir'] to a directory containing model.onnx and tokenizer.json"
+        )
+    return model_dir
+
+
+def _quantized_model_path(model_path: str) -> str:
+    """Create an int8 dynamically-quantized copy of an ONNX model once and return its path."""
+    quantized_path = os.path.splitext(model_path)[0] + '.int8.onnx'
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction):
+    """Mean-pooled, L2-normalized sentence embeddings computed with ONNX Runtime."""
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        quantize: bool = False,
+        batch_size: int = 32,
+        num_threads: int = 0,
+        max_length: int = 256
+    ):
+        """
+        Args:
+            model_dir: Directory containing model.onnx and tokenizer.json
+                (defaults to ChromaDB's all-MiniLM-L6-v2 export)
+            quantize: Use an int8 dynamically-quantized copy of the model
+            batch_size: Number of texts per inference call
+            num_threads: ONNX Runtime intra-op threads (0 lets the runtime decide)
+            max_length: Maximum tokens per text; longer texts are truncated
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("ONNX backend not available. Please install: pip install onnxruntime tokenizers")
+
+        self.model_dir = model_dir or _default_onnx_model_dir()
+        self.quantize = quantize
+        self.batch_size = max(1, batch_size)
+
+        model_path = os.path.join(self.model_dir, 'model.onnx')
+        if quantize:
+            model_path = _quantized_model_path(model_path)
+        self.model_path = model_path
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+            session_options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path, sess_options=session_options, providers=['CPUExecutionProvider']
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self._input_names:
+            feeds['token_type_ids'] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization (matches sentence-transformers)
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).astype(np.float32)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(input), self.batch_size):
+            embeddings.extend(self._embed_batch(list(input[start:start + self.batch_size])).tolist())
+        return embeddings
+
+
+def create_embedding_function(config: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Build the embedding function selected by CHROMA_CONFIG['embedding_backend'].
+
+    Args:
+        config: Chroma configuration (defaults to CHROMA_CONFIG)
+
+    Returns:
+        A ChromaDB-compatible embedding function
+    """
+    config = config or CHROMA_CONFIG
+    backend = config.get('embedding_backend', 'sentence_transformers')
+    num_threads = config.get('embedding_num_threads', 0)
+
+    if backend == 'sentence_transformers':
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=config['embedding_model']
+        )
+
+    if backend == 'onnx':
+        model_dir = config.get('onnx_model_dir')
+        if not model_dir and config['embedding_model'] != 'all-MiniLM-L6-v2':
+            raise ValueError(
+                f"No bundled ONNX export for {config['embedding_model']}; set CHROMA_CONFIG['onnx_model_dir']"
+            )
+        return OnnxEmbeddingFunction(
+            model_dir=model_dir,
+            quantize=config.get('onnx_quantize', False),
+            batch_size=config.get('embedding_batch_size', 32),
+            num_threads=num_threads
+        )
+
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def get_embedding_model_id(config: Optional[Dict[str, Any]] = None) -> str:
+    """Identify the model/backend combination that produced an embedding (e.g. for cache keys)."""
+    config = config or CHROMA_CONFIG
+    backend = config.get('embedding_backend', 'sentence_transformers')
+    if backend == 'onnx' and config.get('onnx_quantize', False):
+        backend = 'onnx-int8'
+    return f"{config['embedding_model']}:{backend}"
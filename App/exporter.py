@@ -0,0 +1,177 @@
+"""
+Streaming export of the candidate pool.
+
+Records are paged out of the collection (filters are applied by Chroma) and
+written to a temporary CSV, JSONL or Parquet file one page at a time, so an
+export of tens of thousands of candidates never holds more than a page of
+metadata, and no DataFrame or base64 copy, in memory. The file is then served
+as a download and removed once it is old.
+"""
+import csv
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import EXPORT_CONFIG
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Export format -> (file suffix, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet')
+}
+
+# Export column -> resume metadata key
+EXPORT_COLUMNS = {
+    'Name': 'name',
+    'Email': 'email',
+    'Field': 'reco_field',
+    'Level': 'cand_level',
+    'City': 'city',
+    'State': 'state',
+    'Country': 'country',
+    'Years Experience': 'years_of_experience',
+    'Skills': 'skills',
+    'Work Experience': 'work_experiences',
+    'Education': 'educations',
+    'Timestamp': 'timestamp',
+    'File': 'pdf_name',
+    'Resume Text': 'raw_resume_text'
+}
+
+DEFAULT_EXPORT_COLUMNS = ['Name', 'Email', 'Field', 'Level', 'City', 'State', 'Years Experience', 'Skills', 'Timestamp', 'File']
+
+
+def available_formats() -> List[str]:
+    """Export formats usable in this environment (Parquet needs pyarrow)."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or PYARROW_AVAILABLE]
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Chroma where clause for exact-match filters ({metadata key: value or list of values})."""
+    clauses = []
+    for key, value in (filters or {}).items():
+        if value in (None, '', []):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({key: {'$in': [str(item) for item in value]}})
+        else:
+            clauses.append({key: str(value)})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+
+def iter_collection_rows(
+    collection,
+    columns: List[str],
+    filters: Optional[Dict[str, Any]] = None,
+    page_size: Optional[int] = None
+) -> Iterator[Dict[str, str]]:
+    """Yield export rows page by page from the collection."""
+    page_size = page_size or EXPORT_CONFIG['page_size']
+    where = build_where(filters)
+    offset = 0
+    while True:
+        batch = collection.get(where=where, include=['metadatas'], limit=page_size, offset=offset)
+        if not batch['ids']:
+            return
+        for metadata in batch['metadatas']:
+            yield {column: str(metadata.get(EXPORT_COLUMNS.get(column, column)) or '') for column in columns}
+        offset += len(batch['ids'])
+
+
+def _batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def cleanup_exports(directory: Optional[str] = None, max_age_seconds: Optional[int] = None):
+    """Remove export files older than the configured age."""
+    directory = directory or EXPORT_CONFIG.get('directory') or tempfile.gettempdir()
+    max_age_seconds = max_age_seconds or EXPORT_CONFIG['max_age_seconds']
+    cutoff = time.time() - max_age_seconds
+    try:
+        for file_name in os.listdir(directory):
+            path = os.path.join(directory, file_name)
+            if file_name.startswith(EXPORT_CONFIG['file_prefix']) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    except OSError as e:
+        print(f"Export cleanup failed: {e}")
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    fmt: str,
+    columns: List[str],
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Write rows incrementally to a temporary export file.
+
+    Args:
+        rows: Rows keyed by column (consumed lazily)
+        fmt: 'csv', 'jsonl' or 'parquet'
+        columns: Columns to write, in order
+        batch_size: Rows per Parquet row group / write
+
+    Returns:
+        {'path', 'rows', 'mime', 'suffix'}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    suffix, mime = EXPORT_FORMATS[fmt]
+    batch_size = batch_size or EXPORT_CONFIG['page_size']
+    directory = EXPORT_CONFIG.get('directory')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    cleanup_exports(directory)
+
+    handle, path = tempfile.mkstemp(prefix=EXPORT_CONFIG['file_prefix'], suffix=suffix, dir=directory)
+    count = 0
+    try:
+        if fmt == 'parquet':
+            os.close(handle)
+            schema = pa.schema([(column, pa.string()) for column in columns])
+            with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+                for batch in _batched(rows, batch_size):
+                    writer.write_table(pa.Table.from_pylist(
+                        [{column: str(row.get(column, '')) for column in columns} for row in batch], schema=schema
+                    ))
+                    count += len(batch)
+        else:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='') as output:
+                if fmt == 'csv':
+                    writer = csv.DictWriter(output, fieldnames=columns, extrasaction='ignore')
+                    writer.writeheader()
+                    for row in rows:
+                        writer.writerow(row)
+                        count += 1
+                else:
+                    for row in rows:
+                        output.write(json.dumps({column: row.get(column, '') for column in columns}, ensure_ascii=False) + '\n')
+                        count += 1
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return {'path': path, 'rows': count, 'mime': mime, 'suffix': suffix}
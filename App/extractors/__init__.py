@@ -8,6 +8,8 @@ from .skills_extractor import SkillsExtractor
 from .education_extractor import EducationExtractor
 from .experience_extractor import ExperienceExtractor
 from .yoe_extractor import YoeExtractor
+from .combined_extractor import CombinedExtractor
+from .section_segmenter import SectionSegmenter
 
 __all__ = [
     'BaseExtractor',
@@ -15,5 +17,7 @@ __all__ = [
     'SkillsExtractor',
     'EducationExtractor',
     'ExperienceExtractor',
-    'YoeExtractor'
+    'YoeExtractor',
+    'CombinedExtractor',
+    'SectionSegmenter'
 ] 
\ No newline at end of file
@@ -2,7 +2,7 @@
 Base extractor class for all specialized extractors.
 """
 from abc import ABC, abstractmethod
-from typing import Type, Dict, Any, List
+from typing import Type, Dict, Any, List, Optional
 from pydantic import BaseModel
 from llm_service import llm_service
 
@@ -12,6 +12,12 @@ class BaseExtractor(ABC):
     Base class for all extractors.
     """
     
+    # Whether output values are copied from the resume text (checked by the model cascade)
+    grounded_output = True
+    
+    # Stop sequences for this extractor (None = EXTRACTION_CONFIG['stop_sequences'])
+    stop_sequences: Optional[List[str]] = None
+    
     @abstractmethod
     def get_model(self) -> Type[BaseModel]:
         """Get the Pydantic model for the extractor."""
@@ -43,6 +49,9 @@ class BaseExtractor(ABC):
             self.get_prompt_template(),
             self.get_input_variables(),
             input_data,
-            development_mode
+            development_mode,
+            stats_name=self.__class__.__name__,
+            grounded=self.grounded_output,
+            stop=self.stop_sequences
         )
         return self.process_output(output) 
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Combined extractor: the whole ResumeMetadata schema in a single LLM call.
+"""
+from typing import Type, Dict, Any, List
+from pydantic import BaseModel, ValidationError
+from .base_extractor import BaseExtractor
+from .education_extractor import EducationList
+from .experience_extractor import WorkExperienceList
+from llm_service import llm_service
+from models import Profile, Skills, YearsOfExperience
+from schemas import ResumeMetadata
+
+
+class CombinedExtractor(BaseExtractor):
+    """Extractor for every resume section at once."""
+
+    def get_model(self) -> Type[ResumeMetadata]:
+        """Get the Pydantic model for combined extraction."""
+        return ResumeMetadata
+
+    def get_prompt_template(self) -> str:
+        """Get the prompt template for combined extraction."""
+        return """
+You are an assistant that extracts structured information from resume text.
+
+Extract, in a single JSON object:
+- **personal_information:** Name, contact details and online profiles (LinkedIn, GitHub, portfolio).
+- **work_experience:** Every position with job title, company, dates, responsibilities and technologies used.
+- **education:** Academic degrees and formal educational programs only.
+- **skills:** Skills mentioned anywhere in the resume, categorized as in the schema.
+- **certifications, projects, additional_information:** As listed in the resume.
+- **total_experience_years:** Sum of the durations of professional work experiences, in years (e.g. 30 months = 2.5).
+- **career_level:** "Entry Level", "Mid-Level", "Senior Level", "Management/Leadership Level" or "Executive Level".
+- **primary_field:** Primary professional field or industry domain.
+
+Use null for missing values and empty arrays for missing lists. Leave extraction_timestamp empty.
+Do not invent information that is not in the resume.
+
+Resume Text:
+```Resume Text
+{text}
+```
+
+Return your output as a JSON object with the schema provided below.
+
+{format_instructions}
+"""
+
+    def extract(self, extracted_text: str, development_mode: bool = False) -> Dict[str, Any]:
+        """Extract all sections in one call."""
+        output = llm_service.extract_raw_json(
+            self.get_model(),
+            self.get_prompt_template(),
+            self.get_input_variables(),
+            self.prepare_input_data(extracted_text),
+            development_mode
+        )
+        return self.process_output(output)
+
+    def process_output(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate each section separately and map it to the specialized extractors' output format.
+
+        Returns:
+            Dictionary with 'results' (section -> extractor-style output) and
+            'failed_sections' (sections that are missing or failed validation)
+        """
+        results = {}
+        failed_sections = []
+
+        mappers = {
+            'profile': self._map_profile,
+            'skills': self._map_skills,
+            'education': self._map_education,
+            'experience': self._map_experience,
+            'yoe': self._map_yoe
+        }
+        for section, mapper in mappers.items():
+            try:
+                results[section] = mapper(output)
+            except (KeyError, TypeError, ValueError, ValidationError):
+                failed_sections.append(section)
+
+        return {'results': results, 'failed_sections': failed_sections}
+
+    @staticmethod
+    def _section(output: Dict[str, Any], key: str, expected_type: type) -> Any:
+        """Get a section, raising if the model left it out or returned the wrong shape."""
+        value = output[key]
+        if not isinstance(value, expected_type):
+            raise TypeError(f"{key} is {type(value).__name__}, expected {expected_type.__name__}")
+        return value
+
+    @staticmethod
+    def _validate(model: Type[BaseModel], data: Any) -> Dict[str, Any]:
+        return model.model_validate(data).model_dump()
+
+    def _map_profile(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        personal = dict(self._section(output, 'personal_information', dict))
+        personal['name'] = personal.pop('full_name', None)
+        personal['contact_number'] = personal.pop('phone', None)
+        return {'profile': self._validate(Profile, personal)}
+
+    def _map_skills(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        return {'skills': self._validate(Skills, self._section(output, 'skills', dict))}
+
+    def _map_education(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        educations: List[Dict[str, Any]] = self._section(output, 'education', list)
+        return {'educationlist': self._validate(EducationList, {'educations': educations})}
+
+    def _map_experience(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        experiences: List[Dict[str, Any]] = self._section(output, 'work_experience', list)
+        return {'workexperiencelist': self._validate(WorkExperienceList, {'work_experiences': experiences})}
+
+    def _map_yoe(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        # A null total passes validation but means the model skipped the section
+        if output['total_experience_years'] is None:
+            raise ValueError("total_experience_years is missing")
+        yoe = {
+            'total_years': output['total_experience_years'],
+            'career_level': output.get('career_level'),
+            'primary_field': output.get('primary_field')
+        }
+        return {'yoe': self._validate(YearsOfExperience, yoe)}
@@ -0,0 +1,209 @@
+"""
+Deterministic resume section segmenter.
+
+Splits extracted resume text into sections from heading cues, without an LLM
+call. PyMuPDF4LLM renders large fonts as markdown headers and heavy fonts as
+bold, so those are the strongest cues; ALL-CAPS lines and short "Heading:"
+lines cover OCR and plain-text output. Only headings that name a known section
+start a new one, so job titles and company names rendered as headers stay
+inside their section.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from config import EXTRACTION_CONFIG
+
+# Known section names and the headings that introduce them (normalized: lowercase letters and spaces)
+SECTION_ALIASES = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'executive summary', 'profile',
+        'professional profile', 'personal profile', 'career profile', 'objective', 'career objective',
+        'about me', 'about', 'overview', 'personal statement'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core skills', 'soft skills', 'skill set', 'skillset',
+        'core competencies', 'competencies', 'areas of expertise', 'expertise', 'technical proficiencies',
+        'technologies', 'tools', 'it skills', 'computer skills', 'skills and competencies', 'skills summary'
+    ],
+    'work_experience': [
+        'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+        'work history', 'career history', 'professional history', 'relevant experience', 'career',
+        'working experience', 'internships', 'internship experience', 'positions held'
+    ],
+    'education': [
+        'education', 'academic background', 'academic qualifications', 'educational background',
+        'education and training', 'academics', 'qualifications', 'academic history', 'education history'
+    ],
+    'certifications': [
+        'certifications', 'certification', 'certificates', 'licenses', 'licences', 'licenses and certifications',
+        'professional qualifications', 'professional certifications', 'accreditations', 'training', 'courses'
+    ],
+    'projects': [
+        'projects', 'personal projects', 'key projects', 'selected projects', 'academic projects', 'portfolio'
+    ],
+    'languages': ['languages', 'language skills', 'language proficiency', 'language'],
+    'awards': ['awards', 'honors', 'honours', 'achievements', 'awards and honors', 'awards and achievements', 'scholarships'],
+    'volunteer_activities': [
+        'volunteer', 'volunteering', 'volunteer experience', 'volunteer work', 'community service',
+        'extracurricular activities', 'activities', 'leadership and activities'
+    ],
+    'additional_info': [
+        'additional information', 'interests', 'hobbies', 'hobbies and interests', 'references',
+        'publications', 'memberships', 'professional memberships', 'other information', 'miscellaneous'
+    ]
+}
+
+# Confidence of a heading by the cue it was found with
+HEADING_CUE_CONFIDENCE = {
+    'markdown_header': 1.0,
+    'bold': 0.9,
+    'all_caps': 0.8,
+    'colon': 0.6
+}
+
+MAX_HEADING_WORDS = 6
+
+_ALIAS_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+_MARKDOWN_HEADER = re.compile(r'^#{1,6}\s+(.+?)\s*#*$')
+_BOLD_LINE = re.compile(r'^(?:\*\*|__)(.+?)(?:\*\*|__)\s*:?$')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return (len(text or '') + 3) // 4
+
+
+def _normalize_heading(text: str) -> str:
+    text = re.sub(r'[*_`#|]', ' ', text).replace('&', ' and ')
+    return ' '.join(re.findall(r'[a-z]+', text.lower()))
+
+
+class SectionSegmenter:
+    """Heading- and layout-based section segmenter."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or EXTRACTION_CONFIG
+
+    def _match_heading(self, line: str) -> Optional[Tuple[str, float]]:
+        """Return (section, confidence) if a line is a known section heading."""
+        stripped = line.strip()
+        if not stripped or len(stripped) > 80:
+            return None
+
+        markdown = _MARKDOWN_HEADER.match(stripped)
+        bold = _BOLD_LINE.match(stripped)
+        if markdown:
+            cue, heading = 'markdown_header', markdown.group(1)
+        elif bold:
+            cue, heading = 'bold', bold.group(1)
+        elif stripped.endswith(':'):
+            cue, heading = 'colon', stripped[:-1]
+        else:
+            letters = [char for char in stripped if char.isalpha()]
+            if len(letters) < 3 or not all(char.isupper() for char in letters):
+                return None
+            cue, heading = 'all_caps', stripped
+
+        normalized = _normalize_heading(heading)
+        if not normalized or len(normalized.split()) > MAX_HEADING_WORDS:
+            return None
+
+        section = _ALIAS_TO_SECTION.get(normalized)
+        if section is None:
+            # Headings like "Work Experience (2015 - present)" or "Skills & Tools"
+            for alias, candidate in _ALIAS_TO_SECTION.items():
+                if normalized.startswith(alias + ' ') and len(alias.split()) >= len(normalized.split()) - 2:
+                    section = candidate
+                    break
+        if section is None:
+            return None
+
+        return section, HEADING_CUE_CONFIDENCE[cue]
+
+    def segment(self, text: str) -> Dict[str, Any]:
+        """
+        Split resume text into known sections.
+
+        Args:
+            text: Extracted resume text (markdown from PyMuPDF4LLM or plain OCR text)
+
+        Returns:
+            Dictionary with 'sections' (name -> content, confidence, start, end),
+            'headings' found in order and an overall 'confidence' (0.0-1.0)
+        """
+        sections: Dict[str, Dict[str, Any]] = {}
+        headings: List[Dict[str, Any]] = []
+
+        current, current_confidence, current_start = 'personal_info', 1.0, 0
+        buffer: List[str] = []
+        offset = 0
+
+        def flush(end: int):
+            content = '\n'.join(buffer).strip()
+            if not content:
+                return
+            section = sections.setdefault(current, {'content': '', 'confidence': current_confidence, 'start': current_start, 'end': end})
+            # Repeated headings ("Technical Skills", "Soft Skills") accumulate into one section
+            section['content'] = f"{section['content']}\n\n{content}".strip()
+            section['confidence'] = min(section['confidence'], current_confidence)
+            section['end'] = end
+
+        for line in (text or '').splitlines(keepends=True):
+            match = self._match_heading(line)
+            if match:
+                flush(offset)
+                current, current_confidence = match
+                current_start = offset
+                buffer = [line.strip()]
+                headings.append({'section': current, 'heading': line.strip(), 'confidence': current_confidence})
+            else:
+                buffer.append(line.rstrip('\n'))
+            offset += len(line)
+        flush(offset)
+
+        return {
+            'sections': sections,
+            'headings': headings,
+            'confidence': self._overall_confidence(sections, headings)
+        }
+
+    def _overall_confidence(self, sections: Dict[str, Dict[str, Any]], headings: List[Dict[str, Any]]) -> float:
+        """Confidence that the segmentation reflects the resume's real structure."""
+        core_found = sum(1 for name in ('skills', 'work_experience', 'education') if name in sections)
+        if not headings or core_found == 0:
+            return 0.0
+
+        cue_confidence = sum(heading['confidence'] for heading in headings) / len(headings)
+        # Most resumes have at least two of skills / experience / education
+        return round(cue_confidence * min(1.0, 0.5 + core_found / 4), 2)
+
+    def get_extractor_text(
+        self,
+        extractor_name: str,
+        segmentation: Dict[str, Any],
+        fallback_text: str
+    ) -> Tuple[str, str]:
+        """
+        Select the text an extractor should see.
+
+        Args:
+            extractor_name: Extractor key in EXTRACTION_CONFIG['extractor_sections']
+            segmentation: Result of segment()
+            fallback_text: Text to use when segmentation is not confident enough
+
+        Returns:
+            Tuple of (text, source) where source is 'sections' or 'fallback'
+        """
+        section_names = self.config['extractor_sections'].get(extractor_name)
+        if not section_names or segmentation['confidence'] < self.config['min_confidence']:
+            return fallback_text, 'fallback'
+
+        found = [segmentation['sections'][name] for name in section_names if name in segmentation['sections']]
+        if not found or max(section['confidence'] for section in found) < self.config['min_confidence']:
+            return fallback_text, 'fallback'
+
+        # Keep document order so dates and headings read naturally
+        text = '\n\n'.join(section['content'] for section in sorted(found, key=lambda section: section['start']))
+        if len(text) < self.config['min_section_chars']:
+            return fallback_text, 'fallback'
+
+        return text, 'sections'
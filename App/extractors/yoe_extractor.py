@@ -9,6 +9,9 @@ from models import YearsOfExperience
 class YoeExtractor(BaseExtractor):
     """Extractor for years of experience and career level."""
     
+    # Totals and levels are derived, not copied from the text
+    grounded_output = False
+    
     def get_model(self) -> Type[YearsOfExperience]:
         """Get the Pydantic model for YoE extraction."""
         return YearsOfExperience
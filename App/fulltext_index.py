@@ -0,0 +1,212 @@
+"""
+SQLite FTS5 full-text index over the resume pool.
+
+Names, emails, skills, work history (job titles and companies) and the raw
+resume text are indexed for exact keyword lookups that embeddings handle
+poorly: names, rare terms, "who mentioned Bloomberg terminal". Results are
+ranked with BM25 and come with highlighted snippets. VectorDatabaseManager
+writes to the index in a transaction that commits only after the Chroma write
+succeeded, and the index can be rebuilt from the collection at any time.
+"""
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def _fts5_supported() -> bool:
+    try:
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+FTS5_AVAILABLE = _fts5_supported()
+
+# Indexed columns and the resume metadata they are filled from
+COLUMNS = {
+    'name': 'name',
+    'email': 'email',
+    'skills': 'skills',
+    'experience': 'work_experiences',
+    'resume_text': 'raw_resume_text'
+}
+
+# Question words dropped from any-term (OR) queries so they don't dominate the ranking
+STOP_WORDS = frozenset(
+    "a an and any are at be can candidate candidates do does find for from give has have i in is list me "
+    "mentioned of on or show someone the their there to us we what which who whose with".split()
+)
+
+_PHRASE_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def build_match_query(text: str, match_all: bool = True, column: Optional[str] = None) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Quoted parts stay phrases, other words match as prefixes; FTS syntax in the
+    input is never interpreted. Any-term queries skip common question words.
+
+    Args:
+        text: User search text
+        match_all: Require every term (AND) instead of any term (OR, ranked by BM25)
+        column: Restrict the match to one indexed column
+    """
+    terms = []
+    for phrase, word in _PHRASE_PATTERN.findall(text or ''):
+        if phrase:
+            words = _WORD_PATTERN.findall(phrase)
+            if words:
+                terms.append('"' + ' '.join(words) + '"')
+        else:
+            terms.extend(
+                f'"{token}"*' for token in _WORD_PATTERN.findall(word)
+                if match_all or token.lower() not in STOP_WORDS
+            )
+    if not terms:
+        return ''
+
+    query = (' AND ' if match_all else ' OR ').join(terms)
+    return f"{column} : ({query})" if column else query
+
+
+class FullTextWriter:
+    """Stages index changes inside an open transaction."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._db = connection
+
+    def _delete(self, record_id: str):
+        row = self._db.execute("SELECT rowid FROM documents WHERE record_id = ?", (record_id,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM resume_fts WHERE rowid = ?", (row[0],))
+            self._db.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+
+    def apply(self, record_ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Index new records and reindex updated ones."""
+        for record_id, metadata in zip(record_ids, metadatas):
+            self._delete(record_id)
+            rowid = self._db.execute("INSERT INTO documents (record_id) VALUES (?)", (record_id,)).lastrowid
+            self._db.execute(
+                f"INSERT INTO resume_fts (rowid, {', '.join(COLUMNS)}) VALUES (?{', ?' * len(COLUMNS)})",
+                (rowid, *(str(metadata.get(key) or '') for key in COLUMNS.values()))
+            )
+
+    def remove(self, record_ids: List[str]):
+        for record_id in record_ids:
+            self._delete(record_id)
+
+
+class FullTextIndex:
+    """FTS5 index of resume records with BM25 ranking and snippets."""
+
+    def __init__(self, path: Optional[str], weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: SQLite file for the index (None keeps it in memory only)
+            weights: BM25 weight per column (default 1.0)
+        """
+        if not FTS5_AVAILABLE:
+            raise RuntimeError("SQLite was built without FTS5")
+
+        self.weights = [float((weights or {}).get(column, 1.0)) for column in COLUMNS]
+        self._lock = threading.RLock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (rowid INTEGER PRIMARY KEY, record_id TEXT UNIQUE NOT NULL)")
+        self._db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5({', '.join(COLUMNS)}, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._db.commit()
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @contextmanager
+    def transaction(self):
+        """
+        Stage index changes; they are committed when the block exits cleanly and
+        rolled back if it raises (e.g. the Chroma write failed).
+        """
+        with self._lock:
+            try:
+                yield FullTextWriter(self._db)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def clear(self):
+        with self.transaction():
+            self._db.execute("DELETE FROM resume_fts")
+            self._db.execute("DELETE FROM documents")
+
+    def rebuild(self, collection, batch_size: int = 500):
+        """Reindex every record from the collection in one transaction."""
+        with self.transaction() as writer:
+            self._db.execute("DELETE FROM resume_fts")
+            self._db.execute("DELETE FROM documents")
+            offset = 0
+            while True:
+                batch = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+                if not batch['ids']:
+                    break
+                writer.apply(batch['ids'], batch['metadatas'])
+                offset += len(batch['ids'])
+            self._db.execute("INSERT INTO resume_fts (resume_fts) VALUES ('optimize')")
+
+    def search(
+        self,
+        text: str,
+        limit: int = 20,
+        match_all: bool = True,
+        column: Optional[str] = None,
+        snippet_tokens: int = 12
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search.
+
+        Args:
+            text: Words and "quoted phrases" to look for
+            limit: Maximum number of results
+            match_all: Require every term instead of any term
+            column: Restrict the search to one column (e.g. 'name')
+            snippet_tokens: Words per snippet
+
+        Returns:
+            [{'id', 'name', 'email', 'score', 'snippet'}], best match first (higher score is better)
+        """
+        if column is not None and column not in COLUMNS:
+            raise ValueError(f"Unknown full-text column: {column}")
+        query = build_match_query(text, match_all, column)
+        if not query:
+            return []
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT documents.record_id, resume_fts.name, resume_fts.email, "
+                f"bm25(resume_fts, {', '.join('?' * len(self.weights))}) AS rank, "
+                "snippet(resume_fts, -1, '**', '**', ' … ', ?) "
+                "FROM resume_fts JOIN documents ON documents.rowid = resume_fts.rowid "
+                "WHERE resume_fts MATCH ? ORDER BY rank LIMIT ?",
+                (*self.weights, snippet_tokens, query, limit)
+            ).fetchall()
+
+        # bm25() is lower-is-better; flip it so callers can sort descending like similarity scores
+        return [
+            {'id': record_id, 'name': name, 'email': email, 'score': -rank, 'snippet': snippet}
+            for record_id, name, email, rank, snippet in rows
+        ]
@@ -0,0 +1,213 @@
+"""
+Geolocation for resume uploads.
+
+Every upload records where it came from, but the lookup resolves the server's
+own public IP, so the answer rarely changes. The service caches it per process
+with a TTL, and briefly caches failures too, so a slow or unreachable
+provider stalls at most one upload. The reverse lookup (coordinates -> city)
+can be answered offline by a k-d tree over city centroids. Bulk imports pass
+skip=True so no network lookup is made at all.
+
+Both endpoints are configurable, so a local stand-in server can replace
+ipinfo/Nominatim in tests and air-gapped deployments.
+"""
+import csv
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+from config import GEOLOCATION_CONFIG
+from resource_registry import register_resource
+
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def empty_location() -> Dict[str, str]:
+    return {'latlong': '', 'city': '', 'state': '', 'country': ''}
+
+
+def _to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Points on the unit sphere, so Euclidean nearest neighbour = great-circle nearest neighbour."""
+    lat, lon = np.radians(latitudes), np.radians(longitudes)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+class OfflineReverseGeocoder:
+    """Nearest city centroid from a local CSV dataset (k-d tree with scipy, vectorized scan without)."""
+
+    def __init__(self, dataset_path: str, max_distance_km: float):
+        """
+        Args:
+            dataset_path: CSV with columns city, state, country, lat, lon (e.g. converted GeoNames cities15000)
+            max_distance_km: Farther matches are treated as unknown
+        """
+        self.max_distance_km = max_distance_km
+        self.places: List[Tuple[str, str, str]] = []
+        latitudes, longitudes = [], []
+        with open(dataset_path, 'r', encoding='utf-8', newline='') as dataset:
+            for row in csv.DictReader(dataset):
+                try:
+                    latitudes.append(float(row['lat']))
+                    longitudes.append(float(row['lon']))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self.places.append((row.get('city', ''), row.get('state', ''), row.get('country', '')))
+
+        self._points = _to_unit_vectors(np.array(latitudes), np.array(longitudes))
+        self._tree = cKDTree(self._points) if SCIPY_AVAILABLE and self.places else None
+
+    def reverse(self, lat: float, lon: float) -> Optional[Dict[str, str]]:
+        """City, state and country of the nearest centroid, or None if none is close enough."""
+        if not self.places:
+            return None
+
+        point = _to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        if self._tree is not None:
+            chord, index = self._tree.query(point)
+        else:
+            distances = np.linalg.norm(self._points - point, axis=1)
+            index = int(np.argmin(distances))
+            chord = distances[index]
+
+        distance_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+        if distance_km > self.max_distance_km:
+            return None
+        city, state, country = self.places[int(index)]
+        return {'city': city, 'state': state, 'country': country}
+
+
+class GeolocationService:
+    """Cached server geolocation with offline reverse geocoding and a bulk-mode bypass."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or GEOLOCATION_CONFIG
+        self._cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._offline = None
+        self._offline_loaded = False
+        self.hits = 0
+        self.lookups = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def _get_offline(self) -> Optional[OfflineReverseGeocoder]:
+        if not self._offline_loaded:
+            self._offline_loaded = True
+            dataset_path = self.config.get('offline_dataset')
+            if dataset_path:
+                try:
+                    self._offline = OfflineReverseGeocoder(dataset_path, self.config['offline_max_distance_km'])
+                except (OSError, ValueError) as e:
+                    print(f"Offline geocoding dataset unavailable: {e}")
+        return self._offline
+
+    def _cached(self, key: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.time():
+                self.hits += 1
+                return dict(entry[1])
+        return None
+
+    def _store(self, key: str, location: Dict[str, str], ttl: float):
+        with self._lock:
+            self._cache[key] = (time.time() + ttl, dict(location))
+
+    def _lookup_ip(self) -> Dict[str, Any]:
+        """Coordinates (and the provider's own place names) of the server's public IP."""
+        response = requests.get(self.config['ip_endpoint'], timeout=self.config['timeout'])
+        response.raise_for_status()
+        data = response.json()
+        lat, lon = (float(value) for value in data['loc'].split(','))
+        return {'lat': lat, 'lon': lon, 'city': data.get('city', ''), 'state': data.get('region', ''), 'country': data.get('country', '')}
+
+    def _reverse_online(self, lat: float, lon: float) -> Optional[Dict[str, str]]:
+        response = requests.get(
+            self.config['reverse_endpoint'],
+            params={'lat': lat, 'lon': lon, 'format': 'jsonv2', 'accept-language': 'en'},
+            headers={'User-Agent': self.config['user_agent']},
+            timeout=self.config['timeout']
+        )
+        response.raise_for_status()
+        address = response.json().get('address') or {}
+        if not address:
+            return None
+        return {
+            'city': address.get('city') or address.get('town') or address.get('village', ''),
+            'state': address.get('state', ''),
+            'country': address.get('country', '')
+        }
+
+    def reverse_geocode(self, lat: float, lon: float) -> Optional[Dict[str, str]]:
+        """City/state/country for coordinates: offline dataset first, then the online endpoint."""
+        offline = self._get_offline()
+        if offline is not None:
+            place = offline.reverse(lat, lon)
+            if place is not None or not self.config.get('online_fallback', True):
+                return place
+        if not self.config.get('reverse_endpoint'):
+            return None
+        return self._reverse_online(lat, lon)
+
+    def locate(self, skip: bool = False) -> Dict[str, str]:
+        """
+        Location of this server for upload records.
+
+        Args:
+            skip: Don't make network calls (bulk imports); a cached location is still returned
+
+        Returns:
+            {'latlong', 'city', 'state', 'country'} (empty strings when unknown)
+        """
+        cached = self._cached('server')
+        if cached is not None:
+            return cached
+
+        if skip or not self.config.get('enabled', True):
+            self.skipped += 1
+            return empty_location()
+
+        self.lookups += 1
+        try:
+            ip_location = self._lookup_ip()
+            place = self.reverse_geocode(ip_location['lat'], ip_location['lon']) or ip_location
+            location = {
+                'latlong': str([ip_location['lat'], ip_location['lon']]),
+                'city': place.get('city', ''),
+                'state': place.get('state', ''),
+                'country': place.get('country', '')
+            }
+            self._store('server', location, self.config['ttl_seconds'])
+            return location
+        except Exception as e:
+            # Remember the failure briefly so an unreachable provider doesn't stall every upload
+            self.failures += 1
+            print(f"Geolocation lookup failed: {e}")
+            self._store('server', empty_location(), self.config['failure_ttl_seconds'])
+            return empty_location()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'cache_hits': self.hits,
+            'lookups': self.lookups,
+            'skipped': self.skipped,
+            'failures': self.failures,
+            'offline_dataset': self._offline is not None
+        }
+
+
+# Global geolocation service, created lazily on first use
+geolocation_service = register_resource('geolocation', GeolocationService)
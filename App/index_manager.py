@@ -0,0 +1,364 @@
+"""
+HNSW index management for the ChromaDB collections.
+
+Sets the HNSW parameters (distance space, M, ef_construction, ef_search) used
+when collections are created, records them per collection, rebuilds/compacts
+a collection offline from its stored embeddings, and benchmarks recall@k of
+the approximate index against exact brute-force search on the live data.
+
+Usage:
+    python index_manager.py show
+    python index_manager.py benchmark --collection resume_data --k 10 --queries 100
+    python index_manager.py rebuild --collection resume_data --space cosine --M 32 --ef-construction 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from config import CHROMA_CONFIG
+
+# Chroma's defaults, used when a collection does not report its parameters
+DEFAULT_HNSW_PARAMS = {
+    'space': 'l2',
+    'max_neighbors': 16,
+    'ef_construction': 100,
+    'ef_search': 100
+}
+
+# Legacy metadata keys understood by every Chroma version
+HNSW_METADATA_KEYS = {
+    'space': 'hnsw:space',
+    'max_neighbors': 'hnsw:M',
+    'ef_construction': 'hnsw:construction_ef',
+    'ef_search': 'hnsw:search_ef'
+}
+
+
+def get_configured_params(collection_name: str) -> Dict[str, Any]:
+    """Get the HNSW parameters configured for a collection (defaults plus per-collection overrides)."""
+    hnsw_config = CHROMA_CONFIG.get('hnsw', {})
+    params = dict(DEFAULT_HNSW_PARAMS)
+    params.update({key: value for key, value in hnsw_config.items() if key in DEFAULT_HNSW_PARAMS})
+    params.update(hnsw_config.get('collections', {}).get(collection_name, {}))
+    return params
+
+
+def params_to_metadata(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert HNSW parameters to collection-creation metadata."""
+    return {HNSW_METADATA_KEYS[key]: value for key, value in params.items() if key in HNSW_METADATA_KEYS}
+
+
+def get_collection_params(collection) -> Dict[str, Any]:
+    """Read the HNSW parameters a collection was actually built with."""
+    params = dict(DEFAULT_HNSW_PARAMS)
+
+    # Chroma >= 1.0 exposes a configuration dict
+    configuration = getattr(collection, 'configuration', None)
+    hnsw = configuration.get('hnsw') if isinstance(configuration, dict) else None
+    if hnsw:
+        params.update({key: hnsw[key] for key in DEFAULT_HNSW_PARAMS if hnsw.get(key) is not None})
+        return params
+
+    metadata = collection.metadata or {}
+    for key, metadata_key in HNSW_METADATA_KEYS.items():
+        if metadata.get(metadata_key) is not None:
+            params[key] = metadata[metadata_key]
+    return params
+
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """
+    Convert a Chroma distance to a cosine similarity in [0, 1].
+
+    Assumes unit-normalized embeddings (true for the configured MiniLM backends),
+    for which squared L2 distance is 2 - 2*cos and inner-product distance is 1 - cos.
+    """
+    if space == 'l2':
+        similarity = 1.0 - distance / 2.0
+    else:  # 'cosine' and 'ip' distances are both 1 - similarity
+        similarity = 1.0 - distance
+    return min(1.0, max(0.0, similarity))
+
+
+def backup_collection_name(collection_name: str) -> str:
+    """Name the original collection is kept under while a rebuild swaps in the new one."""
+    return f"{collection_name}__previous"
+
+
+def restore_interrupted_rebuild(client, collection_name: str) -> bool:
+    """
+    Move a collection back under its name if a rebuild stopped mid-swap.
+
+    Returns:
+        True if the original collection was restored
+    """
+    try:
+        client.get_collection(name=collection_name)
+        return False
+    except Exception:
+        pass
+    try:
+        backup = client.get_collection(name=backup_collection_name(collection_name))
+    except Exception:
+        return False
+    backup.modify(name=collection_name)
+    return True
+
+
+class IndexManager:
+    """Inspect, rebuild and benchmark HNSW indexes of the vector database."""
+
+    def __init__(self, db=None):
+        if db is None:
+            from database import db_manager
+            db = db_manager
+        self.db = db
+        self.registry_path = os.path.join(CHROMA_CONFIG['persist_directory'], 'index_registry.json')
+
+    # --- Parameter registry ---
+
+    def _load_registry(self) -> Dict[str, Any]:
+        if not os.path.exists(self.registry_path):
+            return {}
+        with open(self.registry_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _record(self, collection_name: str, **entries):
+        """Record parameters/benchmark results for a collection in the registry file."""
+        registry = self._load_registry()
+        registry.setdefault(collection_name, {}).update(entries)
+        with open(self.registry_path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f, indent=2)
+
+    def _get_collection(self, collection_name: str):
+        return self.db.client.get_collection(name=collection_name, embedding_function=self.db.embedding_function)
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Get actual parameters, size and last recorded benchmark for every collection."""
+        registry = self._load_registry()
+        description = {}
+        for collection_name in (CHROMA_CONFIG['collection_name_resumes'], CHROMA_CONFIG['collection_name_feedback']):
+            collection = self._get_collection(collection_name)
+            params = get_collection_params(collection)
+            description[collection_name] = {
+                'params': params,
+                'configured_params': get_configured_params(collection_name),
+                'count': collection.count(),
+                **{key: value for key, value in registry.get(collection_name, {}).items() if key != 'params'}
+            }
+            self._record(collection_name, params=params)
+        return description
+
+    def set_search_ef(self, collection_name: str, ef_search: int) -> bool:
+        """Change ef_search in place (Chroma >= 1.0); older versions need a rebuild."""
+        collection = self._get_collection(collection_name)
+        try:
+            collection.modify(configuration={'hnsw': {'ef_search': ef_search}})
+        except Exception as e:
+            print(f"⚠️ ef_search cannot be changed in place ({e}); use rebuild instead")
+            return False
+
+        self._record(collection_name, params=get_collection_params(collection))
+        return True
+
+    # --- Offline rebuild / compaction ---
+
+    def rebuild(self, collection_name: str, params: Optional[Dict[str, Any]] = None, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Rebuild a collection's index from its stored embeddings (no re-embedding).
+
+        Rebuilding with unchanged parameters compacts the index (drops deleted
+        elements). Run it while nothing else is writing to the collection.
+
+        Args:
+            collection_name: Collection to rebuild
+            params: HNSW parameters for the new index (configured parameters if None)
+            batch_size: Records copied per batch
+
+        Returns:
+            Summary with record count, parameters and elapsed time
+        """
+        start = time.perf_counter()
+        client = self.db.client
+        source = self._get_collection(collection_name)
+        params = dict(get_configured_params(collection_name), **(params or {}))
+
+        temp_name = f"{collection_name}__rebuild"
+        # Leftovers of an earlier run (source is live, so a backup copy is redundant)
+        for leftover in (temp_name, backup_collection_name(collection_name)):
+            try:
+                client.delete_collection(name=leftover)
+            except Exception:
+                pass
+
+        metadata = {key: value for key, value in (source.metadata or {}).items() if not key.startswith('hnsw:')}
+        metadata.update(params_to_metadata(params))
+        target = client.create_collection(
+            name=temp_name,
+            embedding_function=self.db.embedding_function,
+            metadata=metadata
+        )
+
+        total = source.count()
+        for offset in range(0, total, batch_size):
+            page = source.get(limit=batch_size, offset=offset, include=['embeddings', 'documents', 'metadatas'])
+            if not page['ids']:
+                break
+            target.add(
+                ids=page['ids'],
+                embeddings=page['embeddings'],
+                documents=page['documents'],
+                metadatas=page['metadatas']
+            )
+
+        if target.count() != total:
+            client.delete_collection(name=temp_name)
+            raise RuntimeError(f"Rebuild copied {target.count()} of {total} records; original collection kept")
+
+        # Swap the rebuilt collection in; the original is kept under the backup name until the rename succeeds
+        backup_name = backup_collection_name(collection_name)
+        source.modify(name=backup_name)
+        try:
+            target.modify(name=collection_name)
+        except Exception:
+            source.modify(name=collection_name)
+            raise
+        client.delete_collection(name=backup_name)
+        self.db.refresh_collections()
+
+        summary = {
+            'records': total,
+            'params': params,
+            'rebuilt_at': datetime.now().isoformat(),
+            'seconds': round(time.perf_counter() - start, 2)
+        }
+        self._record(collection_name, params=params, last_rebuild=summary)
+        return summary
+
+    # --- Recall / latency benchmark ---
+
+    def _load_embeddings(self, collection, batch_size: int = 1000):
+        ids: List[str] = []
+        embeddings = []
+        total = collection.count()
+        for offset in range(0, total, batch_size):
+            page = collection.get(limit=batch_size, offset=offset, include=['embeddings'])
+            ids.extend(page['ids'])
+            embeddings.extend(page['embeddings'])
+        return ids, np.asarray(embeddings, dtype=np.float32)
+
+    @staticmethod
+    def _exact_distances(queries: np.ndarray, vectors: np.ndarray, space: str) -> np.ndarray:
+        if space == 'l2':
+            return (
+                np.sum(queries ** 2, axis=1, keepdims=True)
+                - 2 * queries @ vectors.T
+                + np.sum(vectors ** 2, axis=1)
+            )
+        if space == 'cosine':
+            queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return 1.0 - queries @ vectors.T
+
+    def benchmark(self, collection_name: str, k: int = 10, n_queries: int = 100, seed: int = 0) -> Dict[str, Any]:
+        """
+        Measure recall@k of the HNSW index against brute force, plus query latency.
+
+        Queries are stored embeddings sampled from the collection itself.
+
+        Returns:
+            Recall, latency percentiles (ms) and the parameters benchmarked
+        """
+        collection = self._get_collection(collection_name)
+        params = get_collection_params(collection)
+        ids, vectors = self._load_embeddings(collection)
+        if len(ids) == 0:
+            return {'error': 'collection is empty'}
+
+        k = min(k, len(ids))
+        rng = np.random.default_rng(seed)
+        query_rows = rng.choice(len(ids), size=min(n_queries, len(ids)), replace=False)
+        queries = vectors[query_rows]
+
+        brute_start = time.perf_counter()
+        exact = np.argsort(self._exact_distances(queries, vectors, params['space']), axis=1)[:, :k]
+        brute_ms = (time.perf_counter() - brute_start) * 1000 / len(queries)
+
+        recalls = []
+        latencies = []
+        for query, exact_rows in zip(queries, exact):
+            query_start = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+            latencies.append((time.perf_counter() - query_start) * 1000)
+
+            exact_ids = {ids[row] for row in exact_rows}
+            recalls.append(len(exact_ids & set(result['ids'][0])) / k)
+
+        summary = {
+            'k': k,
+            'queries': len(queries),
+            'records': len(ids),
+            'recall_at_k': round(float(np.mean(recalls)), 4),
+            'latency_ms_p50': round(float(np.percentile(latencies, 50)), 3),
+            'latency_ms_p95': round(float(np.percentile(latencies, 95)), 3),
+            'brute_force_ms_per_query': round(brute_ms, 3),
+            'params': params,
+            'measured_at': datetime.now().isoformat()
+        }
+        self._record(collection_name, params=params, last_benchmark=summary)
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage ChromaDB HNSW indexes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('show', help="Show index parameters per collection")
+
+    benchmark_parser = subparsers.add_parser('benchmark', help="Measure recall@k and latency")
+    benchmark_parser.add_argument('--collection', default=CHROMA_CONFIG['collection_name_resumes'])
+    benchmark_parser.add_argument('--k', type=int, default=10)
+    benchmark_parser.add_argument('--queries', type=int, default=100)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="Rebuild/compact a collection index offline")
+    rebuild_parser.add_argument('--collection', default=CHROMA_CONFIG['collection_name_resumes'])
+    rebuild_parser.add_argument('--space', choices=['l2', 'cosine', 'ip'])
+    rebuild_parser.add_argument('--M', type=int, dest='max_neighbors')
+    rebuild_parser.add_argument('--ef-construction', type=int, dest='ef_construction')
+    rebuild_parser.add_argument('--ef-search', type=int, dest='ef_search')
+
+    ef_parser = subparsers.add_parser('set-ef', help="Change ef_search in place")
+    ef_parser.add_argument('--collection', default=CHROMA_CONFIG['collection_name_resumes'])
+    ef_parser.add_argument('ef_search', type=int)
+
+    args = parser.parse_args()
+    manager = IndexManager()
+
+    if args.command == 'show':
+        print(json.dumps(manager.describe(), indent=2))
+    elif args.command == 'benchmark':
+        print(f"🔧 Benchmarking {args.collection} (k={args.k}, queries={args.queries})...")
+        print(json.dumps(manager.benchmark(args.collection, k=args.k, n_queries=args.queries), indent=2))
+    elif args.command == 'rebuild':
+        overrides = {
+            key: getattr(args, key)
+            for key in ('space', 'max_neighbors', 'ef_construction', 'ef_search')
+            if getattr(args, key) is not None
+        }
+        print(f"🔄 Rebuilding {args.collection} with {overrides or 'configured parameters'}...")
+        print(json.dumps(manager.rebuild(args.collection, overrides), indent=2))
+    elif args.command == 'set-ef':
+        if manager.set_search_ef(args.collection, args.ef_search):
+            print(f"✅ ef_search for {args.collection} set to {args.ef_search}")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,175 @@
+"""
+Tolerant JSON parsing for LLM output.
+
+LLMs wrap JSON in markdown fences, add prose around it, leave trailing commas,
+write Python literals (True/None) or stop mid-object when they hit the token
+limit. ``StreamingJSONParser`` consumes output chunk by chunk, tracks string
+and bracket state, knows when the top-level value is complete and can close a
+truncated value at the last complete member. ``repair_json`` runs it over a
+whole response.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {'{': '}', '[': ']'}
+_PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+# Control characters are invalid raw inside JSON strings; models copy them from PDF text
+_CONTROL_ESCAPES = {'\n': '\\n', '\t': '\\t', '\r': '\\r', '\b': '\\b', '\f': '\\f'}
+
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON value can be recovered from the text."""
+
+
+class StreamingJSONParser:
+    """Incremental, repairing parser for the first JSON object/array in LLM output."""
+
+    def __init__(self):
+        self._chars: List[str] = []  # Normalized JSON text of the value seen so far
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._word = ''
+        self._started = False
+        self.complete = False
+        # (length of normalized text, open containers) after each complete member
+        self._cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume a chunk of LLM output.
+
+        Returns:
+            True once the top-level JSON value is complete (later text is ignored)
+        """
+        for char in chunk or '':
+            if self.complete:
+                break
+            self._feed_char(char)
+        return self.complete
+
+    def _feed_char(self, char: str):
+        if not self._started:
+            # Skip prose and markdown fences before the value
+            if char in _CLOSERS:
+                self._started = True
+                self._open(char)
+            return
+
+        if self._in_string:
+            if char < ' ':
+                # Escape raw tabs, CR/LF and other control characters
+                self._chars.append(_CONTROL_ESCAPES.get(char) or f'\\u{ord(char):04x}')
+                self._escape = False
+                return
+            self._chars.append(char)
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return
+
+        if char.isalpha() or (self._word and char.isalnum()):
+            self._word += char
+            return
+        self._flush_word()
+
+        if char == '"':
+            self._in_string = True
+            self._chars.append(char)
+        elif char in _CLOSERS:
+            self._open(char)
+        elif char in '}]':
+            self._close(char)
+        elif char == ',':
+            self._strip_trailing_comma()
+            self._cut_points.append((len(self._chars), tuple(self._stack)))
+            self._chars.append(char)
+        elif not char.isspace() or self._chars[-1:] != [' ']:
+            self._chars.append(' ' if char.isspace() else char)
+
+    def _flush_word(self):
+        if self._word:
+            self._chars.append(_PYTHON_LITERALS.get(self._word, self._word))
+            self._word = ''
+
+    def _open(self, char: str):
+        self._stack.append(char)
+        self._chars.append(char)
+        self._cut_points.append((len(self._chars), tuple(self._stack)))
+
+    def _close(self, char: str):
+        if not self._stack or _CLOSERS[self._stack[-1]] != char:
+            # Stray closer: ignore it
+            return
+        self._strip_trailing_comma()
+        self._stack.pop()
+        self._chars.append(char)
+        if not self._stack:
+            self.complete = True
+        else:
+            self._cut_points.append((len(self._chars), tuple(self._stack)))
+
+    def _strip_trailing_comma(self):
+        while self._chars and self._chars[-1] in (' ', ','):
+            self._chars.pop()
+
+    @property
+    def text(self) -> str:
+        """Normalized JSON text seen so far (may be incomplete)."""
+        return ''.join(self._chars) + self._word
+
+    def result(self) -> Any:
+        """
+        Parse the value, closing it at the last complete member if the output was truncated.
+
+        Raises:
+            JSONRepairError: If no JSON value can be recovered
+        """
+        if not self._started:
+            raise JSONRepairError("No JSON object or array found")
+
+        text = self.text
+        if self.complete:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError as e:
+                raise JSONRepairError(f"Invalid JSON: {e}") from e
+
+        # Truncated: first try closing the open string and containers as they are
+        candidate = text
+        if self._in_string:
+            candidate = (candidate[:-1] if self._escape else candidate) + '"'
+        parsed = self._try_close(candidate, tuple(self._stack))
+        if parsed is not None:
+            return parsed
+
+        # Otherwise back off to the last complete member
+        for length, stack in reversed(self._cut_points):
+            parsed = self._try_close(text[:length].rstrip(' ,'), stack)
+            if parsed is not None:
+                return parsed
+
+        raise JSONRepairError("Could not repair truncated JSON")
+
+    @staticmethod
+    def _try_close(text: str, stack: Tuple[str, ...]) -> Optional[Any]:
+        closing = ''.join(_CLOSERS[char] for char in reversed(stack))
+        try:
+            return json.loads(text.rstrip(' ,') + closing)
+        except json.JSONDecodeError:
+            return None
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parse the first JSON object/array in LLM output, repairing common defects.
+
+    Raises:
+        JSONRepairError: If no JSON value can be recovered
+    """
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    return parser.result()
@@ -0,0 +1,250 @@
+"""
+Record-and-replay LLM provider for deterministic offline runs.
+
+In ``record`` mode the replay LLM wraps a live provider and stores every
+prompt/response pair (together with the observed latency) in a JSONL file.
+In ``replay`` mode responses are served from that file, optionally sleeping
+according to a latency distribution, so the whole pipeline can run without a
+model server. A prompt that was never recorded raises ``ReplayMissError``.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    MESSAGES_AVAILABLE = True
+except ImportError:
+    MESSAGES_AVAILABLE = False
+
+
+class ReplayMissError(LookupError):
+    """Raised when replay mode has no recorded response for a prompt."""
+
+    def __init__(self, model_name: str, prompt_key: str, store_path: str):
+        self.model_name = model_name
+        self.prompt_key = prompt_key
+        self.store_path = store_path
+        super().__init__(
+            f"No recorded response for model '{model_name}' (prompt key {prompt_key[:12]}) "
+            f"in {store_path}. Run once with LLM_CONFIG['replay']['mode'] = 'record' to capture it."
+        )
+
+
+def serialize_prompt(prompt: Any) -> str:
+    """Turn a string prompt or a list of chat messages into stable text."""
+    if isinstance(prompt, str):
+        return prompt
+
+    parts = []
+    for message in prompt:
+        role = getattr(message, 'type', message.__class__.__name__)
+        content = getattr(message, 'content', str(message))
+        parts.append(f"{role}: {content}")
+    return "\n".join(parts)
+
+
+def make_prompt_key(model_name: str, prompt: Any) -> str:
+    """Hash model name and prompt text into the store key."""
+    payload = json.dumps([model_name, serialize_prompt(prompt)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReplayStore:
+    """Append-only JSONL store of recorded prompt/response pairs."""
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """Load existing recordings; later lines win for repeated keys."""
+        if not os.path.exists(self.store_path):
+            return
+
+        with open(self.store_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'key' in record and 'response' in record:
+                    self._records[record['key']] = record
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the recording for a key, counting hits and misses."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return record
+
+    def put(self, key: str, model_name: str, prompt: Any, response: str, latency: float):
+        """Persist a new recording."""
+        record = {
+            'key': key,
+            'model': model_name,
+            'prompt': serialize_prompt(prompt),
+            'response': response,
+            'latency': round(latency, 4),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        with self._lock:
+            directory = os.path.dirname(self.store_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.store_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._records[key] = record
+
+    def get_models(self) -> List[str]:
+        """Get the model names that have recordings."""
+        with self._lock:
+            return sorted({record.get('model', '') for record in self._records.values()})
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store size and hit/miss counters."""
+        with self._lock:
+            return {
+                'store_path': self.store_path,
+                'recordings': len(self._records),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+_stores: Dict[str, ReplayStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_replay_store(store_path: str) -> ReplayStore:
+    """Get the shared store for a path so all LLMs append to one file."""
+    store_path = os.path.abspath(store_path)
+    with _stores_lock:
+        if store_path not in _stores:
+            _stores[store_path] = ReplayStore(store_path)
+        return _stores[store_path]
+
+
+class LatencySimulator:
+    """Sample simulated latencies for replayed responses."""
+
+    def __init__(self, latency_config: Optional[Dict[str, Any]] = None):
+        self.config = latency_config or {}
+        self.distribution = self.config.get('distribution', 'none')
+        self._random = random.Random(self.config.get('seed'))
+
+    def sample(self, recorded_latency: Optional[float] = None) -> float:
+        """Return a delay in seconds for one response."""
+        distribution = self.distribution
+        if distribution == 'none':
+            return 0.0
+
+        if distribution == 'recorded':
+            delay = recorded_latency or 0.0
+        elif distribution == 'fixed':
+            delay = self.config.get('fixed_seconds', 0.0)
+        elif distribution == 'uniform':
+            delay = self._random.uniform(self.config.get('min_seconds', 0.0), self.config.get('max_seconds', 1.0))
+        elif distribution == 'normal':
+            delay = self._random.gauss(self.config.get('mean_seconds', 1.0), self.config.get('std_seconds', 0.2))
+        elif distribution == 'lognormal':
+            delay = self._random.lognormvariate(self.config.get('mu', 0.0), self.config.get('sigma', 0.5))
+        else:
+            raise ValueError(f"Unknown replay latency distribution: {distribution}")
+
+        return max(0.0, delay * self.config.get('scale', 1.0))
+
+
+class ReplayLLM:
+    """
+    Drop-in stand-in for OllamaLLM/ChatOllama/ChatOpenAI.
+
+    With ``chat=True`` responses are returned as AI messages (like chat models),
+    otherwise as plain strings (like OllamaLLM).
+    """
+
+    def __init__(self, model_name: str, replay_config: Dict[str, Any],
+                 live_llm: Any = None, chat: bool = False):
+        self.model_name = model_name
+        self.mode = replay_config.get('mode', 'replay')
+        self.chat = chat
+        self.live_llm = live_llm
+        self.store = get_replay_store(replay_config['store_path'])
+        self.latency = LatencySimulator(replay_config.get('latency'))
+
+        if self.mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown replay mode: {self.mode}")
+        if self.mode == 'record' and live_llm is None:
+            raise ValueError("Replay provider in record mode needs a live LLM to record from")
+
+    def _wrap(self, text: str, chunk: bool = False) -> Any:
+        """Return text in the shape the wrapped provider would."""
+        if not self.chat or not MESSAGES_AVAILABLE:
+            return text
+        return AIMessageChunk(content=text) if chunk else AIMessage(content=text)
+
+    @staticmethod
+    def _text_of(response: Any) -> str:
+        return response.content if hasattr(response, 'content') else str(response)
+
+    def _lookup(self, prompt: Any) -> Dict[str, Any]:
+        key = make_prompt_key(self.model_name, prompt)
+        record = self.store.get(key)
+        if record is None:
+            raise ReplayMissError(self.model_name, key, self.store.store_path)
+        return record
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        """Return the recorded (or freshly recorded) response for a prompt."""
+        if self.mode == 'record':
+            start = time.perf_counter()
+            response = self.live_llm.invoke(prompt, **kwargs)
+            text = self._text_of(response)
+            self.store.put(make_prompt_key(self.model_name, prompt), self.model_name,
+                           prompt, text, time.perf_counter() - start)
+            return self._wrap(text)
+
+        record = self._lookup(prompt)
+        delay = self.latency.sample(record.get('latency'))
+        if delay:
+            time.sleep(delay)
+        return self._wrap(record['response'])
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[Any]:
+        """Stream the recorded response in word-sized chunks."""
+        if self.mode == 'record':
+            start = time.perf_counter()
+            parts: List[str] = []
+            for chunk in self.live_llm.stream(prompt, **kwargs):
+                text = self._text_of(chunk)
+                parts.append(text)
+                yield self._wrap(text, chunk=True)
+            self.store.put(make_prompt_key(self.model_name, prompt), self.model_name,
+                           prompt, "".join(parts), time.perf_counter() - start)
+            return
+
+        record = self._lookup(prompt)
+        chunks = re.findall(r'\S+\s*|\s+', record['response']) or [record['response']]
+        delay = self.latency.sample(record.get('latency')) / len(chunks)
+        for text in chunks:
+            if delay:
+                time.sleep(delay)
+            yield self._wrap(text, chunk=True)
@@ -0,0 +1,261 @@
+"""
+Priority-aware scheduler for LLM requests.
+
+Every LLM call from LLMService and the chatbot specialists takes a slot for
+its model first. Slots are capped per model, waiting requests are served
+strictly by priority class (interactive chat > single upload > bulk/backfill)
+and part of each model's capacity is reserved for interactive requests, so a
+batch upload cannot occupy every slot the chat needs.
+
+The priority of a request comes from the ``request_priority`` context, falling
+back to the caller's default (specialists: interactive, LLMService: upload).
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import SCHEDULER_CONFIG
+from resource_registry import register_resource
+
+PRIORITIES = {'interactive': 0, 'upload': 1, 'bulk': 2}
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('llm_request_priority', default=None)
+_current_cancel_token: contextvars.ContextVar = contextvars.ContextVar('llm_cancel_token', default=None)
+
+
+class LLMRequestCancelled(Exception):
+    """Raised in a request whose cancel token was cancelled while queued or streaming."""
+
+
+class CancelToken:
+    """Cancels every request started under it (queued ones immediately, streams at the next chunk)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+        llm_scheduler.wake_all()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@contextmanager
+def request_priority(priority: str):
+    """Run the enclosed LLM calls with a priority class ('interactive', 'upload' or 'bulk')."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def cancel_scope():
+    """Attach a new CancelToken to the enclosed LLM calls and yield it."""
+    cancel_token = CancelToken()
+    token = _current_cancel_token.set(cancel_token)
+    try:
+        yield cancel_token
+    finally:
+        _current_cancel_token.reset(token)
+
+
+class _Waiter:
+    __slots__ = ('priority', 'event', 'granted', 'cancel_token', 'enqueued_at')
+
+    def __init__(self, priority: str, cancel_token: Optional[CancelToken]):
+        self.priority = priority
+        self.event = threading.Event()
+        self.granted = False
+        self.cancel_token = cancel_token
+        self.enqueued_at = time.perf_counter()
+
+
+class _ModelQueue:
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        self.waiters: List[Any] = []  # heap of (priority rank, sequence, _Waiter)
+
+
+class LLMScheduler:
+    """Per-model slot scheduler with priority classes, an interactive reserve and cancellation."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or SCHEDULER_CONFIG
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._sequence = itertools.count()
+        self._wait_times = {name: deque(maxlen=self.config.get('metrics_window', 500)) for name in PRIORITIES}
+        self._completed = {name: 0 for name in PRIORITIES}
+        self._cancelled = {name: 0 for name in PRIORITIES}
+
+    def _queue(self, model_name: str) -> _ModelQueue:
+        queue = self._queues.get(model_name)
+        if queue is None:
+            cap = self.config.get('model_max_concurrency', {}).get(
+                model_name, self.config.get('default_max_concurrency', 2)
+            )
+            queue = self._queues[model_name] = _ModelQueue(max(1, cap))
+        return queue
+
+    def _limit(self, queue: _ModelQueue, priority: str) -> int:
+        """Slots a priority class may occupy (non-interactive classes leave the reserve free)."""
+        if priority == 'interactive':
+            return queue.max_concurrency
+        reserve = self.config.get('interactive_reserve', 1)
+        return max(1, queue.max_concurrency - reserve)
+
+    def _dispatch(self, queue: _ModelQueue):
+        """Grant slots to waiters in priority order (lock must be held)."""
+        while queue.waiters:
+            waiter = queue.waiters[0][2]
+            if waiter.cancel_token and waiter.cancel_token.cancelled:
+                heapq.heappop(queue.waiters)
+                waiter.event.set()
+                continue
+            if queue.running >= self._limit(queue, waiter.priority):
+                # Strict priority: lower classes never overtake a blocked higher one
+                return
+            heapq.heappop(queue.waiters)
+            queue.running += 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def acquire(self, model_name: str, priority: str, cancel_token: Optional[CancelToken] = None):
+        """Block until a slot for the model is granted."""
+        waiter = _Waiter(priority, cancel_token)
+        with self._lock:
+            queue = self._queue(model_name)
+            heapq.heappush(queue.waiters, (PRIORITIES[priority], next(self._sequence), waiter))
+            self._dispatch(queue)
+
+        timeout = self.config.get('queue_timeout')
+        deadline = time.perf_counter() + timeout if timeout else None
+        while not waiter.event.wait(0.5):
+            expired = deadline is not None and time.perf_counter() > deadline
+            if expired or (cancel_token and cancel_token.cancelled):
+                with self._lock:
+                    if waiter.granted:
+                        break
+                    self._remove_waiter(queue, waiter)
+                if expired:
+                    raise TimeoutError(f"Timed out waiting for a {model_name} slot ({priority})")
+                break
+
+        if not waiter.granted:
+            with self._lock:
+                self._cancelled[priority] += 1
+            raise LLMRequestCancelled(f"{priority} request for {model_name} cancelled while queued")
+
+        with self._lock:
+            self._wait_times[priority].append(time.perf_counter() - waiter.enqueued_at)
+
+    @staticmethod
+    def _remove_waiter(queue: _ModelQueue, waiter: _Waiter):
+        """Drop a waiter from its queue (lock must be held)."""
+        queue.waiters = [entry for entry in queue.waiters if entry[2] is not waiter]
+        heapq.heapify(queue.waiters)
+        waiter.event.set()
+
+    def release(self, model_name: str, priority: str):
+        with self._lock:
+            queue = self._queue(model_name)
+            queue.running -= 1
+            self._completed[priority] += 1
+            self._dispatch(queue)
+
+    def wake_all(self):
+        """Drop cancelled waiters from every queue and re-dispatch."""
+        with self._lock:
+            for queue in self._queues.values():
+                for _, _, waiter in list(queue.waiters):
+                    if waiter.cancel_token and waiter.cancel_token.cancelled:
+                        self._remove_waiter(queue, waiter)
+                self._dispatch(queue)
+
+    @contextmanager
+    def slot(self, model_name: str, default_priority: str = 'upload'):
+        """
+        Hold a slot for one LLM request.
+
+        Args:
+            model_name: Model the request runs on (caps are per model)
+            default_priority: Priority class when no request_priority context is active
+
+        Yields:
+            The request's CancelToken (None outside a cancel_scope)
+        """
+        priority = _current_priority.get() or default_priority
+        cancel_token = _current_cancel_token.get()
+        if cancel_token and cancel_token.cancelled:
+            raise LLMRequestCancelled(f"{priority} request for {model_name} cancelled")
+
+        self.acquire(model_name, priority, cancel_token)
+        try:
+            yield cancel_token
+        finally:
+            self.release(model_name, priority)
+
+    def run(self, model_name: str, request: Callable[[], Any], default_priority: str = 'upload') -> Any:
+        """Run a blocking request inside a slot."""
+        with self.slot(model_name, default_priority):
+            return request()
+
+    def stream(self, model_name: str, request: Callable[[], Iterable[Any]], default_priority: str = 'upload') -> Iterator[Any]:
+        """Stream a request inside a slot, stopping at the next chunk if it is cancelled."""
+        priority = _current_priority.get() or default_priority
+        with self.slot(model_name, priority) as cancel_token:
+            for chunk in request():
+                if cancel_token and cancel_token.cancelled:
+                    with self._lock:
+                        self._cancelled[priority] += 1
+                    raise LLMRequestCancelled(f"Stream from {model_name} cancelled")
+                yield chunk
+
+    @staticmethod
+    def _percentile(values: List[float], percentile: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depths, running requests and queue wait percentiles per priority class."""
+        with self._lock:
+            models = {}
+            for model_name, queue in self._queues.items():
+                depth = {name: 0 for name in PRIORITIES}
+                for _, _, waiter in queue.waiters:
+                    depth[waiter.priority] += 1
+                models[model_name] = {
+                    'running': queue.running,
+                    'max_concurrency': queue.max_concurrency,
+                    'queued': depth
+                }
+
+            priorities = {}
+            for name in PRIORITIES:
+                waits = list(self._wait_times[name])
+                priorities[name] = {
+                    'completed': self._completed[name],
+                    'cancelled': self._cancelled[name],
+                    'wait_p50_seconds': self._percentile(waits, 0.5),
+                    'wait_p95_seconds': self._percentile(waits, 0.95)
+                }
+
+            return {'models': models, 'priorities': priorities}
+
+
+# Global scheduler, created lazily on first use
+llm_scheduler = register_resource('llm_scheduler', LLMScheduler)
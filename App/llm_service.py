@@ -1,15 +1,23 @@
 """
 Centralized LLM service for handling all LLM interactions.
-Supports both Ollama (local) and OpenAI API providers.
+Supports Ollama (local, balanced across the endpoint pool) and OpenAI API
+providers, plus a record/replay provider for deterministic offline runs.
 """
-import json
-import re
 import os
 from typing import Type, Dict, Any, List
+import requests
 import streamlit as st
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from langchain.output_parsers import PydanticOutputParser
-from config import LLM_CONFIG
+from config import EXTRACTION_CONFIG, LLM_CONFIG
+from json_repair import JSONRepairError, repair_json
+from llm_replay import ReplayLLM, ReplayMissError, get_replay_store
+from ollama_pool import ollama_pool
+from llm_scheduler import LLMRequestCancelled, llm_scheduler
+from model_residency import model_residency
+from model_cascade import assess_output, cascade_stats
+from early_stop import collect_json, generation_stats
+from resource_registry import register_resource
 
 # Try to import Ollama dependencies
 try:
@@ -36,13 +44,16 @@ class LLMService:
         Initialize the LLM service.
         
         Args:
-            provider: 'ollama' or 'openai'
+            provider: 'ollama', 'openai' or 'replay'
             model_name: Model name to use (optional, will use default from config)
             **kwargs: Additional provider-specific arguments
         """
         self.provider = provider or LLM_CONFIG['default_provider']
         self.llm = None
         self.connection_tested = False
+        # Per-endpoint, schema-constrained and cascade-model variants of self.llm,
+        # keyed by (base URL, Pydantic model, model name)
+        self._llm_variants = {}
         
         # Set model name based on provider
         if model_name:
@@ -59,10 +70,13 @@ class LLMService:
     
     def _initialize_llm(self):
         """Initialize the LLM connection based on provider."""
+        self._llm_variants = {}
         if self.provider == 'ollama':
             return self._initialize_ollama()
         elif self.provider == 'openai':
             return self._initialize_openai()
+        elif self.provider == 'replay':
+            return self._initialize_replay()
         else:
             try:
                 st.error(f"Unsupported provider: {self.provider}")
@@ -80,15 +94,7 @@ class LLMService:
             return False
         
         try:
-            self.llm = OllamaLLM(
-                model=self.model_name,
-                base_url=self.config['default_url'],
-                temperature=self.config['temperature'],
-                num_predict=self.config['num_predict'],
-                num_ctx=self.config['num_ctx'],
-                top_k=self.config['top_k'],
-                top_p=self.config['top_p']
-            )
+            self.llm = self._create_ollama_llm()
             return True
                 
         except Exception as e:
@@ -98,6 +104,62 @@ class LLMService:
                 print(f"Failed to initialize Ollama: {str(e)}")
             return False
     
+    def _create_ollama_llm(self, base_url: str = None, model_name: str = None, **kwargs):
+        """Create an Ollama LLM with the configured sampling options."""
+        model_name = model_name or self.model_name
+        return OllamaLLM(
+            model=model_name,
+            base_url=base_url or self.config['default_url'],
+            temperature=self.config['temperature'],
+            num_predict=self.config['num_predict'],
+            num_ctx=self.config['num_ctx'],
+            top_k=self.config['top_k'],
+            top_p=self.config['top_p'],
+            keep_alive=model_residency.get_keep_alive(model_name),
+            **kwargs
+        )
+    
+    def _get_llm(self, model: Type[BaseModel] = None, base_url: str = None, model_name: str = None):
+        """
+        Get the LLM for one request.
+        
+        Ollama gets one client per pool endpoint. With a Pydantic model and
+        structured_output enabled, decoding is constrained to the model's JSON
+        schema (Ollama `format`, OpenAI json_schema response_format).
+        
+        Args:
+            model: Pydantic model the output must follow (None for free text)
+            base_url: Ollama endpoint chosen by the pool (default: configured URL)
+            model_name: Model to run instead of the service's model (cascade small model)
+        """
+        structured_model = model if model and self.config.get('structured_output', False) else None
+        model_name = model_name or self.model_name
+        
+        if self.provider == 'ollama':
+            key = (base_url or self.config['default_url'], structured_model, model_name)
+            if key not in self._llm_variants:
+                kwargs = {'format': structured_model.model_json_schema()} if structured_model else {}
+                self._llm_variants[key] = self._create_ollama_llm(base_url=key[0], model_name=model_name, **kwargs)
+            return self._llm_variants[key]
+        
+        if self.provider == 'openai' and (structured_model or model_name != self.model_name):
+            key = (None, structured_model, model_name)
+            if key not in self._llm_variants:
+                bind_kwargs = {'model': model_name} if model_name != self.model_name else {}
+                if structured_model:
+                    bind_kwargs['response_format'] = {
+                        'type': 'json_schema',
+                        'json_schema': {
+                            'name': structured_model.__name__,
+                            'schema': structured_model.model_json_schema(),
+                            'strict': False
+                        }
+                    }
+                self._llm_variants[key] = self.llm.bind(**bind_kwargs)
+            return self._llm_variants[key]
+        
+        return self.llm
+    
     def _initialize_openai(self):
         """Initialize OpenAI LLM connection."""
         if not OPENAI_AVAILABLE:
@@ -135,31 +197,55 @@ class LLMService:
                 print(f"Failed to initialize OpenAI: {str(e)}")
             return False
     
+    def _initialize_replay(self):
+        """Initialize the record/replay LLM."""
+        try:
+            live_llm = None
+            if self.config['mode'] == 'record':
+                # Record from a live provider using the same model name
+                live_service = LLMService(provider=self.config['record_provider'], model_name=self.model_name)
+                if not live_service.llm:
+                    return False
+                live_llm = live_service.llm
+            
+            self.llm = ReplayLLM(self.model_name, self.config, live_llm=live_llm)
+            return True
+        
+        except Exception as e:
+            try:
+                st.error(f"Failed to initialize replay provider: {str(e)}")
+            except:
+                print(f"Failed to initialize replay provider: {str(e)}")
+            return False
+    
     def _test_connection(self):
         """Test LLM connection if not already tested."""
         if self.connection_tested or not self.llm:
             return self.llm is not None
         
+        if self.provider == 'replay':
+            # Nothing to contact; an empty store can only produce misses
+            if self.config['mode'] == 'replay' and len(get_replay_store(self.config['store_path'])) == 0:
+                try:
+                    st.error(f"Replay store is empty: {self.config['store_path']}")
+                except:
+                    print(f"Replay store is empty: {self.config['store_path']}")
+                return False
+            self.connection_tested = True
+            return True
+        
         try:
-            # Simple test with minimal prompt
-            if self.provider == 'openai':
-                # For OpenAI ChatModels, we need to use messages format
-                from langchain.schema import HumanMessage
-                test_response = self.llm.invoke([HumanMessage(content="Hi")])
-                response_content = test_response.content if hasattr(test_response, 'content') else str(test_response)
-            else:
-                # For Ollama, use direct invoke
-                test_response = self.llm.invoke("Hi")
-                response_content = test_response
-                
-            if response_content:
+            # Cheap health probe: list models instead of running a generation
+            available_models = self._list_provider_models()
+            
+            if self.model_name in available_models:
                 self.connection_tested = True
                 return True
             else:
                 try:
-                    st.error(f"{self.provider.title()} connection test failed - no response")
+                    st.error(f"{self.provider.title()} connection test failed - model '{self.model_name}' not available")
                 except:
-                    print(f"{self.provider.title()} connection test failed - no response")
+                    print(f"{self.provider.title()} connection test failed - model '{self.model_name}' not available")
                 return False
                 
         except Exception as e:
@@ -169,23 +255,51 @@ class LLMService:
                 print(f"{self.provider.title()} connection test failed: {str(e)}")
             return False
     
+    def _list_provider_models(self) -> List[str]:
+        """List the models served by the provider (Ollama /api/tags or OpenAI /models)."""
+        timeout = self.config.get('probe_timeout', 5)
+        
+        if self.provider == 'openai':
+            api_key = self.config.get('api_key') or os.getenv('OPENAI_API_KEY')
+            base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
+            response = requests.get(
+                f"{base_url}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=timeout
+            )
+            response.raise_for_status()
+            return [model.get('id', '') for model in response.json().get('data', [])]
+        
+        # Models served by any healthy endpoint in the pool
+        return ollama_pool.get_available_models(refresh=True)
+    
     def extract_with_llm(
         self,
         model: Type[BaseModel],
         prompt_template: str,
         input_variables: List[str],
         input_data: Dict[str, Any],
-        development_mode: bool = False
+        development_mode: bool = False,
+        stats_name: str = None,
+        grounded: bool = True,
+        stop: List[str] = None
     ) -> Dict[str, Any]:
         """
         Extract structured data using LLM with Pydantic model validation.
         
+        With the cascade enabled, the small model runs first and the configured
+        model only gets the request if the small model's output fails validation
+        or the completeness/grounding checks.
+        
         Args:
             model: Pydantic model class for output validation
             prompt_template: Template string for the prompt
             input_variables: List of variable names expected in the template
             input_data: Dictionary containing values for the input variables
             development_mode: Whether to show detailed extraction process
+            stats_name: Name cascade and generation stats are recorded under (default: the model name)
+            grounded: Whether output values should come from the input text (extractors) or are judgments (analyzers)
+            stop: Stop sequences (default: EXTRACTION_CONFIG['stop_sequences'])
             
         Returns:
             Dictionary containing the extracted and validated data
@@ -207,6 +321,10 @@ class LLMService:
                     print("LLM connection failed")
             return {model.__name__.lower(): model().model_dump()}
         
+        stats_name = stats_name or model.__name__
+        if stop is None:
+            stop = EXTRACTION_CONFIG.get('stop_sequences') or None
+        
         try:
             # Create parser for the model
             parser = PydanticOutputParser(pydantic_object=model)
@@ -255,15 +373,16 @@ class LLMService:
                 except:
                     print(f"Debug info for {model.__name__}: Provider={self.provider}, Model={self.model_name}, Prompt Length={len(formatted_prompt)}")
             
-            # Invoke LLM based on provider
-            if self.provider == 'openai':
-                # For OpenAI ChatModels, we need to use messages format
-                from langchain.schema import HumanMessage
-                llm_response = self.llm.invoke([HumanMessage(content=formatted_prompt)])
-                response = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
-            else:
-                # For Ollama, use direct invoke
-                response = self.llm.invoke(formatted_prompt)
+            cascade_model = self._get_cascade_model(model)
+            if cascade_model:
+                validated_output = self._try_cascade_model(
+                    cascade_model, model, formatted_prompt, input_data,
+                    stats_name, grounded, stop, development_mode
+                )
+                if validated_output is not None:
+                    return {model.__name__.lower(): validated_output.model_dump()}
+            
+            response = self._invoke_prompt(formatted_prompt, model, stop=stop, stats_name=stats_name)
             
             if development_mode:
                 try:
@@ -278,35 +397,27 @@ class LLMService:
                 except:
                     print(f"LLM Response for {model.__name__}: Length={len(response)}, Type={type(response).__name__}")
             
-            # Try to parse with Pydantic parser first
+            # Repair and validate; on failure, one targeted retry that only fixes the output
             try:
-                parsed_output = parser.parse(response)
-                if development_mode:
-                    try:
-                        st.success(f"Successfully parsed {model.__name__} with Pydantic")
-                    except:
-                        print(f"Successfully parsed {model.__name__} with Pydantic")
-                return {model.__name__.lower(): parsed_output.model_dump()}
-            except Exception as parse_error:
+                validated_output = self._parse_model_output(model, response)
+            except (JSONRepairError, ValidationError) as parse_error:
                 if development_mode:
                     try:
-                        st.warning(f"Pydantic parsing failed for {model.__name__}: {parse_error}")
+                        st.warning(f"Parsing failed for {model.__name__}, retrying with the error: {parse_error}")
                     except:
-                        print(f"Pydantic parsing failed for {model.__name__}: {parse_error}")
-                
-                # Fallback to manual JSON parsing
-                cleaned_response = self._clean_json_response(response)
-                json_output = json.loads(cleaned_response)
+                        print(f"Parsing failed for {model.__name__}, retrying with the error: {parse_error}")
                 
-                # Validate with the model
-                validated_output = model(**json_output)
-                if development_mode:
-                    try:
-                        st.success(f"Successfully parsed {model.__name__} with manual JSON parsing")
-                    except:
-                        print(f"Successfully parsed {model.__name__} with manual JSON parsing")
-                return {model.__name__.lower(): validated_output.model_dump()}
+                validated_output = self._retry_invalid_output(model, parser, response, parse_error)
+            
+            if development_mode:
+                try:
+                    st.success(f"Successfully parsed {model.__name__}")
+                except:
+                    print(f"Successfully parsed {model.__name__}")
+            return {model.__name__.lower(): validated_output.model_dump()}
                 
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
         except Exception as e:
             if development_mode:
                 try:
@@ -316,6 +427,240 @@ class LLMService:
                     print(f"LLM extraction failed for {model.__name__}: {str(e)}")
             return {model.__name__.lower(): model().model_dump()}
     
+    def extract_raw_json(
+        self,
+        model: Type[BaseModel],
+        prompt_template: str,
+        input_variables: List[str],
+        input_data: Dict[str, Any],
+        development_mode: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Extract JSON shaped by a Pydantic model without validating it as a whole.
+        
+        Used when the caller validates parts of the output separately, so one bad
+        field doesn't discard everything else.
+        
+        Args:
+            model: Pydantic model class whose schema goes into the format instructions
+            prompt_template: Template string for the prompt
+            input_variables: List of variable names expected in the template
+            input_data: Dictionary containing values for the input variables
+            development_mode: Whether to show detailed extraction process
+            
+        Returns:
+            The parsed JSON object, or an empty dictionary on failure
+        """
+        if not self.llm or not self._test_connection():
+            if development_mode:
+                try:
+                    st.error("LLM connection failed")
+                except:
+                    print("LLM connection failed")
+            return {}
+        
+        try:
+            parser = PydanticOutputParser(pydantic_object=model)
+            prompt = PromptTemplate(
+                template=prompt_template,
+                input_variables=input_variables + ["format_instructions"],
+                partial_variables={"format_instructions": parser.get_format_instructions()}
+            )
+            formatted_prompt = prompt.format(**input_data)
+            
+            response = self._invoke_prompt(formatted_prompt, model, stop=EXTRACTION_CONFIG.get('stop_sequences') or None)
+            
+            if development_mode:
+                try:
+                    with st.expander(f"📤 Raw LLM Response for {model.__name__}"):
+                        st.code(response)
+                except:
+                    print(f"LLM Response for {model.__name__}: Length={len(response)}")
+            
+            output = repair_json(response)
+            return output if isinstance(output, dict) else {}
+        
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
+        except Exception as e:
+            if development_mode:
+                try:
+                    st.error(f"LLM extraction failed for {model.__name__}: {str(e)}")
+                except:
+                    print(f"LLM extraction failed for {model.__name__}: {str(e)}")
+            return {}
+    
+    def _invoke_prompt(
+        self,
+        formatted_prompt: str,
+        model: Type[BaseModel] = None,
+        model_name: str = None,
+        stop: List[str] = None,
+        stats_name: str = None
+    ) -> str:
+        """
+        Send a single prompt in a scheduler slot (upload priority by default) and return the response text.
+        
+        Structured requests (with a Pydantic model) are streamed and stopped as
+        soon as the JSON object is complete. Recording runs are read to the end
+        so the stored response is whole.
+        """
+        if self.provider == 'ollama':
+            # The extraction role follows consolidation; explicit models (cascade) run as given
+            model_name = model_name or model_residency.resolve_model(self.model_name)
+            model_residency.note_use(model_name)
+        model_name = model_name or self.model_name
+        
+        if model is not None and self.provider != 'replay':
+            chunks = llm_scheduler.stream(model_name, lambda: self._stream_chunks(formatted_prompt, model, model_name, stop))
+            response, info = collect_json(chunks, EXTRACTION_CONFIG.get('early_stop', True))
+            generation_stats.record(stats_name or model.__name__, info, self._token_budget())
+            return response
+        
+        return llm_scheduler.run(model_name, lambda: self._send_prompt(formatted_prompt, model, model_name, stop))
+    
+    def _token_budget(self) -> int:
+        """Maximum tokens a single response may generate."""
+        return self.config.get('num_predict') or self.config.get('max_tokens') or 0
+    
+    def _stream_prompt(self, prompt: str):
+        """Stream the response text of a single prompt, holding a scheduler slot until it ends."""
+        model_name = self.model_name
+        if self.provider == 'ollama':
+            model_name = model_residency.resolve_model(model_name)
+            model_residency.note_use(model_name)
+        yield from llm_scheduler.stream(model_name, lambda: self._stream_chunks(prompt, model_name=model_name))
+    
+    def _send_prompt(
+        self,
+        formatted_prompt: str,
+        model: Type[BaseModel] = None,
+        model_name: str = None,
+        stop: List[str] = None
+    ) -> str:
+        model_name = model_name or self.model_name
+        if self.provider == 'openai':
+            # For OpenAI ChatModels, we need to use messages format
+            from langchain.schema import HumanMessage
+            llm_response = self._get_llm(model, model_name=model_name).invoke([HumanMessage(content=formatted_prompt)], stop=stop)
+            return llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
+        
+        if self.provider == 'ollama':
+            # Least-loaded endpoint serving the model, with failover
+            return ollama_pool.call(
+                model_name,
+                lambda base_url: self._get_llm(model, base_url, model_name).invoke(formatted_prompt, stop=stop)
+            )
+        
+        return self._get_llm(model).invoke(formatted_prompt, stop=stop)
+    
+    def _stream_chunks(self, prompt: str, model: Type[BaseModel] = None, model_name: str = None, stop: List[str] = None):
+        model_name = model_name or self.model_name
+        if self.provider == 'openai':
+            # For OpenAI ChatModels, use messages format for streaming
+            from langchain.schema import HumanMessage
+            for chunk in self._get_llm(model, model_name=model_name).stream([HumanMessage(content=prompt)], stop=stop):
+                # Role-only and final chunks have empty content
+                content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if content:
+                    yield content
+            return
+        
+        if self.provider == 'ollama':
+            chunks = ollama_pool.stream(
+                model_name,
+                lambda base_url: self._get_llm(model, base_url, model_name).stream(prompt, stop=stop)
+            )
+        else:
+            chunks = self._get_llm(model).stream(prompt, stop=stop)
+        
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+    
+    def _get_cascade_model(self, model: Type[BaseModel]) -> str:
+        """Small model to try first for this output model ('' when the cascade does not apply)."""
+        cascade_config = EXTRACTION_CONFIG.get('cascade', {})
+        if not cascade_config.get('enabled', False) or model.__name__ in cascade_config.get('always_large', []):
+            return ''
+        small_model = cascade_config.get('small_models', {}).get(self.provider) or ''
+        if self.provider == 'ollama' and model_residency.resolve_model(small_model) != small_model:
+            return ''  # Consolidated onto a larger model, so the small model is not kept loaded
+        return small_model if small_model != self.model_name else ''
+    
+    def _try_cascade_model(
+        self,
+        small_model: str,
+        model: Type[BaseModel],
+        formatted_prompt: str,
+        input_data: Dict[str, Any],
+        stats_name: str,
+        grounded: bool,
+        stop: List[str] = None,
+        development_mode: bool = False
+    ):
+        """
+        Run the request on the small model and check its output.
+        
+        Returns:
+            The validated output, or None when the request should escalate
+        """
+        try:
+            output = self._parse_model_output(model, self._invoke_prompt(formatted_prompt, model, small_model, stop, stats_name))
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
+        except (JSONRepairError, ValidationError):
+            assessment = {'passed': False, 'reason': 'invalid'}
+        except Exception as e:
+            # Small model missing or unreachable: the large model still gets the request
+            assessment = {'passed': False, 'reason': 'error'}
+            print(f"Cascade model {small_model} failed for {stats_name}: {e}")
+        else:
+            source_text = "\n".join(str(value) for value in input_data.values() if isinstance(value, str))
+            assessment = assess_output(output, source_text, grounded)
+        
+        cascade_stats.record(stats_name, escalated=not assessment['passed'], reason=assessment['reason'])
+        
+        if development_mode:
+            try:
+                if assessment['passed']:
+                    st.info(f"🪶 {stats_name}: kept {small_model} output "
+                            f"(completeness {assessment['completeness']:.0%}, grounding {assessment['grounding']:.0%})")
+                else:
+                    st.info(f"⬆️ {stats_name}: escalating from {small_model} to {self.model_name} ({assessment['reason']})")
+            except:
+                print(f"Cascade {stats_name}: {small_model} {'kept' if assessment['passed'] else 'escalated'} {assessment['reason']}")
+        
+        return output if assessment['passed'] else None
+    
+    def _parse_model_output(self, model: Type[BaseModel], response: str) -> BaseModel:
+        """Repair the response JSON and validate it against the model."""
+        return model.model_validate(repair_json(response))
+    
+    def _retry_invalid_output(
+        self,
+        model: Type[BaseModel],
+        parser: PydanticOutputParser,
+        response: str,
+        error: Exception
+    ) -> BaseModel:
+        """
+        Ask the model once to correct its own output.
+        
+        The retry sends only the invalid output and the error, not the source
+        text, so it costs a fraction of re-running the extraction.
+        """
+        retry_prompt = (
+            "Your previous output could not be used.\n\n"
+            f"Error:\n{str(error)[:1000]}\n\n"
+            f"Previous output:\n{response[:8000]}\n\n"
+            "Return only the corrected JSON object. Keep every value from the previous output "
+            "unless the error requires changing it.\n\n"
+            f"{parser.get_format_instructions()}"
+        )
+        retry_response = self._invoke_prompt(retry_prompt, model)
+        return self._parse_model_output(model, retry_response)
+    
     def stream_simple(
         self,
         prompt: str,
@@ -384,20 +729,10 @@ class LLMService:
                     print(f"Debug info: Provider={self.provider}, Model={self.model_name}, Prompt Length={len(prompt)}, Streaming=True")
             
             # Use stream method for streaming response
-            if self.provider == 'openai':
-                # For OpenAI ChatModels, use messages format for streaming
-                from langchain.schema import HumanMessage
-                for chunk in self.llm.stream([HumanMessage(content=prompt)]):
-                    if hasattr(chunk, 'content') and chunk.content:
-                        yield chunk.content
-                    elif chunk:
-                        yield str(chunk)
-            else:
-                # For Ollama, use direct streaming
-                for chunk in self.llm.stream(prompt):
-                    if chunk:
-                        yield chunk
+            yield from self._stream_prompt(prompt)
             
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
         except Exception as e:
             if development_mode:
                 try:
@@ -467,15 +802,7 @@ class LLMService:
                 with st.expander("📝 Simple LLM Prompt"):
                     st.code(prompt)
             
-            # Invoke LLM based on provider
-            if self.provider == 'openai':
-                # For OpenAI ChatModels, use messages format
-                from langchain.schema import HumanMessage
-                llm_response = self.llm.invoke([HumanMessage(content=prompt)])
-                response = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
-            else:
-                # For Ollama, use direct invoke
-                response = self.llm.invoke(prompt)
+            response = self._invoke_prompt(prompt)
             
             if development_mode:
                 with st.expander("📤 Simple LLM Response"):
@@ -488,6 +815,8 @@ class LLMService:
             
             return response
             
+        except (ReplayMissError, LLMRequestCancelled):
+            raise
         except Exception as e:
             if development_mode:
                 try:
@@ -496,31 +825,6 @@ class LLMService:
                     print(f"Simple LLM extraction failed: {str(e)}")
             return ""
     
-    def _clean_json_response(self, response: str) -> str:
-        """Clean LLM response to extract valid JSON."""
-        # Remove markdown code blocks
-        response = re.sub(r'```json\s*', '', response)
-        response = re.sub(r'```\s*', '', response)
-        
-        # Remove any text before the first { or [
-        start_char = min(
-            (response.find('{') if response.find('{') != -1 else len(response)),
-            (response.find('[') if response.find('[') != -1 else len(response))
-        )
-        
-        if start_char < len(response):
-            response = response[start_char:]
-        
-        # Find the last } or ]
-        last_brace = response.rfind('}')
-        last_bracket = response.rfind(']')
-        end_char = max(last_brace, last_bracket)
-        
-        if end_char != -1:
-            response = response[:end_char + 1]
-        
-        return response.strip()
-    
     def is_available(self) -> bool:
         """Check if LLM service is available."""
         return self.llm is not None and self._test_connection()
@@ -552,8 +856,11 @@ class LLMService:
         elif self.provider == 'openai':
             # Common OpenAI models
             return ['gpt-4o', 'gpt-4o-mini', 'gpt-4-turbo', 'gpt-3.5-turbo']
+        elif self.provider == 'replay':
+            # Models that have recordings in the store
+            return get_replay_store(self.config['store_path']).get_models()
         return []
 
 
-# Global LLM service instance
-llm_service = LLMService() 
\ No newline at end of file
+# Global LLM service instance, created lazily on first use
+llm_service = register_resource('llm_service', LLMService) 
\ No newline at end of file
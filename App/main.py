@@ -1,6 +1,27 @@
+import threading
 import streamlit as st
 from config import PAGE_CONFIG
 
+
+@st.cache_resource
+def start_background_warm_up():
+    """Warm up shared resources once per process without blocking the first page."""
+    def _warm_up():
+        # Importing these modules registers their lazy singletons
+        import llm_service
+        import database
+        import chatbot_service
+        from resource_registry import warm_up
+        warm_up(['llm_service', 'db_manager', 'candidate_chatbot'], background=False)
+        # Load the chatbot models before the first question
+        from model_residency import model_residency
+        model_residency.preload_startup_models(background=False)
+
+    thread = threading.Thread(target=_warm_up, name="resource-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
 # --- PAGE SETUP ---
 evaluation_page = st.Page(
     page="pages/evaluation.py",
@@ -25,6 +46,7 @@ pg = st.navigation(pages=[evaluation_page, find_candidates_page, dbms_page])
 
 # --- SHARED ON ALL PAGES ---
 st.logo("assets/noBgBlack.png")
+start_background_warm_up()
 
 # --- RUN APP ---
 pg.run()
\ No newline at end of file
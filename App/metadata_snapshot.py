@@ -0,0 +1,273 @@
+"""
+Typed columnar snapshot of candidate metadata.
+
+Chroma stores every metadata value as a string. For filtering and analytics
+the filterable fields are kept in an Arrow IPC file with proper types:
+integer page counts, float years of experience, timestamp columns. The file
+is memory-mapped, so loading it is zero-copy.
+
+VectorDatabaseManager appends every resume change to a small change log. On
+refresh, only the changed records are re-fetched and spliced into the table.
+The snapshot is rebuilt from the collection when there is no file yet, after
+a reset, or when most of the pool changed.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from config import SNAPSHOT_CONFIG
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Snapshot column -> (resume metadata key, type)
+SNAPSHOT_COLUMNS = {
+    'id': (None, 'string'),
+    'name': ('name', 'string'),
+    'email': ('email', 'string'),
+    'reco_field': ('reco_field', 'string'),
+    'cand_level': ('cand_level', 'string'),
+    'primary_field': ('primary_field', 'string'),
+    'city': ('city', 'string'),
+    'state': ('state', 'string'),
+    'country': ('country', 'string'),
+    'skills': ('skills', 'string'),
+    'pdf_name': ('pdf_name', 'string'),
+    'sec_token': ('sec_token', 'string'),
+    'no_of_pages': ('no_of_pages', 'int'),
+    'years_of_experience': ('years_of_experience', 'float'),
+    'timestamp': ('timestamp', 'timestamp')
+}
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+_TIMESTAMP_FORMATS = ('%Y-%m-%d_%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """First number in a metadata string ('5.5 years' -> 5.5), None if there is none."""
+    match = _NUMBER_PATTERN.search(str(value or ''))
+    return float(match.group()) if match else None
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse the timestamp formats the app writes (ISO and '%Y-%m-%d_%H:%M:%S')."""
+    text = str(value or '').strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for timestamp_format in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(text, timestamp_format)
+        except ValueError:
+            continue
+    return None
+
+
+def typed_row(record_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot row for one record, with values converted to their column types."""
+    row = {}
+    for column, (key, kind) in SNAPSHOT_COLUMNS.items():
+        value = record_id if key is None else metadata.get(key)
+        if kind == 'int':
+            number = parse_number(value)
+            row[column] = int(number) if number is not None else None
+        elif kind == 'float':
+            row[column] = parse_number(value)
+        elif kind == 'timestamp':
+            row[column] = parse_timestamp(value)
+        else:
+            row[column] = str(value or '')
+    return row
+
+
+def snapshot_schema():
+    types = {'string': pa.string(), 'int': pa.int32(), 'float': pa.float64(), 'timestamp': pa.timestamp('s')}
+    return pa.schema([(column, types[kind]) for column, (_, kind) in SNAPSHOT_COLUMNS.items()])
+
+
+class ChangeLog:
+    """Append-only log of resume changes, consumed by snapshot refreshes."""
+
+    def __init__(self, path: Optional[str]):
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, change TEXT NOT NULL, record_id TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def record(self, change: str, record_ids: List[str]):
+        """Change listener for VectorDatabaseManager."""
+        with self._lock, self._db:
+            if change == 'reset':
+                self._db.execute("INSERT INTO changes (change, record_id) VALUES ('reset', '')")
+            else:
+                self._db.executemany(
+                    "INSERT INTO changes (change, record_id) VALUES (?, ?)",
+                    [(change, record_id) for record_id in record_ids]
+                )
+
+    def since(self, seq: int) -> List[tuple]:
+        """(seq, change, record_id) entries after seq, oldest first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT seq, change, record_id FROM changes WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def truncate(self, seq: int):
+        """Drop entries up to seq once a snapshot has applied them."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM changes WHERE seq <= ?", (seq,))
+
+
+class MetadataSnapshot:
+    """Memory-mapped Arrow snapshot refreshed from the change log."""
+
+    def __init__(self, change_log: ChangeLog, config: Optional[Dict[str, Any]] = None):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("The metadata snapshot needs pyarrow (pip install pyarrow)")
+
+        self.config = config or SNAPSHOT_CONFIG
+        self.change_log = change_log
+        self.path = self.config['path']
+        self.state_path = self.path + '.json'
+        self._table = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.full_rebuilds = 0
+        self.incremental_refreshes = 0
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {'seq': 0}
+
+    def _load(self):
+        """Memory-map the snapshot file (None if there is none)."""
+        if not os.path.exists(self.path):
+            return None
+        # The table's buffers point into the mapping, which stays open as long as they are referenced
+        return pa.ipc.open_file(pa.memory_map(self.path, 'r')).read_all()
+
+    def _write(self, table, seq: int):
+        """Write the table and its change log position, replacing the old files atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, self.path)
+
+        with open(self.state_path + '.tmp', 'w', encoding='utf-8') as state_file:
+            json.dump({'seq': seq, 'rows': table.num_rows, 'written_at': datetime.now().isoformat()}, state_file)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def _rows_table(self, record_ids: List[str], metadatas: List[Dict[str, Any]]):
+        return pa.Table.from_pylist(
+            [typed_row(record_id, metadata) for record_id, metadata in zip(record_ids, metadatas)],
+            schema=snapshot_schema()
+        )
+
+    def _full_table(self, collection):
+        batch_size = self.config['page_size']
+        tables, offset = [], 0
+        while True:
+            batch = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+            if not batch['ids']:
+                break
+            tables.append(self._rows_table(batch['ids'], batch['metadatas']))
+            offset += len(batch['ids'])
+        return pa.concat_tables(tables) if tables else snapshot_schema().empty_table()
+
+    def _apply_changes(self, table, collection, changed_ids: Set[str]):
+        """Replace the changed records' rows with their current state (deleted ones just drop out)."""
+        kept = table.filter(pc.invert(pc.is_in(table['id'], value_set=pa.array(sorted(changed_ids), pa.string()))))
+        current = collection.get(ids=sorted(changed_ids), include=['metadatas'])
+        return pa.concat_tables([kept, self._rows_table(current['ids'], current['metadatas'])])
+
+    def refresh(self, collection, force: bool = False) -> bool:
+        """
+        Bring the snapshot up to date with the change log.
+
+        Args:
+            collection: Resume collection to fetch changed records from
+            force: Refresh even if the last check was within the refresh interval
+
+        Returns:
+            True if the snapshot was rewritten
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self._table is not None and now - self._last_check < self.config['refresh_interval_seconds']:
+                return False
+            self._last_check = now
+
+            seq = self._read_state()['seq']
+            changes = self.change_log.since(seq)
+            table = self._table if self._table is not None else self._load()
+            if table is not None and table.schema != snapshot_schema():
+                table = None  # Written by an older version with different columns
+
+            if table is not None and self._table is None and not changes and table.num_rows != collection.count():
+                table = None  # Changed while nothing was logging (e.g. a run without pyarrow)
+
+            changed_ids = {record_id for _, change, record_id in changes if change != 'reset'}
+            full_rebuild = (
+                table is None
+                or any(change == 'reset' for _, change, _ in changes)
+                or len(changed_ids) > self.config['full_rebuild_ratio'] * max(table.num_rows, 1)
+            )
+
+            if not full_rebuild and not changes:
+                self._table = table
+                return False
+
+            last_seq = changes[-1][0] if changes else self.change_log.last_seq()
+            if full_rebuild:
+                table = self._full_table(collection)
+                self.full_rebuilds += 1
+            else:
+                table = self._apply_changes(table, collection, changed_ids)
+                self.incremental_refreshes += 1
+
+            self._write(table, last_seq)
+            self.change_log.truncate(last_seq)
+            self._table = self._load()
+            return True
+
+    def get_table(self, collection):
+        """The current snapshot as an Arrow table, refreshed if the interval has passed."""
+        self.refresh(collection)
+        return self._table
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'rows': self._table.num_rows if self._table is not None else 0,
+            'full_rebuilds': self.full_rebuilds,
+            'incremental_refreshes': self.incremental_refreshes,
+            'pending_changes': len(self.change_log.since(self._read_state()['seq']))
+        }
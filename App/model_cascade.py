@@ -0,0 +1,144 @@
+"""
+Small-model-first extraction cascade.
+
+LLMService tries the configured small model first and keeps its output only
+if it validates and passes two heuristics: completeness (share of fields the
+model filled) and grounding (share of extracted strings whose words occur in
+the source text). Anything else escalates to the large model. Escalations are
+counted per extractor/analyzer so the thresholds can be tuned.
+"""
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from config import EXTRACTION_CONFIG
+from resource_registry import register_resource
+
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == '' or value == [] or value == {}
+
+
+def _fields(value: Any) -> List[Any]:
+    """Field values of an output, descending into nested objects and lists of objects."""
+    if isinstance(value, dict):
+        fields = []
+        for item in value.values():
+            if isinstance(item, dict) or (isinstance(item, list) and item and all(isinstance(x, dict) for x in item)):
+                fields.extend(_fields(item))
+            else:
+                fields.append(item)
+        return fields
+    if isinstance(value, list):
+        fields = []
+        for item in value:
+            fields.extend(_fields(item))
+        return fields
+    return [value]
+
+
+def _strings(value: Any) -> List[str]:
+    """Every string in an output."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [text for item in value for text in _strings(item)]
+    return []
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def completeness_score(output: BaseModel) -> float:
+    """Share of fields with a value (0.0 for an output with nothing in it)."""
+    fields = _fields(output.model_dump())
+    if not fields:
+        return 0.0
+    return sum(1 for value in fields if not _is_empty(value)) / len(fields)
+
+
+def grounding_score(output: BaseModel, source_text: str, min_word_overlap: float = 0.5) -> float:
+    """
+    Share of extracted strings supported by the source text.
+
+    A string counts as grounded when at least ``min_word_overlap`` of its
+    words occur in the source, which tolerates light rephrasing but not
+    invented values.
+    """
+    source_words = set(_words(source_text))
+    checked = grounded = 0
+    for text in _strings(output.model_dump()):
+        words = _words(text)
+        if not words or len(text.strip()) < 3:
+            continue
+        checked += 1
+        if sum(1 for word in words if word in source_words) / len(words) >= min_word_overlap:
+            grounded += 1
+    return grounded / checked if checked else 1.0
+
+
+def assess_output(output: BaseModel, source_text: str, grounded: bool = True, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Decide whether a small-model output can be kept.
+
+    Args:
+        output: Validated output of the small model
+        source_text: Text the output was extracted from
+        grounded: Whether values should be copied from the source (extractors) or are judgments (analyzers)
+        config: Cascade configuration (default: EXTRACTION_CONFIG['cascade'])
+
+    Returns:
+        Dictionary with 'passed', 'reason', 'completeness' and 'grounding'
+    """
+    config = config or EXTRACTION_CONFIG['cascade']
+    completeness = completeness_score(output)
+    grounding = grounding_score(output, source_text, config.get('min_word_overlap', 0.5)) if grounded else 1.0
+
+    reason = ''
+    if completeness < config.get('min_completeness', 0.15):
+        reason = 'incomplete'
+    elif grounding < config.get('min_grounding', 0.8):
+        reason = 'ungrounded'
+
+    return {'passed': not reason, 'reason': reason, 'completeness': completeness, 'grounding': grounding}
+
+
+class CascadeStats:
+    """Per-extractor counts of small-model attempts and escalations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempts: Counter = Counter()
+        self._escalations: Counter = Counter()
+        self._reasons: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, escalated: bool, reason: str = ''):
+        with self._lock:
+            self._attempts[name] += 1
+            if escalated:
+                self._escalations[name] += 1
+                self._reasons[name][reason or 'unknown'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Attempts, escalations, escalation rate and reasons per extractor."""
+        with self._lock:
+            return {
+                name: {
+                    'attempts': attempts,
+                    'escalations': self._escalations[name],
+                    'escalation_rate': self._escalations[name] / attempts,
+                    'reasons': dict(self._reasons[name])
+                }
+                for name, attempts in self._attempts.items()
+            }
+
+
+# Global cascade statistics, created lazily on first use
+cascade_stats = register_resource('cascade_stats', CascadeStats)
@@ -0,0 +1,199 @@
+"""
+Ollama model residency manager.
+
+Knows which model every LLM_CONFIG / SPECIALISTS_CONFIG role uses and keeps
+the right ones loaded: each request carries a ``keep_alive``, the model most
+likely to be needed next (learned from the order models are used in, e.g.
+intent on gemma3:4b followed by a response on gemma3:12b) is preloaded in the
+background, and ``/api/ps`` is polled (off the request path) to count loads and
+evictions. When evictions keep happening, roles can be consolidated onto fewer
+models.
+"""
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, Optional, Set
+
+import requests
+from config import LLM_CONFIG, RESIDENCY_CONFIG, SPECIALISTS_CONFIG
+from ollama_pool import ollama_pool
+from resource_registry import register_resource
+
+
+class ModelResidencyManager:
+    """keep_alive, predictive preloading, swap accounting and role consolidation for Ollama."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or RESIDENCY_CONFIG
+        self._lock = threading.Lock()
+        self._last_model: Optional[str] = None
+        self._transitions: Dict[str, Counter] = defaultdict(Counter)
+        self._resident: Dict[str, Set[str]] = {}  # endpoint URL -> loaded models
+        self._last_poll = 0.0
+        self._polling = False
+        self._preloading: Set[str] = set()
+        self.loads: Counter = Counter()
+        self.evictions: Counter = Counter()
+        self.preloads: Counter = Counter()
+        self._eviction_times: deque = deque()
+        self._consolidated = self.config.get('consolidation', {}).get('mode', 'off') == 'always'
+
+    def get_role_models(self) -> Dict[str, str]:
+        """Model configured for every role (extraction plus each chatbot specialist)."""
+        roles = {'extraction': LLM_CONFIG['ollama']['default_model']}
+        roles.update({role: config['model'] for role, config in SPECIALISTS_CONFIG.items()})
+        return roles
+
+    def resolve_model(self, model_name: str) -> str:
+        """Model a role should actually run on (after consolidation, if active)."""
+        if not self._consolidated:
+            return model_name
+        return self.config.get('consolidation', {}).get('map', {}).get(model_name, model_name)
+
+    def get_keep_alive(self, model_name: str) -> Any:
+        """keep_alive to send with requests for a model."""
+        return self.config.get('keep_alive', {}).get(model_name, self.config.get('default_keep_alive', '30m'))
+
+    def note_use(self, model_name: str):
+        """Record that a request for a model is about to run and preload the predicted next model."""
+        if not self.config.get('enabled', True):
+            return
+
+        with self._lock:
+            previous = self._last_model
+            self._last_model = model_name
+            if previous and previous != model_name:
+                self._transitions[previous][model_name] += 1
+            transitions = self._transitions.get(model_name)
+            predicted = transitions.most_common(1)[0][0] if transitions else None
+
+        self._poll_in_background()
+        if predicted and self.config.get('predictive_preload', True) and not self._is_resident(predicted):
+            self.preload(predicted, background=True)
+
+    def _is_resident(self, model_name: str) -> bool:
+        with self._lock:
+            return any(model_name in models for models in self._resident.values())
+
+    def _claim_poll(self, force: bool) -> bool:
+        """Whether the caller should poll now (at most one poll at a time, one per interval)."""
+        with self._lock:
+            now = time.time()
+            if self._polling or (not force and now - self._last_poll < self.config.get('poll_interval', 5)):
+                return False
+            self._polling = True
+            self._last_poll = now
+            return True
+
+    def _poll_in_background(self):
+        """Hand a due poll to a background thread so requests never wait on /api/ps."""
+        if self._claim_poll(force=False):
+            threading.Thread(target=self._poll, name="residency-poll", daemon=True).start()
+
+    def poll_resident(self, force: bool = False):
+        """Refresh loaded models from /api/ps and count loads/evictions since the last poll."""
+        if self._claim_poll(force):
+            self._poll()
+
+    def _poll(self):
+        try:
+            self._poll_endpoints()
+        finally:
+            with self._lock:
+                self._polling = False
+
+    def _poll_endpoints(self):
+        now = time.time()
+        for endpoint in ollama_pool.endpoints:
+            if not endpoint.healthy:
+                continue
+            try:
+                response = requests.get(f"{endpoint.url}/api/ps", timeout=self.config.get('probe_timeout', 5))
+                response.raise_for_status()
+                loaded = {model.get('name', '') for model in response.json().get('models', [])}
+            except Exception:
+                continue
+
+            with self._lock:
+                previous = self._resident.get(endpoint.url)
+                self._resident[endpoint.url] = loaded
+                if previous is None:
+                    continue
+                for model_name in loaded - previous:
+                    self.loads[model_name] += 1
+                for model_name in previous - loaded:
+                    self.evictions[model_name] += 1
+                    self._eviction_times.append(now)
+
+        self._update_consolidation(now)
+
+    def _update_consolidation(self, now: float):
+        """In 'auto' mode, consolidate roles while evictions exceed the configured rate."""
+        consolidation = self.config.get('consolidation', {})
+        if consolidation.get('mode', 'off') != 'auto':
+            return
+
+        window = consolidation.get('window_seconds', 600)
+        with self._lock:
+            while self._eviction_times and now - self._eviction_times[0] > window:
+                self._eviction_times.popleft()
+            if len(self._eviction_times) >= consolidation.get('evictions_threshold', 4):
+                self._consolidated = True
+            elif not self._eviction_times:
+                self._consolidated = False
+
+    def preload(self, model_name: str, background: bool = True):
+        """Load a model on the endpoints that serve it (an empty /api/generate request)."""
+        with self._lock:
+            if model_name in self._preloading:
+                return
+            self._preloading.add(model_name)
+
+        def _run():
+            try:
+                endpoints = [endpoint for endpoint in ollama_pool.endpoints if endpoint.healthy and endpoint.serves(model_name)]
+                for endpoint in endpoints:
+                    try:
+                        requests.post(
+                            f"{endpoint.url}/api/generate",
+                            json={'model': model_name, 'keep_alive': self.get_keep_alive(model_name)},
+                            timeout=self.config.get('preload_timeout', 120)
+                        )
+                        with self._lock:
+                            self.preloads[model_name] += 1
+                            self._resident.setdefault(endpoint.url, set()).add(model_name)
+                    except Exception as e:
+                        print(f"Preloading {model_name} on {endpoint.url} failed: {e}")
+            finally:
+                with self._lock:
+                    self._preloading.discard(model_name)
+
+        if background:
+            threading.Thread(target=_run, name=f"preload-{model_name}", daemon=True).start()
+        else:
+            _run()
+
+    def preload_startup_models(self, background: bool = True):
+        """Preload the models configured in RESIDENCY_CONFIG['preload_on_startup']."""
+        for model_name in self.config.get('preload_on_startup', []):
+            self.preload(self.resolve_model(model_name), background=background)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Role mapping, resident models, swap counts and learned transitions."""
+        with self._lock:
+            roles = {role: {'configured': model, 'effective': self.resolve_model(model)}
+                     for role, model in self.get_role_models().items()}
+            return {
+                'roles': roles,
+                'consolidated': self._consolidated,
+                'resident': {url: sorted(models) for url, models in self._resident.items()},
+                'loads': dict(self.loads),
+                'evictions': dict(self.evictions),
+                'swaps': sum(self.loads.values()),
+                'preloads': dict(self.preloads),
+                'transitions': {model: dict(counts) for model, counts in self._transitions.items()}
+            }
+
+
+# Global residency manager, created lazily on first use
+model_residency = register_resource('model_residency', ModelResidencyManager)
@@ -0,0 +1,227 @@
+"""
+Pool of Ollama endpoints shared by LLMService and the chatbot specialists.
+
+Each endpoint is health-checked with ``/api/tags``, which also tells which
+models it serves. Requests go to the healthy endpoint serving the model with
+the fewest requests in flight; connection failures mark the endpoint down and
+the request fails over to the next one.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+import requests
+from config import LLM_CONFIG, OLLAMA_POOL_CONFIG
+from resource_registry import register_resource
+
+# Exception class names (httpx / ollama client) that mean "try another endpoint"
+FAILOVER_ERROR_NAMES = {
+    'ConnectError', 'ConnectTimeout', 'ReadTimeout', 'ReadError', 'RemoteProtocolError', 'PoolTimeout'
+}
+
+
+class NoHealthyEndpointError(ConnectionError):
+    """Raised when every endpoint failed or none is configured."""
+
+
+class OllamaEndpoint:
+    """State of one Ollama server."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.healthy = True  # Optimistic until the first health check says otherwise
+        self.models: Set[str] = set()
+        self.outstanding = 0
+        self.total_requests = 0
+        self.failures = 0
+        self.last_checked = 0.0
+        self.last_error = ''
+
+    def serves(self, model_name: str) -> bool:
+        return model_name in self.models or f"{model_name}:latest" in self.models
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'models': sorted(self.models),
+            'outstanding': self.outstanding,
+            'total_requests': self.total_requests,
+            'failures': self.failures,
+            'last_error': self.last_error
+        }
+
+
+class OllamaEndpointPool:
+    """Least-outstanding-requests load balancer with health checks and failover."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or OLLAMA_POOL_CONFIG
+        urls = self.config.get('endpoints') or [LLM_CONFIG['ollama']['default_url']]
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        self._lock = threading.Lock()
+
+    def check_endpoint(self, endpoint: OllamaEndpoint):
+        """Probe one endpoint and record its health and models."""
+        try:
+            response = requests.get(f"{endpoint.url}/api/tags", timeout=self.config.get('probe_timeout', 5))
+            response.raise_for_status()
+            models = {model.get('name', '') for model in response.json().get('models', [])}
+            with self._lock:
+                endpoint.healthy = True
+                endpoint.models = models
+                endpoint.last_error = ''
+        except Exception as e:
+            with self._lock:
+                endpoint.healthy = False
+                endpoint.last_error = str(e)
+        finally:
+            endpoint.last_checked = time.time()
+
+    def refresh(self, force: bool = False):
+        """Health-check endpoints whose last check is stale (all of them if force)."""
+        now = time.time()
+        stale = [
+            endpoint for endpoint in self.endpoints
+            if force or now - endpoint.last_checked > (
+                self.config.get('health_check_interval', 30) if endpoint.healthy
+                else self.config.get('retry_unhealthy_after', 10)
+            )
+        ]
+        if len(stale) == 1:
+            self.check_endpoint(stale[0])
+        elif stale:
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                list(executor.map(self.check_endpoint, stale))
+
+    def get_available_models(self, refresh: bool = False) -> List[str]:
+        """Models served by at least one healthy endpoint."""
+        self.refresh(force=refresh)
+        models = set()
+        for endpoint in self.endpoints:
+            if endpoint.healthy:
+                models |= endpoint.models
+        # Ollama reports untagged models as 'name:latest'
+        return sorted(models | {name[:-7] for name in models if name.endswith(':latest')})
+
+    def select(self, model_name: str, exclude: Iterable[str] = ()) -> Optional[OllamaEndpoint]:
+        """Pick the healthy endpoint serving the model with the fewest requests in flight."""
+        self.refresh()
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.url not in excluded]
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+            # Prefer endpoints known to have the model; otherwise any healthy one, then anything left
+            serving = [endpoint for endpoint in healthy if endpoint.serves(model_name)]
+            pool = serving or healthy or candidates
+            if not pool:
+                return None
+            return min(pool, key=lambda endpoint: (endpoint.outstanding, endpoint.total_requests))
+
+    @contextmanager
+    def acquire(self, endpoint: OllamaEndpoint):
+        """Count a request as in flight on an endpoint."""
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.total_requests += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def mark_failed(self, endpoint: OllamaEndpoint, error: Exception, model_name: str = ''):
+        """Take an endpoint out of rotation (or just drop a model it turned out not to have)."""
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.last_error = str(error)
+            if getattr(error, 'status_code', None) == 404 and model_name:
+                endpoint.models.discard(model_name)
+                endpoint.models.discard(f"{model_name}:latest")
+            else:
+                endpoint.healthy = False
+            endpoint.last_checked = time.time()
+
+    @staticmethod
+    def is_failover_error(error: Exception) -> bool:
+        """Whether a request error means the endpoint (not the request) is at fault."""
+        if isinstance(error, (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)):
+            return True
+        # Model missing on this endpoint (ollama.ResponseError)
+        if getattr(error, 'status_code', None) == 404:
+            return True
+        return type(error).__name__ in FAILOVER_ERROR_NAMES
+
+    def call(self, model_name: str, request: Callable[[str], Any]) -> Any:
+        """
+        Run a request against the best endpoint, failing over on connection errors.
+
+        Args:
+            model_name: Model the request needs
+            request: Function taking the endpoint base URL and performing the request
+
+        Returns:
+            The request's return value
+        """
+        tried = []
+        last_error = None
+        for _ in range(self._max_attempts()):
+            endpoint = self.select(model_name, exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint.url)
+            try:
+                with self.acquire(endpoint):
+                    return request(endpoint.url)
+            except Exception as e:
+                if not self.is_failover_error(e):
+                    raise
+                self.mark_failed(endpoint, e, model_name)
+                last_error = e
+
+        raise NoHealthyEndpointError(f"No Ollama endpoint could serve {model_name}: {last_error}")
+
+    def stream(self, model_name: str, request: Callable[[str], Iterable[Any]]) -> Iterator[Any]:
+        """
+        Stream from the best endpoint. Fails over only before the first chunk,
+        so callers never see a response restart halfway.
+        """
+        tried = []
+        last_error = None
+        for _ in range(self._max_attempts()):
+            endpoint = self.select(model_name, exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint.url)
+            started = False
+            try:
+                with self.acquire(endpoint):
+                    for chunk in request(endpoint.url):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                if started or not self.is_failover_error(e):
+                    raise
+                self.mark_failed(endpoint, e, model_name)
+                last_error = e
+
+        raise NoHealthyEndpointError(f"No Ollama endpoint could serve {model_name}: {last_error}")
+
+    def _max_attempts(self) -> int:
+        return max(1, min(len(self.endpoints), self.config.get('max_failover_attempts', 3)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint health, models and load."""
+        with self._lock:
+            return {
+                'endpoints': [endpoint.to_dict() for endpoint in self.endpoints],
+                'healthy': sum(1 for endpoint in self.endpoints if endpoint.healthy),
+                'outstanding': sum(endpoint.outstanding for endpoint in self.endpoints)
+            }
+
+
+# Global endpoint pool, created lazily on first use
+ollama_pool = register_resource('ollama_pool', OllamaEndpointPool)
@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import sys
 import os
 
@@ -7,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import PAGE_CONFIG
 from database import db_manager
+from exporter import DEFAULT_EXPORT_COLUMNS, EXPORT_COLUMNS, available_formats
 from datetime import datetime
 
 st.set_page_config(**PAGE_CONFIG)
@@ -16,7 +18,47 @@ st.title("Database Management")
 
 st.header("Database Management")
 
-tab1, tab2, tab3, tab4 = st.tabs(["View Records", "Create Records", "Update Records", "Delete Records"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["View Records", "Create Records", "Update Records", "Delete Records", "Full-Text Search"])
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+def browse_records_page(key: str, default_page_size: int = 50):
+    """Search box and pager over the record catalog; returns the labels of the current page"""
+    def reset_page():
+        st.session_state[f"{key}_page"] = 1
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        search_term = st.text_input(
+            "Search records:",
+            placeholder="Name, email, field, level or file name (word prefixes)...",
+            key=f"{key}_search",
+            on_change=reset_page
+        )
+    with col2:
+        page_size = st.selectbox(
+            "Per page", PAGE_SIZES, index=PAGE_SIZES.index(default_page_size),
+            key=f"{key}_page_size", on_change=reset_page
+        )
+    
+    # One catalog query per render; the total comes back with the page
+    page_number = st.session_state.get(f"{key}_page", 1)
+    page = db_manager.browse_resume_records(search_term, (page_number - 1) * page_size, page_size)
+    page_count = max(1, -(-page['total'] // page_size))
+    if page_number > page_count:
+        # Records were deleted since the page was picked; show the last page instead
+        page_number = page_count
+        st.session_state[f"{key}_page"] = page_number
+        page = db_manager.browse_resume_records(search_term, (page_number - 1) * page_size, page_size)
+    with col3:
+        page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1, key=f"{key}_page")
+    
+    st.caption(f"{page['total']} matching records - page {page_number} of {page_count}")
+    return page['records']
+
+def record_label(record):
+    """Selectbox label for a catalog record"""
+    return f"{record['name'] or 'Unknown'} ({record['email'] or 'No email'}) - ID: {record['id'][:8]}..."
 
 def handle_delete_records():
     """Handle deleting records with confirmation"""
@@ -26,21 +68,14 @@ def handle_delete_records():
     # Only resume record deletion
     st.markdown("### **Delete Resume Record**")
     
-    # Get all resume IDs with preview
-    resume_ids = db_manager.get_all_resume_ids()
+    # One page of labels from the record catalog (no per-record fetches)
+    records = browse_records_page("delete")
     
-    if not resume_ids:
+    if not records:
         st.warning("No resume records found to delete.")
         return
     
-    # Create a mapping of IDs to names for better UX
-    id_name_mapping = {}
-    for rid in resume_ids:
-        record = db_manager.get_resume_by_id(rid)
-        if record:
-            name = record['metadata'].get('name', 'Unknown')
-            email = record['metadata'].get('email', 'No email')
-            id_name_mapping[rid] = f"{name} ({email}) - ID: {rid[:8]}..."
+    id_name_mapping = {record['id']: record_label(record) for record in records}
     
     selected_id = st.selectbox(
         "Select Resume Record to Delete",
@@ -83,44 +118,103 @@ def handle_view_records():
 
     st.subheader("View Database Records")
 
-    # Get resume data
-    df = db_manager.get_user_data()
+    # Paged from the record catalog, so the page stays fast on large pools
+    records = browse_records_page("view")
+
+    if records:
+        df_page = pd.DataFrame(records).rename(columns={
+            'name': 'Name',
+            'email': 'Email_ID',
+            'reco_field': 'Predicted_Field',
+            'cand_level': 'User_level',
+            'timestamp': 'Timestamp'
+        })
+        display_columns = ['Name', 'Email_ID', 'Predicted_Field', 'User_level', 'Timestamp', 'pdf_name']
+
+        st.dataframe(
+            df_page[display_columns],
+            use_container_width=True,
+            height=400
+        )
+    else:
+        st.warning("No resume records found in the database.")
 
-    if df is not None and not df.empty:
-        # Search functionality
-        search_term = st.text_input("Search records:", placeholder="Enter name, email, field, or skills...")
+    handle_export_records()
 
-        # Filter records based on search
-        if search_term:
-            mask = df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)
-            df_filtered = df[mask]
-        else:
-            df_filtered = df
-
-        # Display records with better formatting
-        if not df_filtered.empty:
-            # Select columns to display
-            display_columns = ['Name', 'Email_ID', 'Predicted_Field', 'User_level', 'Timestamp', 'pdf_name']
-            available_columns = [col for col in display_columns if col in df_filtered.columns]
-
-            st.dataframe(
-                df_filtered[available_columns],
-                use_container_width=True,
-                height=400
-            )
+def handle_export_records():
+    """Export the candidate pool (or a filtered part of it) as a streamed file"""
 
-            # Export option
-            csv = df_filtered.to_csv(index=False)
-            st.download_button(
-                label="Download Filtered Data as CSV",
-                data=csv,
-                file_name=f"resume_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+    with st.expander("Export Records"):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", available_formats(), key="export_format")
+            field_filter = st.multiselect("Fields", db_manager.get_distinct_values('field'), key="export_fields")
+        with col2:
+            columns = st.multiselect("Columns", list(EXPORT_COLUMNS), default=DEFAULT_EXPORT_COLUMNS, key="export_columns")
+            level_filter = st.multiselect("Levels", db_manager.get_distinct_values('level'), key="export_levels")
+
+        if st.button("Prepare Export", disabled=not columns, key="prepare_export"):
+            with st.spinner("Writing export file..."):
+                st.session_state.export_file = db_manager.export_resume_records(
+                    export_format,
+                    columns,
+                    filters={'reco_field': field_filter, 'cand_level': level_filter}
+                )
+
+        export_file = st.session_state.get('export_file')
+        if export_file and os.path.exists(export_file['path']):
+            st.caption(f"{export_file['rows']} records exported")
+            with open(export_file['path'], 'rb') as export_handle:
+                st.download_button(
+                    label="Download Export",
+                    data=export_handle,
+                    file_name=f"resume_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}{export_file['suffix']}",
+                    mime=export_file['mime'],
+                    key="download_export"
+                )
+
+def handle_fulltext_search():
+    """Keyword search over names, emails, skills, work history and resume text"""
+
+    st.subheader("Full-Text Search")
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        query = st.text_input(
+            "Search resumes:",
+            placeholder='e.g. "Bloomberg terminal" or kubernetes terraform',
+            key="fulltext_query"
+        )
+    with col2:
+        column = st.selectbox(
+            "In",
+            ["Everything", "name", "email", "skills", "experience", "resume_text"],
+            key="fulltext_column"
+        )
+    with col3:
+        match_all = st.checkbox("All words", value=True, key="fulltext_match_all")
+
+    if query:
+        matches = db_manager.fulltext_search(
+            query,
+            limit=50,
+            match_all=match_all,
+            column=None if column == "Everything" else column
+        )
+        if matches:
+            st.caption(f"{len(matches)} best matches")
+            for match in matches:
+                st.markdown(f"**{match['name'] or 'Unknown'}** ({match['email'] or 'No email'}) - ID: {match['id'][:8]}...")
+                st.markdown(f"> {match['snippet']}")
         else:
-            st.warning("No resume records found in the database.")
-    else:
-        st.warning("No resume records found in the database.")
+            st.info("No resumes match this search.")
+
+    with st.expander("Index maintenance"):
+        st.write("Rebuild the full-text index from the vector database if searches look out of date.")
+        if st.button("Rebuild Full-Text Index", key="rebuild_fulltext"):
+            with st.spinner("Reindexing resumes..."):
+                if db_manager.rebuild_fulltext_index():
+                    st.success("Full-text index rebuilt.")
 
 def handle_create_records():
     """Handle creating new records"""
@@ -198,15 +292,21 @@ def handle_update_records():
     if record_type == "Resume Record":
         st.markdown("### Update Resume Record")
         
-        # Get all resume IDs
-        resume_ids = db_manager.get_all_resume_ids()
+        # One page of labels from the record catalog
+        records = browse_records_page("update")
         
-        if not resume_ids:
+        if not records:
             st.warning("No resume records found to update.")
             return
         
         # Record selection
-        selected_id = st.selectbox("Select Resume ID to Update", resume_ids, key="update_resume_id")
+        id_name_mapping = {record['id']: record_label(record) for record in records}
+        selected_id = st.selectbox(
+            "Select Resume Record to Update",
+            options=list(id_name_mapping.keys()),
+            format_func=lambda x: id_name_mapping[x],
+            key="update_resume_id"
+        )
         
         if selected_id:
             # Get current record data
@@ -305,4 +405,7 @@ with tab3:
     handle_update_records()
 
 with tab4:
-    handle_delete_records()
\ No newline at end of file
+    handle_delete_records()
+
+with tab5:
+    handle_fulltext_search()
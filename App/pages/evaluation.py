@@ -5,7 +5,7 @@ import os
 # Add the App directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm_service import LLMService
+from llm_service import llm_service
 from llm_utils import export_metadata_to_json
 from config import PAGE_CONFIG, LLM_CONFIG
 from utils import get_system_info, get_location_info, generate_security_token, validate_file_upload, show_pdf, get_current_timestamp
@@ -21,21 +21,9 @@ st.set_page_config(**PAGE_CONFIG)
 st.title("Candidate Evaluation")
 
 # === LLM CONFIGURATION (HIDDEN) ===
-# Initialize LLM service with Ollama in background
-if 'llm_service' not in st.session_state:
-    llm_service = LLMService(provider='ollama')
-    st.session_state.llm_service = llm_service
-else:
-    llm_service = st.session_state.llm_service
-
+# The extractors share the process-wide llm_service, initialized on first use
 resume_processor = ResumeProcessor()
 
-# Configure the extractors to use the selected LLM service
-if 'llm_service' in st.session_state:
-    # Update the global llm_service used by extractors
-    import llm_service as llm_service_module
-    llm_service_module.llm_service = st.session_state.llm_service
-
 system_info = get_system_info()
 location_info = get_location_info()
 
@@ -683,7 +671,7 @@ def display_resume_results(resume, dev_mode=False):
             help="Download in legacy format for compatibility"
         )
 
-def prepare_user_data_from_resume(resume, system_info, location_info, sec_token, pdf_name, raw_resume_text=None):
+def prepare_user_data_from_resume(resume, system_info, location_info, sec_token, pdf_name, raw_resume_text=None, file_hash=''):
     """Prepare user data from Resume object for database insertion with field-specific career analysis and raw text."""
     
     # Use AI-extracted field, with intelligent fallbacks
@@ -868,6 +856,10 @@ def prepare_user_data_from_resume(resume, system_info, location_info, sec_token,
         'extracted_text': _create_tagged_resume_text(resume),
         'contact_info': f"{resume.email or ''} | {resume.contact_number or ''} | {resume.linkedin or ''} | {resume.github or ''}",
         
+        # Stored so re-submissions of the same CV can skip extraction
+        'resume_json': resume.model_dump_json(),
+        'file_sha256': file_hash,
+        
         # NEW: Raw resume text for comprehensive chatbot context
         'raw_resume_text': raw_resume_text or 'Not available'
     }
@@ -999,13 +991,35 @@ if pdf_file is not None:
                     # Display result in a structured way
                     display_resume_results(resume, debug_mode)
 
-                    # Prepare data for database with raw text
-                    user_data = prepare_user_data_from_resume(
-                        resume, system_info, location_info, sec_token, pdf_name, raw_extracted_text
-                    )
+                    duplicate = resume_processor.last_duplicate
+                    if duplicate:
+                        # Re-submitted CV: link it to the existing record instead of re-inserting
+                        existing_name = duplicate['metadata'].get('name', 'Unknown')
+                        st.info(
+                            f"**Already in the database** as {existing_name} "
+                            f"({duplicate['similarity']:.0%} match) - linked this submission to the existing record"
+                        )
+                        db_manager.link_submission(duplicate['id'], pdf_name, sec_token)
+                    else:
+                        # Prepare data for database with raw text
+                        user_data = prepare_user_data_from_resume(
+                            resume, system_info, location_info, sec_token, pdf_name, raw_extracted_text,
+                            file_hash=resume_processor.last_file_hash
+                        )
+
+                        # Updated version of a stored CV: re-extracted, so it updates that record
+                        near_duplicate = resume_processor.last_near_duplicate
+                        if near_duplicate:
+                            st.info(
+                                f"**Updated version of a stored CV** "
+                                f"({near_duplicate['metadata'].get('name', 'Unknown')}, {near_duplicate['similarity']:.0%} match) - "
+                                f"updating the existing record with the new extraction"
+                            )
 
-                    # Insert into ChromaDB vector database
-                    insertion_success = db_manager.insert_user_data(user_data)
+                        # Insert into ChromaDB vector database
+                        insertion_success = db_manager.insert_user_data(
+                            user_data, existing_record_id=near_duplicate['id'] if near_duplicate else None
+                        )
 
 
                 else:
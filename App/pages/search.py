@@ -4,13 +4,16 @@ import sys
 import os
 import pandas as pd
 import re
+import hashlib
+import json
 
 # Add the App directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm_service import llm_service
-from config import PAGE_CONFIG, SPECIALISTS_CONFIG
+from config import MEMORY_CONFIG, PAGE_CONFIG, SPECIALISTS_CONFIG
 from database import db_manager
+from exporter import write_rows
 from analyzers import JobDescriptionAnalyzer
 from db_specialists import FilterMatchingSpecialist
 
@@ -103,6 +106,52 @@ def parse_work_experience(work_exp_text):
     
     return organized_jobs
 
+def search_result_export_row(result):
+    """Export row for one search result"""
+    metadata = result['metadata']
+    # Ensure similarity score is properly formatted for export
+    similarity_score = result.get('similarity_score', 0)
+    if similarity_score > 1:  # Already in percentage format
+        similarity_percent = round(similarity_score, 1)
+    else:  # Convert from decimal to percentage
+        similarity_percent = round(similarity_score * 100, 1)
+    
+    return {
+        'Name': metadata.get('name', 'Unknown'),
+        'Email': metadata.get('email', 'Not provided'),
+        'Field': metadata.get('reco_field', 'General'),
+        'Level': metadata.get('cand_level', 'Unknown'),
+        'Match Score (%)': similarity_percent,
+        'Location': f"{metadata.get('city', 'Unknown')}, {metadata.get('state', 'Unknown')}",
+        'Years Experience': metadata.get('years_of_experience', 'Not specified'),
+        'Skills': str(metadata.get('skills', '')).replace('[', '').replace(']', '').replace("'", ""),
+        'File': metadata.get('pdf_name', 'Unknown')
+    }
+
+
+def get_search_results_export(search_results, search_type):
+    """
+    CSV export of a result set, written once and reused across reruns.
+    
+    The file is cached in session state per search type, keyed by a hash of the
+    rows; a new result set replaces (and removes) the previous file.
+    """
+    export_columns = ['Name', 'Email', 'Field', 'Level', 'Match Score (%)', 'Location', 'Years Experience', 'Skills', 'File']
+    rows = [search_result_export_row(result) for result in search_results]
+    fingerprint = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    exports = st.session_state.setdefault('search_result_exports', {})
+    cached = exports.get(search_type)
+    if cached and cached['fingerprint'] == fingerprint and os.path.exists(cached['path']):
+        return cached
+    
+    if cached and os.path.exists(cached['path']):
+        os.remove(cached['path'])
+    export_file = write_rows(rows, 'csv', export_columns)
+    export_file['fingerprint'] = fingerprint
+    exports[search_type] = export_file
+    return export_file
+
 def display_search_results(search_results, search_type):
     """Display search results with streamlined UX - click candidate to see everything"""
     
@@ -321,38 +370,16 @@ def display_search_results(search_results, search_type):
         col1, col2 = st.columns(2)
         
         with col1:
-            # Create downloadable CSV
-            export_data = []
-            for result in search_results:
-                metadata = result['metadata']
-                # Ensure similarity score is properly formatted for export
-                similarity_score = result.get('similarity_score', 0)
-                if similarity_score > 1:  # Already in percentage format
-                    similarity_percent = round(similarity_score, 1)
-                else:  # Convert from decimal to percentage
-                    similarity_percent = round(similarity_score * 100, 1)
-                
-                export_data.append({
-                    'Name': metadata.get('name', 'Unknown'),
-                    'Email': metadata.get('email', 'Not provided'),
-                    'Field': metadata.get('reco_field', 'General'),
-                    'Level': metadata.get('cand_level', 'Unknown'),
-                    'Match Score (%)': similarity_percent,
-                    'Location': f"{metadata.get('city', 'Unknown')}, {metadata.get('state', 'Unknown')}",
-                    'Years Experience': metadata.get('years_of_experience', 'Not specified'),
-                    'Skills': str(metadata.get('skills', '')).replace('[', '').replace(']', '').replace("'", ""),
-                    'File': metadata.get('pdf_name', 'Unknown')
-                })
-            
-            export_df = pd.DataFrame(export_data)
-            csv = export_df.to_csv(index=False)
+            # Stream the results to a CSV file instead of building a DataFrame
+            export_file = get_search_results_export(search_results, search_type)
             
-            st.download_button(
-                label="Download Search Results CSV",
-                data=csv,
-                file_name=f"candidate_search_results_{search_type.replace(' ', '_').lower()}.csv",
-                mime="text/csv"
-            )
+            with open(export_file['path'], 'rb') as export_handle:
+                st.download_button(
+                    label="Download Search Results CSV",
+                    data=export_handle,
+                    file_name=f"candidate_search_results_{search_type.replace(' ', '_').lower()}.csv",
+                    mime="text/csv"
+                )
         
         with col2:
             pass
@@ -370,8 +397,8 @@ def apply_candidate_filters(field_filter, level_filter, city_filter, state_filte
         # Check if LLM specialist is available, fallback to simple matching if not
         use_llm_filtering = filter_specialist.is_available()
         
-        # Get all user data
-        user_data = db_manager.get_user_data()
+        # Typed candidate fields from the metadata snapshot
+        user_data = db_manager.get_candidate_frame()
         if user_data is None or user_data.empty:
             return []
         
@@ -575,6 +602,7 @@ def apply_candidate_filters(field_filter, level_filter, city_filter, state_filte
         results = []
         for _, row in filtered_data.iterrows():
             results.append({
+                'id': row.get('id'),
                 'name': row['Name'],
                 'email': row['Email_ID'],  
                 'field': row['Predicted_Field'],
@@ -602,6 +630,14 @@ def convert_filter_results_to_search_format(filter_results):
     if not filter_results:
         return []
     
+    # Fetch just the matched records when the filter results carry their IDs
+    record_ids = [candidate.get('id') for candidate in filter_results]
+    if all(record_ids):
+        return [
+            {**result, 'similarity_score': 100.0}  # Perfect match for filter results
+            for result in db_manager.get_resumes_by_ids(record_ids)
+        ]
+    
     # Get full user data for additional metadata
     try:
         user_data = db_manager.get_user_data()
@@ -722,15 +758,10 @@ def handle_filter_method():
     with col2:
         st.markdown("**Location**")
 
-        # Get unique locations from database for filter options using proper column names
+        # Location filter options come from the analytics aggregates (no collection scan)
         try:
-            user_data = db_manager.get_user_data()
-            if user_data is not None and not user_data.empty:
-                cities = ['All Cities'] + sorted([city for city in user_data['city'].dropna().unique() if city])
-                states = ['All States'] + sorted([state for state in user_data['state'].dropna().unique() if state])
-            else:
-                cities = ['All Cities']
-                states = ['All States']
+            cities = ['All Cities'] + sorted(db_manager.get_distinct_values('city'))
+            states = ['All States'] + sorted(db_manager.get_distinct_values('state'))
         except Exception as e:
             st.warning(f"Could not load location data: {e}")
             cities = ['All Cities']
@@ -835,7 +866,11 @@ Responsibilities:
     with col2:
         st.markdown("**Search Options:**")
         num_results = st.selectbox("Max Results", [5, 10, 15, 20], index=2, key="jd_results")
-        match_threshold = st.slider("Match Threshold %", 10, 90, 60, 5, key="jd_threshold")
+        match_threshold = st.slider(
+            "Match Threshold %", 10, 95, 80, 5, key="jd_threshold",
+            help="Minimum cosine similarity between the job description and a resume "
+                 "(100% = same meaning; unrelated texts usually score below 70%)."
+        )
 
         st.markdown("**Quick Templates:**")
         templates = {
@@ -991,6 +1026,9 @@ def handle_chat_search():
         st.session_state.chat_history = []
     if "processing_message" not in st.session_state:
         st.session_state.processing_message = False
+    # Bounded per-session memory sent to the response specialists
+    if "chat_memory" not in st.session_state:
+        st.session_state.chat_memory = candidate_chatbot.create_memory()
 
     # Create a single chat container for all interactions
     chat_container = st.container(height=400)
@@ -1041,7 +1079,7 @@ def handle_chat_search():
     if st.button("Clear Chat History", key="clear_chat", help="Clear chat history"):
         st.session_state.chat_history = []
         st.session_state.processing_message = False
-        candidate_chatbot.clear_history()
+        st.session_state.chat_memory.clear()
         st.rerun()
 
     # Handle example query from buttons
@@ -1072,7 +1110,7 @@ def handle_chat_search():
                 with st.chat_message("assistant"):
                     try:
                         # Use streaming chat and display with write_stream
-                        response_generator = candidate_chatbot.chat_stream(last_message["user"])
+                        response_generator = candidate_chatbot.chat_stream(last_message["user"], memory=st.session_state.chat_memory)
                         response = st.write_stream(response_generator)
                         
                         # Check if response contains screenshot information
@@ -1108,6 +1146,8 @@ def handle_chat_search():
             "user": user_input,
             "assistant": None  # Placeholder for assistant response
         })
+        # Keep the displayed history bounded; the memory keeps a summary of older turns
+        st.session_state.chat_history = st.session_state.chat_history[-MEMORY_CONFIG['max_display_turns']:]
         
         # Set processing flag
         st.session_state.processing_message = True
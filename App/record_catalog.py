@@ -0,0 +1,133 @@
+"""
+Record catalog for browsing the resume pool.
+
+A SQLite side table holds the few metadata fields needed to list and pick
+records (name, email, field, level, timestamp, file name), plus an inverted
+index of lowercase word prefixes. Pages of labels and prefix searches are
+answered from indexes, without fetching documents or the large metadata
+blobs from Chroma. VectorDatabaseManager keeps the catalog in step with every
+write.
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+LABEL_FIELDS = ('name', 'email', 'reco_field', 'cand_level', 'timestamp', 'pdf_name')
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def index_terms(metadata: Dict[str, Any]) -> List[str]:
+    """Lowercase words a record can be found by (name, email parts, field, level, file name)."""
+    terms = set()
+    for key in ('name', 'email', 'reco_field', 'cand_level', 'pdf_name'):
+        terms.update(term.lower() for term in _TERM_PATTERN.findall(str(metadata.get(key) or '')))
+    email = str(metadata.get('email') or '').strip().lower()
+    if email:
+        terms.add(email)
+    return sorted(terms)
+
+
+class RecordCatalog:
+    """Projected record labels with indexed paging and prefix search."""
+
+    def __init__(self, path: Optional[str]):
+        """
+        Args:
+            path: SQLite file for the catalog (None keeps it in memory only)
+        """
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "record_id TEXT PRIMARY KEY, name TEXT, email TEXT, reco_field TEXT, "
+            "cand_level TEXT, timestamp TEXT, pdf_name TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS terms (term TEXT NOT NULL, record_id TEXT NOT NULL, PRIMARY KEY (term, record_id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS terms_record ON terms (record_id)")
+        self._db.commit()
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def apply(self, record_ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Insert or refresh the labels and search terms of records."""
+        with self._lock, self._db:
+            for record_id, metadata in zip(record_ids, metadatas):
+                self._db.execute(
+                    "INSERT OR REPLACE INTO records (record_id, name, email, reco_field, cand_level, timestamp, pdf_name) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (record_id, *(str(metadata.get(field) or '') for field in LABEL_FIELDS))
+                )
+                self._db.execute("DELETE FROM terms WHERE record_id = ?", (record_id,))
+                self._db.executemany(
+                    "INSERT INTO terms (term, record_id) VALUES (?, ?)",
+                    [(term, record_id) for term in index_terms(metadata)]
+                )
+
+    def remove(self, record_ids: List[str]):
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM records WHERE record_id = ?", [(record_id,) for record_id in record_ids])
+            self._db.executemany("DELETE FROM terms WHERE record_id = ?", [(record_id,) for record_id in record_ids])
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM records")
+            self._db.execute("DELETE FROM terms")
+
+    def rebuild(self, collection, batch_size: int = 1000):
+        """Recatalog every record from the collection."""
+        self.clear()
+        offset = 0
+        while True:
+            batch = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+            if not batch['ids']:
+                break
+            self.apply(batch['ids'], batch['metadatas'])
+            offset += len(batch['ids'])
+
+    def _search_clause(self, search: str) -> Tuple[str, List[str]]:
+        """WHERE clause matching records with a term starting with every search word (index range scans)."""
+        words = [word.lower() for word in _TERM_PATTERN.findall(search or '')]
+        if not words:
+            return '', []
+
+        clauses, params = [], []
+        for word in words:
+            clauses.append("record_id IN (SELECT record_id FROM terms WHERE term >= ? AND term < ?)")
+            params.extend([word, word + '\U0010ffff'])
+        return "WHERE " + " AND ".join(clauses), params
+
+    def page(self, search: str = '', offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, str]], int]:
+        """
+        One page of record labels, newest first.
+
+        Args:
+            search: Words that must each prefix a word of the name, email, field, level or file name
+            offset: Records to skip
+            limit: Page size
+
+        Returns:
+            (labels, total number of matching records)
+        """
+        where, params = self._search_clause(search)
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM records {where}", params).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT record_id, {', '.join(LABEL_FIELDS)} FROM records {where} "
+                "ORDER BY timestamp DESC, record_id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        return [dict(zip(('id',) + LABEL_FIELDS, row)) for row in rows], total
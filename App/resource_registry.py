@@ -0,0 +1,122 @@
+"""
+Process-wide registry of lazily initialized shared resources.
+
+Heavy singletons (vector database, LLM service, chatbot) are registered here
+instead of being constructed at import time. Each registered name is exposed
+as a proxy that builds the real object on first attribute access, so existing
+``from database import db_manager`` style imports keep working while page
+loads no longer pay for model loading up front.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class LazyResource:
+    """Proxy that constructs its target on first use (thread-safe)."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_init_seconds', None)
+
+    def get(self) -> Any:
+        """Return the underlying instance, creating it if necessary."""
+        instance = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                object.__setattr__(self, '_instance', self._factory())
+                object.__setattr__(self, '_init_seconds', time.perf_counter() - start)
+            return self._instance
+
+    def is_initialized(self) -> bool:
+        """Check whether the resource has been constructed."""
+        return self._instance is not None
+
+    def reset(self):
+        """Drop the instance so the next use rebuilds it."""
+        with self._lock:
+            object.__setattr__(self, '_instance', None)
+            object.__setattr__(self, '_init_seconds', None)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self.get(), attr, value)
+
+    def __enter__(self):
+        return self.get().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self.get().__exit__(exc_type, exc_val, exc_tb)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self.is_initialized() else "not initialized"
+        return f"<LazyResource {self._name} ({state})>"
+
+
+_registry: Dict[str, LazyResource] = {}
+_registry_lock = threading.Lock()
+
+
+def register_resource(name: str, factory: Callable[[], Any]) -> LazyResource:
+    """Register a factory under a name and return its lazy proxy."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = LazyResource(name, factory)
+        return _registry[name]
+
+
+def get_resource(name: str) -> Any:
+    """Get the initialized instance for a registered name."""
+    return _registry[name].get()
+
+
+def get_resource_status() -> Dict[str, Dict[str, Any]]:
+    """Get initialization state and cost for every registered resource."""
+    return {
+        name: {
+            'initialized': resource.is_initialized(),
+            'init_seconds': resource._init_seconds
+        }
+        for name, resource in _registry.items()
+    }
+
+
+def warm_up(names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+    """
+    Initialize registered resources ahead of first use.
+
+    Args:
+        names: Resource names to warm up (all registered resources if None)
+        background: Run in a daemon thread instead of blocking the caller
+
+    Returns:
+        The warm-up thread when running in the background, otherwise None
+    """
+    targets = list(names) if names is not None else list(_registry.keys())
+
+    def _run():
+        for name in targets:
+            resource = _registry.get(name)
+            if resource is None:
+                continue
+            try:
+                resource.get()
+            except Exception as e:
+                print(f"Warm-up failed for {name}: {e}")
+
+    if not background:
+        _run()
+        return None
+
+    thread = threading.Thread(target=_run, name="resource-warm-up", daemon=True)
+    thread.start()
+    return thread
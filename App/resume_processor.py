@@ -2,16 +2,27 @@
 Resume processor using specialized extractors for sequential processing.
 
 Key optimizations:
-- Profile and Education extractors use only first page text for better focus and efficiency
-- Skills, Experience, and YoE extractors use full document text for comprehensive analysis
+- Profile extractor uses only first page text for better focus and efficiency
+- Skills, Education, Experience, and YoE extractors get only their resume sections
+  (found by a deterministic heading-based segmenter), falling back to the full
+  text (first page for Education) when segmentation is not confident
+- Optional combined mode extracts every section in one ResumeMetadata call and
+  re-runs specialized extractors only for sections that fail validation
+- Exact re-uploads (same file hash) reuse the stored extraction; near-duplicate
+  text is re-extracted so edits (a new job, new skills) update the existing record
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import streamlit as st
 from pdf_processing import pdf_processor
+from database import db_manager
+from dedup import file_sha256
+from config import EXTRACTION_CONFIG
 from extractors import (
     ProfileExtractor, SkillsExtractor, EducationExtractor,
-    ExperienceExtractor, YoeExtractor
+    ExperienceExtractor, YoeExtractor, CombinedExtractor, SectionSegmenter
 )
+from extractors.section_segmenter import estimate_tokens
+from llm_scheduler import request_priority
 from models import Resume
 
 
@@ -35,19 +46,51 @@ class ResumeProcessor:
         self.education_extractor = EducationExtractor()
         self.experience_extractor = ExperienceExtractor()
         self.yoe_extractor = YoeExtractor()
+        self.combined_extractor = CombinedExtractor()
+        self.section_segmenter = SectionSegmenter()
+        
+        # Per-extractor input sizes of the last processed resume
+        self.last_section_report = None
+        
+        # Duplicate detection state of the last processed file
+        self.last_file_hash = ''
+        self.last_duplicate = None  # Exact re-upload whose extraction was reused
+        self.last_near_duplicate = None  # Existing record the re-extracted CV should update
     
-    def process_resume(self, pdf_file_path: str, development_mode: bool = False) -> tuple[Resume, str]:
+    def process_resume(
+        self,
+        pdf_file_path: str,
+        development_mode: bool = False,
+        priority: str = 'upload'
+    ) -> tuple[Resume, str]:
         """
         Process a single resume file using sequential extraction.
         
         Args:
             pdf_file_path: Path to the PDF resume file
             development_mode: Whether to show detailed extraction process
+            priority: LLM scheduler class ('upload' for a single upload, 'bulk' for batch/backfill jobs)
             
         Returns:
             Tuple of (Resume object with all extracted information, Raw extracted text)
         """
+        with request_priority(priority):
+            return self._process_resume(pdf_file_path, development_mode)
+    
+    def _process_resume(self, pdf_file_path: str, development_mode: bool) -> tuple[Resume, str]:
+        self.last_file_hash = ''
+        self.last_duplicate = None
+        self.last_near_duplicate = None
+        self.last_section_report = None
+        
         try:
+            # Exact re-upload: skip OCR and extraction entirely
+            self.last_file_hash = file_sha256(pdf_file_path)
+            duplicate = db_manager.find_duplicate_submission(file_hash=self.last_file_hash)
+            reused = self._reuse_duplicate(duplicate, pdf_file_path, development_mode)
+            if reused:
+                return reused
+            
             # Extract text from the resume
             if development_mode:
                 st.info("**Extracting text from PDF...**")
@@ -58,6 +101,15 @@ class ResumeProcessor:
                 st.warning("Resume text extraction failed or text too short")
                 return self._create_empty_resume(pdf_file_path), "Text extraction failed"
             
+            # Near-duplicate of an existing CV (e.g. an updated version): still extract it, since
+            # a new job or skills stays within the similarity threshold, but update that record
+            self.last_near_duplicate = db_manager.find_duplicate_submission(text=extracted_text)
+            if self.last_near_duplicate and development_mode:
+                st.info(
+                    f"**Near-duplicate of record {self.last_near_duplicate['id']}** "
+                    f"(similarity {self.last_near_duplicate['similarity']:.0%}) - re-extracting to update it"
+                )
+            
             # Extract first page text for profile extraction (more efficient and focused)
             first_page_text = pdf_processor.extract_first_page_with_pymupdf4llm(pdf_file_path)
             
@@ -75,7 +127,10 @@ class ResumeProcessor:
             if development_mode:
                 st.info("**Starting extraction with specialized extractors...**")
             
-            results = self._process_sequential(extracted_text, first_page_text, development_mode)
+            if EXTRACTION_CONFIG.get('mode', 'specialized') == 'combined':
+                results = self._process_combined(extracted_text, first_page_text, development_mode)
+            else:
+                results = self._process_sequential(extracted_text, first_page_text, development_mode)
             
             if development_mode:
                 st.success("**Extraction completed!**")
@@ -141,7 +196,76 @@ class ResumeProcessor:
             
             return self._create_empty_resume(pdf_file_path), "Processing failed"
     
-    def _process_sequential(self, extracted_text: str, first_page_text: str, development_mode: bool) -> Dict[str, Any]:
+    def _reuse_duplicate(
+        self,
+        duplicate: Optional[Dict[str, Any]],
+        pdf_file_path: str,
+        development_mode: bool
+    ) -> Optional[tuple[Resume, str]]:
+        """Rebuild the Resume stored with a duplicate record instead of re-extracting it."""
+        if not duplicate or not duplicate['metadata'].get('resume_json'):
+            # Records stored before extractions were kept can't be reused
+            return None
+        
+        try:
+            resume = Resume.model_validate_json(duplicate['metadata']['resume_json'])
+        except Exception:
+            return None
+        
+        resume.file_path = pdf_file_path
+        self.last_duplicate = duplicate
+        
+        if development_mode:
+            st.info(
+                f"**Duplicate detected** ({duplicate['match_type']}, similarity {duplicate['similarity']:.0%}) - "
+                f"reusing extraction of record {duplicate['id']}"
+            )
+        
+        return resume, duplicate['metadata'].get('raw_resume_text', '')
+    
+    def _process_combined(self, extracted_text: str, first_page_text: str, development_mode: bool) -> Dict[str, Any]:
+        """
+        Extract every section in one call, falling back per section to the specialized extractors.
+        
+        Args:
+            extracted_text: The full extracted resume text
+            first_page_text: The extracted first page text (for fallback profile extraction)
+            development_mode: Whether to show detailed process
+            
+        Returns:
+            Dictionary containing all extraction results
+        """
+        if development_mode:
+            st.info("Processing combined extractor (all sections in one call)...")
+        
+        try:
+            combined = self.combined_extractor.extract(extracted_text, development_mode)
+        except Exception as e:
+            if development_mode:
+                st.error(f"Combined extraction failed: {e}")
+            combined = {'results': {}, 'failed_sections': ['profile', 'skills', 'education', 'experience', 'yoe']}
+        
+        results = combined['results']
+        failed_sections = combined['failed_sections']
+        
+        if development_mode:
+            if failed_sections:
+                st.warning(f"Sections that failed validation, re-extracting separately: {', '.join(failed_sections)}")
+            else:
+                st.success("Combined extraction completed - all sections valid")
+        
+        if failed_sections:
+            results.update(self._process_sequential(extracted_text, first_page_text, development_mode, failed_sections))
+        
+        return results
+    
+    def _process_sequential(
+        self,
+        extracted_text: str,
+        first_page_text: str,
+        development_mode: bool,
+        extractor_names: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Process extractors sequentially (optimized for local Ollama setups).
         
@@ -149,11 +273,19 @@ class ResumeProcessor:
             extracted_text: The full extracted resume text
             first_page_text: The extracted first page text (for profile extraction)
             development_mode: Whether to show detailed process
+            extractor_names: Only run these extractors (default: all)
             
         Returns:
-            Dictionary containing all extraction results
+            Dictionary containing the extraction results
         """
         results = {}
+        segmentation = None
+        if EXTRACTION_CONFIG.get('section_segmentation', True):
+            segmentation = self.section_segmenter.segment(extracted_text)
+            if development_mode:
+                self._display_segmentation(segmentation)
+        
+        report = {'segmentation_confidence': segmentation['confidence'] if segmentation else None, 'extractors': {}}
         extractors = [
             ("profile", self.profile_extractor),
             ("skills", self.skills_extractor),
@@ -161,6 +293,8 @@ class ResumeProcessor:
             ("experience", self.experience_extractor),
             ("yoe", self.yoe_extractor)
         ]
+        if extractor_names is not None:
+            extractors = [(name, extractor) for name, extractor in extractors if name in extractor_names]
         
         # Process each extractor one by one
         for extractor_name, extractor in extractors:
@@ -170,15 +304,29 @@ class ResumeProcessor:
                 
                 # Use first page text for profile and education extraction, full text for others
                 if extractor_name in ["profile", "education"] and first_page_text:
-                    if development_mode:
-                        st.info(f"Using first page text for {extractor_name} extraction (more focused and efficient)")
-                    result = extractor.extract(first_page_text, development_mode)
-                elif extractor_name in ["profile", "education"] and not first_page_text:
-                    if development_mode:
-                        st.warning(f"First page extraction failed, using full text for {extractor_name} extraction")
-                    result = extractor.extract(extracted_text, development_mode)
+                    default_text = first_page_text
                 else:
-                    result = extractor.extract(extracted_text, development_mode)
+                    if extractor_name in ["profile", "education"] and development_mode:
+                        st.warning(f"First page extraction failed, using full text for {extractor_name} extraction")
+                    default_text = extracted_text
+                
+                # Route only the relevant sections when the segmentation is confident
+                input_text, source = default_text, 'fallback'
+                if segmentation:
+                    input_text, source = self.section_segmenter.get_extractor_text(extractor_name, segmentation, default_text)
+                
+                report['extractors'][extractor_name] = {
+                    'source': source,
+                    'baseline_tokens': estimate_tokens(default_text),
+                    'input_tokens': estimate_tokens(input_text)
+                }
+                if development_mode:
+                    if source == 'sections':
+                        st.info(f"Using {extractor_name} sections ({len(input_text)} of {len(default_text)} characters)")
+                    elif default_text is first_page_text:
+                        st.info(f"Using first page text for {extractor_name} extraction (more focused and efficient)")
+                
+                result = extractor.extract(input_text, development_mode)
                 
                 results[extractor_name] = result
                 
@@ -201,8 +349,35 @@ class ResumeProcessor:
                 elif extractor_name == 'yoe':
                     results[extractor_name] = {'yoe': {}}
         
+        baseline_tokens = sum(entry['baseline_tokens'] for entry in report['extractors'].values())
+        input_tokens = sum(entry['input_tokens'] for entry in report['extractors'].values())
+        report['baseline_tokens'] = baseline_tokens
+        report['input_tokens'] = input_tokens
+        report['tokens_saved'] = baseline_tokens - input_tokens
+        report['savings_ratio'] = (baseline_tokens - input_tokens) / baseline_tokens if baseline_tokens else 0.0
+        self.last_section_report = report
+        
+        if development_mode:
+            st.info(
+                f"**Prompt input:** ~{input_tokens:,} tokens instead of ~{baseline_tokens:,} "
+                f"({report['savings_ratio']:.0%} saved by section routing)"
+            )
+        
         return results
     
+    def _display_segmentation(self, segmentation: Dict[str, Any]):
+        """Show identified sections in development mode."""
+        confidence = segmentation['confidence']
+        if confidence < EXTRACTION_CONFIG['min_confidence']:
+            st.warning(f"**Section segmentation confidence {confidence:.2f}** - extractors will use the full text")
+        else:
+            st.info(f"**Sections identified** (confidence {confidence:.2f}): {', '.join(segmentation['sections'])}")
+        
+        with st.expander("Identified Sections"):
+            for name, section in segmentation['sections'].items():
+                st.markdown(f"**{name}** - {len(section['content'])} characters, confidence {section['confidence']:.2f}")
+                st.text(section['content'][:300] + "..." if len(section['content']) > 300 else section['content'])
+    
     def _create_empty_resume(self, pdf_file_path: str) -> Resume:
         """Create an empty resume object as fallback."""
         return Resume(
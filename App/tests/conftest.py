@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+# App modules import each other as top-level modules (from config import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StandInServer:
+    """
+    Local HTTP server standing in for a remote service (Ollama, ipinfo, Nominatim).
+
+    Routes map (method, path) to a handler taking the parsed JSON request body
+    (None for GET) and returning (status, JSON payload). Every request path,
+    query string included, is recorded in `requests`.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        self._stopped = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method):
+                server.requests.append(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                handler = server.routes.get((method, urlsplit(self.path).path))
+                status, payload = handler(body) if handler else (404, None)
+
+                data = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Shut the server down; later connections are refused."""
+        if not self._stopped:
+            self._stopped = True
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+
+@pytest.fixture
+def stand_in_server():
+    """Factory starting StandInServers that are stopped after the test."""
+    servers = []
+
+    def start(routes):
+        server = StandInServer(routes)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,27 @@
+"""ConversationMemory rolling summary."""
+import threading
+import time
+
+from config import MEMORY_CONFIG
+from conversation_memory import ConversationMemory
+
+
+def test_clear_drops_summary_finished_after_it():
+    release = threading.Event()
+
+    def summarizer(summary, turns, max_words):
+        release.wait(5)
+        return "summary of the old conversation"
+
+    memory = ConversationMemory('gemma3:4b', summarizer, dict(MEMORY_CONFIG, window_turns=1, background_summary=True))
+    memory.add_turn('first question', 'first answer')
+    memory.add_turn('second question', 'second answer')  # Evicts the first turn and starts summarizing
+
+    memory.clear()
+    release.set()
+    deadline = time.time() + 5
+    while memory._summarizing and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert memory.summary == ''
+    assert memory.render() == "No previous conversation."
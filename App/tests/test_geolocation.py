@@ -0,0 +1,129 @@
+"""GeolocationService against a local stand-in for the ipinfo and Nominatim endpoints."""
+import time
+
+import pytest
+
+from config import GEOLOCATION_CONFIG
+from geolocation import GeolocationService, OfflineReverseGeocoder
+
+IP_RESPONSE = {'loc': '22.2783,114.1747', 'city': 'Hong Kong', 'region': 'Hong Kong', 'country': 'HK'}
+REVERSE_RESPONSE = {'address': {'city': 'Wan Chai', 'state': 'Hong Kong Island', 'country': 'Hong Kong'}}
+
+
+@pytest.fixture
+def geo_server(stand_in_server):
+    """Stand-in for both endpoints; set `mode` to 'error' (HTTP 500) or 'slow' (longer than the client timeout)."""
+    def respond(payload):
+        def handler(body):
+            if server.mode == 'slow':
+                time.sleep(0.5)
+            return (500, None) if server.mode == 'error' else (200, payload)
+        return handler
+
+    server = stand_in_server({
+        ('GET', '/ip'): respond(IP_RESPONSE),
+        ('GET', '/reverse'): respond(REVERSE_RESPONSE)
+    })
+    server.mode = 'ok'
+    return server
+
+
+def make_service(server, **overrides):
+    config = dict(
+        GEOLOCATION_CONFIG,
+        ip_endpoint=f"{server.url}/ip",
+        reverse_endpoint=f"{server.url}/reverse",
+        timeout=0.2,
+        ttl_seconds=60,
+        failure_ttl_seconds=60
+    )
+    config.update(overrides)
+    return GeolocationService(config)
+
+
+def write_cities(path, rows):
+    path.write_text("city,state,country,lat,lon\n" + "".join(f"{row}\n" for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def test_location_is_cached_for_ttl(geo_server):
+    service = make_service(geo_server)
+
+    first = service.locate()
+    second = service.locate()
+
+    assert first == second
+    assert first['city'] == 'Wan Chai'
+    assert first['country'] == 'Hong Kong'
+    assert service.lookups == 1
+    assert service.hits == 1
+    assert len(geo_server.requests) == 2  # One IP lookup and one reverse lookup
+
+
+def test_location_is_looked_up_again_after_ttl(geo_server):
+    service = make_service(geo_server, ttl_seconds=0.1)
+
+    service.locate()
+    time.sleep(0.2)
+    service.locate()
+
+    assert service.lookups == 2
+    assert service.hits == 0
+
+
+@pytest.mark.parametrize('mode', ['error', 'slow'])
+def test_failure_is_cached_for_failure_ttl(geo_server, mode):
+    geo_server.mode = mode
+    service = make_service(geo_server)
+
+    assert service.locate()['city'] == ''
+    requests_after_failure = len(geo_server.requests)
+
+    geo_server.mode = 'ok'
+    assert service.locate()['city'] == ''  # Still within the failure TTL, no retry
+    assert len(geo_server.requests) == requests_after_failure
+    assert service.failures == 1
+    assert service.hits == 1
+
+
+def test_failure_is_retried_after_failure_ttl(geo_server):
+    geo_server.mode = 'error'
+    service = make_service(geo_server, failure_ttl_seconds=0.1)
+    service.locate()
+
+    geo_server.mode = 'ok'
+    time.sleep(0.2)
+    assert service.locate()['city'] == 'Wan Chai'
+    assert service.lookups == 2
+
+
+def test_skip_makes_no_network_calls(geo_server):
+    service = make_service(geo_server)
+
+    location = service.locate(skip=True)
+
+    assert location == {'latlong': '', 'city': '', 'state': '', 'country': ''}
+    assert geo_server.requests == []
+    assert service.skipped == 1
+
+
+def test_offline_reverse_geocoder_finds_nearest_city(tmp_path):
+    dataset = write_cities(tmp_path / 'cities.csv', [
+        "Hong Kong,Hong Kong,HK,22.2783,114.1747",
+        "Shenzhen,Guangdong,CN,22.5431,114.0579",
+        "London,England,GB,51.5074,-0.1278"
+    ])
+    geocoder = OfflineReverseGeocoder(dataset, max_distance_km=50)
+
+    assert geocoder.reverse(22.30, 114.17)['city'] == 'Hong Kong'
+    assert geocoder.reverse(22.55, 114.10)['city'] == 'Shenzhen'
+    assert geocoder.reverse(51.50, -0.12)['country'] == 'GB'
+    assert geocoder.reverse(0.0, 0.0) is None  # Nothing within 50 km
+
+
+def test_offline_dataset_answers_reverse_lookup_without_network(geo_server, tmp_path):
+    dataset = write_cities(tmp_path / 'cities.csv', ["Hong Kong,Hong Kong,HK,22.2783,114.1747"])
+    service = make_service(geo_server, offline_dataset=dataset)
+
+    assert service.locate()['city'] == 'Hong Kong'
+    assert geo_server.requests == ['/ip']
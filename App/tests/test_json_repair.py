@@ -0,0 +1,37 @@
+"""repair_json / StreamingJSONParser on raw LLM output."""
+import pytest
+
+from json_repair import JSONRepairError, StreamingJSONParser, repair_json
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('{"k": "a\nb"}', 'a\nb'),
+    ('{"k": "a\there"}', 'a\there'),
+    ('{"k": "a\r\nb"}', 'a\r\nb'),
+    ('{"k": "page\fbreak\bx"}', 'page\fbreak\bx'),
+    ('{"k": "bell\x07 and \x1f"}', 'bell\x07 and \x1f'),
+])
+def test_raw_control_characters_in_strings_are_escaped(raw, expected):
+    assert repair_json(raw) == {'k': expected}
+
+
+def test_control_characters_outside_strings_are_whitespace():
+    assert repair_json('{\r\n\t"k":\t1\r\n}') == {'k': 1}
+
+
+def test_truncated_string_with_control_characters_is_closed():
+    parser = StreamingJSONParser()
+    parser.feed('{"skills": ["Python\t", "SQL\r\n')
+
+    assert parser.result() == {'skills': ['Python\t', 'SQL\r\n']}
+
+
+def test_fences_trailing_commas_and_python_literals():
+    raw = 'Here you go:\n```json\n{"name": "A", "active": True, "manager": None, "tags": ["x",],}\n```'
+
+    assert repair_json(raw) == {'name': 'A', 'active': True, 'manager': None, 'tags': ['x']}
+
+
+def test_no_json_raises():
+    with pytest.raises(JSONRepairError):
+        repair_json('no structured output here')
@@ -0,0 +1,116 @@
+"""OllamaEndpointPool failover and least-outstanding routing against local stand-in Ollama servers."""
+import threading
+import time
+
+import pytest
+import requests
+
+from ollama_pool import NoHealthyEndpointError, OllamaEndpointPool
+
+MODEL = 'gemma3:4b'
+
+
+@pytest.fixture
+def ollama_servers(stand_in_server):
+    """Two stand-in Ollama servers; generate blocks while a server's `release` event is clear."""
+    servers = []
+    for name in ('first', 'second'):
+        release = threading.Event()
+        release.set()
+        calls = []
+
+        def handle_generate(body, name=name, release=release, calls=calls):
+            calls.append(body)
+            release.wait(5)
+            return 200, {'model': MODEL, 'response': name, 'done': True}
+
+        server = stand_in_server({
+            ('GET', '/api/tags'): lambda body: (200, {'models': [{'name': MODEL}]}),
+            ('POST', '/api/generate'): handle_generate
+        })
+        server.name = name
+        server.release = release
+        server.generate_calls = calls
+        servers.append(server)
+
+    yield servers
+    for server in servers:
+        server.release.set()
+
+
+def make_pool(servers):
+    return OllamaEndpointPool({
+        'endpoints': [server.url for server in servers],
+        'health_check_interval': 3600,
+        'retry_unhealthy_after': 3600,
+        'probe_timeout': 1,
+        'max_failover_attempts': 3
+    })
+
+
+def generate(url):
+    response = requests.post(f"{url}/api/generate", json={'model': MODEL, 'prompt': 'hi', 'stream': False}, timeout=5)
+    response.raise_for_status()
+    return response.json()['response']
+
+
+def test_health_check_reads_models(ollama_servers):
+    pool = make_pool(ollama_servers)
+
+    assert MODEL in pool.get_available_models(refresh=True)
+    assert pool.get_stats()['healthy'] == 2
+
+
+def test_request_fails_over_when_an_endpoint_dies(ollama_servers):
+    pool = make_pool(ollama_servers)
+    pool.refresh(force=True)
+    dead, alive = ollama_servers
+    dead.stop()
+
+    # Both endpoints look healthy and idle, so the dead one is tried first and the live one answers
+    for _ in range(3):
+        assert pool.call(MODEL, generate) == alive.name
+
+    stats = {endpoint['url']: endpoint for endpoint in pool.get_stats()['endpoints']}
+    assert stats[dead.url]['healthy'] is False
+    assert stats[dead.url]['failures'] == 1
+    assert stats[alive.url]['healthy'] is True
+    assert len(alive.generate_calls) == 3
+
+
+def test_no_healthy_endpoint_raises(ollama_servers):
+    pool = make_pool(ollama_servers)
+    pool.refresh(force=True)
+    for server in ollama_servers:
+        server.stop()
+
+    with pytest.raises(NoHealthyEndpointError):
+        pool.call(MODEL, generate)
+
+
+def test_outstanding_requests_are_balanced(ollama_servers):
+    pool = make_pool(ollama_servers)
+    pool.refresh(force=True)
+    for server in ollama_servers:
+        server.release.clear()
+
+    results = []
+    threads = []
+    for _ in range(4):
+        thread = threading.Thread(target=lambda: results.append(pool.call(MODEL, generate)))
+        thread.start()
+        threads.append(thread)
+        # Let each request reach a server before routing the next one
+        deadline = time.time() + 5
+        while sum(len(server.generate_calls) for server in ollama_servers) < len(threads) and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert [endpoint['outstanding'] for endpoint in pool.get_stats()['endpoints']] == [2, 2]
+
+    for server in ollama_servers:
+        server.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert pool.get_stats()['outstanding'] == 0
+    assert sorted(results) == ['first', 'first', 'second', 'second']
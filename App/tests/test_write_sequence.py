@@ -0,0 +1,22 @@
+"""WriteSequence positions used to reconcile the side indexes."""
+from write_sequence import WriteSequence
+
+
+def test_positions_persist_and_detect_missed_writes(tmp_path):
+    path = str(tmp_path / 'write_sequence.sqlite3')
+    sequence = WriteSequence(path)
+    assert sequence.value == 0
+    assert sequence.synced('record_catalog') is None
+
+    seq = sequence.advance()
+    sequence.mark_synced('record_catalog', seq)
+    sequence.mark_synced('analytics_store', seq)
+    # A metadata-only update the catalog applied but the aggregates missed
+    seq = sequence.advance()
+    sequence.mark_synced('record_catalog', seq)
+
+    reopened = WriteSequence(path)
+    assert reopened.value == 2
+    assert reopened.is_current('record_catalog')
+    assert not reopened.is_current('analytics_store')
+    assert not reopened.is_current('fulltext_index')
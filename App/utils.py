@@ -7,13 +7,12 @@ import secrets
 import socket
 import platform
 import getpass
-import geocoder
-from geopy.geocoders import Nominatim
 import time
 import datetime
 import pandas as pd
 import streamlit as st
 from typing import Dict, Any, Optional
+from geolocation import geolocation_service
 
 
 def generate_security_token() -> str:
@@ -45,40 +44,9 @@ def get_system_info() -> Dict[str, str]:
         }
 
 
-def get_location_info() -> Dict[str, str]:
-    """Get location information using geocoding"""
-    try:
-        g = geocoder.ip('me')
-        latlong = g.latlng
-        
-        if latlong:
-            geolocator = Nominatim(user_agent="ai-resume-analyzer")
-            location = geolocator.reverse(latlong, language='en')
-            
-            if location and location.raw.get('address'):
-                address = location.raw['address']
-                return {
-                    'latlong': str(latlong),
-                    'city': address.get('city', ''),
-                    'state': address.get('state', ''),
-                    'country': address.get('country', '')
-                }
-        
-        return {
-            'latlong': '',
-            'city': '',
-            'state': '',
-            'country': ''
-        }
-        
-    except Exception as e:
-        st.warning(f"Could not get location info: {e}")
-        return {
-            'latlong': '',
-            'city': '',
-            'state': '',
-            'country': ''
-        }
+def get_location_info(skip: bool = False) -> Dict[str, str]:
+    """Get location information (cached per process; skip=True avoids network calls in bulk jobs)"""
+    return geolocation_service.locate(skip=skip)
 
 
 def get_current_timestamp() -> str:
@@ -119,12 +87,12 @@ def show_pdf(file_path: str) -> str:
 
 
 def prepare_user_data(resume_data: Dict[str, Any], llm_metadata: Optional[Dict[str, Any]], 
-                     pdf_name: str) -> Dict[str, Any]:
-    """Prepare user data for database insertion"""
+                     pdf_name: str, skip_location: bool = False) -> Dict[str, Any]:
+    """Prepare user data for database insertion (skip_location=True for batch imports: no geolocation calls)"""
     
     # Get system and location info
     system_info = get_system_info()
-    location_info = get_location_info()
+    location_info = get_location_info(skip=skip_location)
     
     # Extract basic data
     cand_level = llm_metadata.get('career_level', 'Unknown') if llm_metadata else 'Unknown'
@@ -0,0 +1,61 @@
+"""
+Write sequence for the side indexes kept next to the resume collection.
+
+Every resume write advances a persisted sequence number before it reaches
+Chroma, and each side index (analytics aggregates, record catalog, full-text
+index) records the sequence it has applied once its own update commits. An
+index whose position lags the sequence missed a write: its apply failed, the
+process died between the Chroma write and the index update, or another
+process wrote while the index was unavailable. VectorDatabaseManager rebuilds
+such an index when it loads it, which also catches metadata-only updates that
+a record-count comparison cannot see.
+"""
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class WriteSequence:
+    """Persisted resume write counter plus the position each side index has applied."""
+
+    def __init__(self, path: Optional[str]):
+        """
+        Args:
+            path: SQLite file for the sequence (None keeps it in memory, so every index rebuilds once per process)
+        """
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS sequence (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)")
+        self._db.execute("INSERT OR IGNORE INTO sequence (id, seq) VALUES (1, 0)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS synced (name TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+        self._db.commit()
+
+    @property
+    def value(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT seq FROM sequence WHERE id = 1").fetchone()[0]
+
+    def advance(self) -> int:
+        """Start a write; returns its sequence number."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE sequence SET seq = seq + 1 WHERE id = 1")
+            return self._db.execute("SELECT seq FROM sequence WHERE id = 1").fetchone()[0]
+
+    def synced(self, name: str) -> Optional[int]:
+        """Sequence a side index last applied (None if it never recorded one)."""
+        with self._lock:
+            row = self._db.execute("SELECT seq FROM synced WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, name: str, seq: int):
+        """Record that a side index has applied every write up to seq."""
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO synced (name, seq) VALUES (?, ?)", (name, seq))
+
+    def is_current(self, name: str) -> bool:
+        return self.synced(name) == self.value